@@ -0,0 +1,106 @@
+"""
+抓取吞吐量基准测试
+
+在本地启动 cpquery 模拟服务器，用真实的 QWebEngineView + CrawlerEngine 完成一次完整抓取，
+报告 页/分钟 和 条/秒，并核对抓取记录数是否与模拟结果总数一致。
+
+用法:
+    python -m benchmarks.bench_crawl_throughput --results 200 --page-size 10 --latency uniform:50,200
+    python -m benchmarks.bench_crawl_throughput --record data/recordings/crawl.jsonl
+
+使用 --record 时同时录制浏览器交互，之后可用 benchmarks.bench_replay 脱离Chromium回放。
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+from benchmarks.cpquery_emulator import CpqueryEmulator, EmulatorConfig
+
+
+def run_benchmark(config: EmulatorConfig, max_pages: int = 1000, record_path: Optional[str] = None) -> dict:
+    """执行一次抓取吞吐量基准测试，提供 record_path 时录制浏览器交互"""
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    from PyQt6.QtWidgets import QApplication
+
+    from src.browser.replay_controller import RecordingController
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with CpqueryEmulator(config) as emulator:
+        web_view = QWebEngineView()
+        engine = CrawlerEngine(web_view)
+
+        # 登录：模拟服务器设置会话Cookie后跳转到查询页
+        if not engine.browser.goto_sync(emulator.login_url):
+            raise RuntimeError("无法加载模拟服务器页面")
+        if record_path:
+            engine.browser = RecordingController(engine.browser, record_path)
+
+        pages_seen = []
+
+        def progress_callback(**kwargs):
+            pages_seen.append(kwargs.get("current_page", 0))
+
+        started = time.perf_counter()
+        data = engine.start_crawl(
+            emulator.index_url,
+            page_config={"table_selector": ".tableList", "field_mappings": {}},
+            strategy={"max_pages": max_pages},
+            form_data={"loading_selector": ".q-loading"},
+            progress_callback=progress_callback,
+        )
+        elapsed = time.perf_counter() - started
+
+        web_view.deleteLater()
+        app.processEvents()
+
+        pages = max(pages_seen) if pages_seen else 0
+        return {
+            "elapsed": elapsed,
+            "pages": pages,
+            "records": len(data),
+            "expected_records": config.total_results,
+            "pages_per_min": pages * 60 / elapsed if elapsed > 0 else 0.0,
+            "records_per_sec": len(data) / elapsed if elapsed > 0 else 0.0,
+            "server_stats": dict(emulator.stats),
+        }
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="CrawlerEngine 离线吞吐量基准测试")
+    parser.add_argument("--results", type=int, default=100, help="查询结果总数")
+    parser.add_argument("--page-size", type=int, default=10, help="每页结果数")
+    parser.add_argument("--latency", default="fixed:50", help="延迟分布，如 uniform:100,400")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="HTTP 500 故障注入概率")
+    parser.add_argument("--short-page-rate", type=float, default=0.0, help="不完整页面注入概率")
+    parser.add_argument("--max-pages", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", help="将浏览器交互录制到该文件")
+    args = parser.parse_args()
+
+    config = EmulatorConfig(
+        total_results=args.results,
+        page_size=args.page_size,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        short_page_rate=args.short_page_rate,
+        seed=args.seed,
+    )
+    report = run_benchmark(config, args.max_pages, args.record)
+
+    print("\n📊 抓取吞吐量基准测试结果:")
+    print(f"  耗时: {report['elapsed']:.2f} 秒")
+    print(f"  页数: {report['pages']}")
+    print(f"  记录数: {report['records']} / 期望 {report['expected_records']}")
+    print(f"  页/分钟: {report['pages_per_min']:.1f}")
+    print(f"  条/秒: {report['records_per_sec']:.2f}")
+    print(f"  服务器统计: {report['server_stats']}")
+    return 0 if report["records"] == report["expected_records"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
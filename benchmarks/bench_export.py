@@ -0,0 +1,54 @@
+"""
+多格式导出基准测试
+
+用 cpquery_emulator 生成的模拟记录，比较 export_multi_format 依次写入（--workers 1）
+与每种格式一个写入线程的耗时。写入线程只在写入器释放 GIL 时（gzip / zstd 压缩、
+pyarrow 编码、文件写入和 fsync）才能并行，单核机器上线程版本不会更快。
+
+用法:
+    python -m benchmarks.bench_export --records 100000 --formats csv,jsonl,parquet --compression zstd
+    python -m benchmarks.bench_export --workers 1,2,4 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.cpquery_emulator import generate_records
+from src.crawler.data_exporter import DataExporter
+
+
+def export_once(records, formats, compression, workers: int) -> float:
+    """导出一次，返回耗时（秒）"""
+    with tempfile.TemporaryDirectory() as export_dir:
+        exporter = DataExporter(export_dir, compression=compression)
+        started = time.perf_counter()
+        exporter.export_multi_format(records, "bench", formats, max_workers=workers)
+        return time.perf_counter() - started
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="export_multi_format 多格式导出基准测试")
+    parser.add_argument("--records", type=int, default=100000, help="记录数")
+    parser.add_argument("--formats", default="csv,jsonl,excel,parquet", help="导出格式，逗号分隔")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], help="CSV、JSON Lines 的压缩方式")
+    parser.add_argument("--workers", default="1,4", help="写入线程数，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = generate_records(args.records)
+    formats = args.formats.split(",")
+    print(f"\n📊 导出 {args.records} 条记录为 {', '.join(formats)}（CPU核数 {os.cpu_count()}）:")
+    baseline = None
+    for workers in (int(n) for n in args.workers.split(",")):
+        best = min(export_once(records, formats, args.compression, workers) for _ in range(args.repeat))
+        baseline = baseline or best
+        print(f"  {workers} 个写入线程: {best:.2f} 秒 (相对 {baseline / best:.2f} 倍)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+提取热点路径基准测试
+
+使用 10 ~ 10,000 条记录的合成页面，测量以下函数的 条/秒、调用期间的峰值内存增量，
+以及调用结束后仍保留的内存（tracemalloc 快照差异，即结果对象占用的字节数和内存块数）：
+    - patent_parser.parse_patent_info / parse_patent_info_text / extract_table_info
+      （即 CrawlerEngine._parse_patent_info 等方法的实现）
+    - DataExtractor.extract_table_data / check_element_exists
+    - cleaning_rules.BatchCleaner 按列清洗
+
+用法:
+    python -m benchmarks.bench_extraction --sizes 10,100,1000 --json after.json --baseline before.json
+"""
+
+import argparse
+import gc
+import json
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.cpquery_emulator import generate_records, render_table_info
+from src.crawler.cleaning_rules import BatchCleaner
+from src.crawler.data_extractor import DataExtractor
+from src.crawler.patent_parser import extract_table_info, parse_patent_info, parse_patent_info_text
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+TABLE_FIELDS = ["专利号", "专利名称", "申请人", "专利类型", "申请日期", "案件状态"]
+TABLE_FIELD_MAPPINGS = {str(i): name for i, name in enumerate(TABLE_FIELDS)}
+
+
+def build_table_info_blocks(count: int) -> List[str]:
+    """生成 .table_info 结果块"""
+    return [render_table_info(record) for record in generate_records(count)]
+
+
+def build_result_data(count: int) -> Dict:
+    """生成与页面JavaScript返回值结构一致的查询结果（tableInfoData 路径）"""
+    blocks = build_table_info_blocks(count)
+    return {
+        "tableInfoData": [
+            {"html": block, "text": re.sub(r"<[^>]+>", " ", block).strip()} for block in blocks
+        ],
+        "url": "http://127.0.0.1/chinesepatent/index",
+        "pageTitle": "中国及多国专利审查信息查询",
+    }
+
+
+def build_table_content_result(count: int) -> Dict:
+    """生成只有 tableContent 的查询结果（正则回退路径）"""
+    return {
+        "resultInfo": {"tableContent": "".join(build_table_info_blocks(count))},
+        "url": "http://127.0.0.1/chinesepatent/index",
+        "pageTitle": "中国及多国专利审查信息查询",
+    }
+
+
+def build_table_page(count: int) -> str:
+    """生成包含结果表格和分页组件的完整页面"""
+    rows = []
+    for record in generate_records(count):
+        cells = []
+        for field in TABLE_FIELDS:
+            value = record[field]
+            if field == "专利号":
+                value = f'<a href="/detail/{value}">{value}</a>'
+            cells.append(f"<td> {value} </td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    header = "<tr>" + "".join(f"<th>{field}</th>" for field in TABLE_FIELDS) + "</tr>"
+    return (
+        "<html><head><title>结果</title></head><body>"
+        f'<table class="result">{header}{"".join(rows)}</table>'
+        '<div class="q-pagination"><button class="q-btn next">'
+        '<i class="material-icons">keyboard_arrow_right</i></button></div>'
+        "</body></html>"
+    )
+
+
+def build_cases(count: int) -> Dict[str, Callable[[], object]]:
+    """构造一组待测函数（输入数据在计时之外准备好）"""
+    # 关闭文档缓存，每次调用都计入解析耗时
+    extractor = DataExtractor(cache_max_entries=0)
+    soup_extractor = DataExtractor(cache_max_entries=0, use_lxml=False)
+    result_data = build_result_data(count)
+    table_content_result = build_table_content_result(count)
+    info_htmls = [item["html"] for item in result_data["tableInfoData"]]
+    info_texts = [re.sub(r"\s+", " ", item["text"]) for item in result_data["tableInfoData"]]
+    table_page = build_table_page(count)
+    raw_records = generate_records(count)
+    batch_cleaner = BatchCleaner({"申请日期": "parse_date", "专利名称": "trim_fullwidth", "专利号": "parse_number"})
+
+    return {
+        "parse_patent_info": lambda: [parse_patent_info(html) for html in info_htmls],
+        "parse_patent_info_text": lambda: [parse_patent_info_text(text) for text in info_texts],
+        "extract_table_info": lambda: extract_table_info(result_data),
+        "extract_table_info[tableContent]": lambda: extract_table_info(table_content_result),
+        "extract_table_data": lambda: extractor.extract_table_data(
+            table_page, "table.result", TABLE_FIELD_MAPPINGS
+        ),
+        "extract_table_data[bs4]": lambda: soup_extractor.extract_table_data(
+            table_page, "table.result", TABLE_FIELD_MAPPINGS
+        ),
+        "batch_clean": lambda: batch_cleaner.clean([dict(record) for record in raw_records]),
+        "check_element_exists": lambda: extractor.check_element_exists(
+            table_page, ".q-pagination .next"
+        ),
+    }
+
+
+def measure(func: Callable[[], object], count: int, repeat: int) -> Dict:
+    """测量单个函数：最佳耗时、峰值内存增量、调用结束后保留的内存和内存块数"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # 峰值从调用前开始计算，不含调用前快照本身
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    # 回收调用中产生的循环垃圾，差异只计结果仍引用的内存
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # 快照差异排除 tracemalloc 自身的分配
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "filename")
+    del result
+
+    return {
+        "records": count,
+        "seconds": best,
+        "records_per_sec": count / best if best > 0 else float("inf"),
+        "peak_kib": (peak - baseline) / 1024,
+        "retained_kib": sum(stat.size_diff for stat in diff) / 1024,
+        "retained_blocks": sum(stat.count_diff for stat in diff),
+    }
+
+
+def run(sizes: List[int], repeat: int, only: Optional[str] = None) -> Dict[str, Dict]:
+    """执行基准测试，返回 {"用例@记录数": 指标}"""
+    results = {}
+    for count in sizes:
+        for name, func in build_cases(count).items():
+            if only and only not in name:
+                continue
+            # 大规模输入减少重复次数，避免整体耗时过长
+            runs = repeat if count < 10000 else 1
+            results[f"{name}@{count}"] = measure(func, count, runs)
+    return results
+
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None):
+    """打印结果表格，提供基线时同时打印吞吐量变化"""
+    header = f"{'用例':<42}{'条/秒':>14}{'峰值KiB':>12}{'保留KiB':>12}{'保留块':>10}"
+    if baseline:
+        header += f"{'变化':>10}"
+    print(header)
+    print("-" * 100)
+    for key, metrics in results.items():
+        line = (
+            f"{key:<42}{metrics['records_per_sec']:>14.0f}{metrics['peak_kib']:>12.1f}"
+            f"{metrics['retained_kib']:>12.1f}{metrics['retained_blocks']:>10}"
+        )
+        if baseline and key in baseline:
+            before = baseline[key]["records_per_sec"]
+            change = (metrics["records_per_sec"] - before) / before * 100 if before else 0.0
+            line += f"{change:>+9.1f}%"
+        print(line)
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="提取热点路径基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="记录数列表，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数（取最佳值）")
+    parser.add_argument("--only", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--json", help="将结果保存为JSON文件")
+    parser.add_argument("--baseline", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run(sizes, args.repeat, args.only)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+录制回放基准测试
+
+用 ReplayController 脱离Chromium重复回放一次录制的抓取，测量引擎逻辑、等待节奏和数据提取的开销，
+可选用 cProfile 输出热点函数。
+
+用法:
+    python -m benchmarks.bench_replay data/recordings/crawl.jsonl --repeat 20 --profile
+    python -m benchmarks.bench_replay data/recordings/crawl.jsonl --speed 1.0   # 按原始耗时回放
+"""
+
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+
+from src.browser.replay_controller import ReplayController
+from src.crawler.crawler_engine import CrawlerEngine
+
+
+def replay_once(path: str, speed: float, max_pages: int) -> dict:
+    """回放一次录制，返回耗时与统计"""
+    replay = ReplayController(path, speed=speed)
+    engine = CrawlerEngine(browser=replay)
+    started = time.perf_counter()
+    data = engine.start_crawl(
+        "replay://",
+        page_config={},
+        strategy={"max_pages": max_pages},
+        form_data={"loading_selector": ".q-loading"},
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsed": elapsed,
+        "records": len(data),
+        "recorded_wait_ms": replay.stats["waited_ms"],
+        "misses": replay.stats["misses"],
+    }
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="CrawlerEngine 录制回放基准测试")
+    parser.add_argument("recording", help="录制文件路径")
+    parser.add_argument("--repeat", type=int, default=5, help="回放次数")
+    parser.add_argument("--speed", type=float, default=0.0, help="时间倍率，1.0为原始速度，0为不等待")
+    parser.add_argument("--max-pages", type=int, default=1000)
+    parser.add_argument("--profile", action="store_true", help="使用cProfile输出热点函数")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    reports = []
+    for _ in range(args.repeat):
+        if profiler:
+            profiler.enable()
+        reports.append(replay_once(args.recording, args.speed, args.max_pages))
+        if profiler:
+            profiler.disable()
+
+    best = min(reports, key=lambda r: r["elapsed"])
+    speedup = best["recorded_wait_ms"] / 1000 / best["elapsed"] if best["elapsed"] > 0 else 0.0
+    print("\n📊 回放基准测试结果:")
+    print(f"  记录数: {best['records']}")
+    print(f"  最佳耗时: {best['elapsed'] * 1000:.1f} 毫秒 (共 {args.repeat} 次)")
+    print(f"  引擎等待时间: {best['recorded_wait_ms'] / 1000:.1f} 秒，相对加速约 {speedup:.0f} 倍")
+    print(f"  未命中的调用: {best['misses']}")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""
+cpquery 离线模拟服务器
+
+模拟目标站点的 Quasar 界面：.q-loading 加载遮罩、带右箭头按钮的 .q-pagination、
+.table_info 结果块、.total strong 总数以及登录Cookie。
+支持配置结果数量、延迟分布和故障注入，用于离线测量和回归测试抓取吞吐量。
+
+用法:
+    python -m benchmarks.cpquery_emulator --results 2000 --latency uniform:100,400
+"""
+
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+INDEX_PATH = "/chinesepatent/index"
+LOGIN_PATH = "/login"
+SESSION_COOKIE = "SESSION"
+
+PATENT_TYPES = ["发明专利", "实用新型", "外观设计"]
+CASE_STATUSES = ["专利权维持", "等待实审请求", "实质审查", "驳回等复审请求", "专利权终止"]
+APPLICANTS = [
+    "华为技术有限公司",
+    "中兴通讯股份有限公司",
+    "北京百度网讯科技有限公司",
+    "腾讯科技(深圳)有限公司",
+    "清华大学",
+    "浙江大学",
+    "京东方科技集团股份有限公司",
+    "比亚迪股份有限公司",
+]
+MAIN_CLASSES = ["G06F16/00", "H04L29/06", "H04W72/04", "G06N3/08", "H01L27/32", "B60L53/80"]
+NAME_WORDS = ["数据", "处理", "方法", "装置", "系统", "终端", "网络", "电池", "显示", "图像", "识别", "控制"]
+
+
+def generate_records(count: int, seed: int = 0) -> List[Dict]:
+    """生成确定性的模拟专利记录"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        year = 2010 + rng.randrange(14)
+        app_date = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        patent_type = rng.choice(PATENT_TYPES)
+        type_code = {"发明专利": 1, "实用新型": 2, "外观设计": 3}[patent_type]
+        granted = rng.random() < 0.6
+        name = "一种" + "".join(rng.choice(NAME_WORDS) for _ in range(rng.randint(2, 5)))
+        records.append({
+            "专利号": f"{year}{type_code}{i:07d}{rng.randrange(10)}",
+            "专利名称": f"{name}{rng.choice(['方法', '装置', '系统'])}",
+            "申请人": rng.choice(APPLICANTS),
+            "专利类型": patent_type,
+            "申请日期": app_date,
+            "公布号": f"CN{100000000 + i}A",
+            "授权公告号": f"CN{200000000 + i}B" if granted else "",
+            "案件状态": rng.choice(CASE_STATUSES),
+            "授权公告日": f"{year + 2}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if granted else "",
+            "主分类号": rng.choice(MAIN_CLASSES),
+        })
+    return records
+
+
+def render_table_info(record: Dict) -> str:
+    """将记录渲染为与目标站点一致的 .table_info 结果块"""
+    e = html.escape
+    return (
+        '<div class="table_info">'
+        f'<span class="title">申请号/专利号：</span><span class="hover_active">{e(record["专利号"])}</span>'
+        f'<span class="item">发明名称：<span class="name">{e(record["专利名称"])}</span></span>'
+        f'<span class="item">申请人：{e(record["申请人"])}</span>'
+        f'<span class="item">专利类型：{e(record["专利类型"])}</span>'
+        f'<span class="item">申请日：{e(record["申请日期"])}</span>'
+        f'<span class="item">发明专利申请公布号：{e(record["公布号"])}</span>'
+        f'<span class="item">授权公告号：{e(record["授权公告号"])}</span>'
+        f'<span class="item">案件状态：{e(record["案件状态"])}</span>'
+        f'<span class="item">授权公告日：{e(record["授权公告日"])}</span>'
+        f'<span class="item">主分类号：{e(record["主分类号"])}</span>'
+        '</div>'
+    )
+
+
+class LatencyModel:
+    """
+    延迟分布
+
+    规格格式:
+        fixed:200            固定200毫秒
+        uniform:100,400      100~400毫秒均匀分布
+        lognormal:300,0.5    中位数300毫秒、sigma为0.5的对数正态分布
+    """
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        self.spec = spec
+        self.rng = random.Random(seed)
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v.strip()] if params else []
+        if kind == "fixed":
+            self._sample = lambda: values[0] if values else 0.0
+        elif kind == "uniform":
+            self._sample = lambda: self.rng.uniform(values[0], values[1])
+        elif kind == "lognormal":
+            import math
+            mu = math.log(values[0])
+            self._sample = lambda: self.rng.lognormvariate(mu, values[1])
+        else:
+            raise ValueError(f"不支持的延迟分布: {spec}")
+
+    def sample_ms(self) -> float:
+        """采样一次延迟（毫秒）"""
+        return max(self._sample(), 0.0)
+
+
+class EmulatorConfig:
+    """模拟服务器配置"""
+
+    def __init__(
+        self,
+        total_results: int = 200,
+        page_size: int = 10,
+        latency: str = "fixed:0",
+        failure_rate: float = 0.0,
+        short_page_rate: float = 0.0,
+        require_login: bool = True,
+        max_page_buttons: int = 7,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            total_results: 查询结果总数
+            page_size: 每页结果数
+            latency: 结果接口的延迟分布规格，见 LatencyModel
+            failure_rate: 结果接口返回HTTP 500的概率（前端会自动重试）
+            short_page_rate: 返回不完整页面（丢失部分结果）的概率
+            require_login: 是否要求登录Cookie
+            max_page_buttons: 分页组件显示的页码按钮数量
+            seed: 随机种子
+        """
+        self.total_results = total_results
+        self.page_size = page_size
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.short_page_rate = short_page_rate
+        self.require_login = require_login
+        self.max_page_buttons = max_page_buttons
+        self.seed = seed
+
+    @property
+    def total_pages(self) -> int:
+        return max((self.total_results + self.page_size - 1) // self.page_size, 1)
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>中国及多国专利审查信息查询</title>
+<style>
+  .q-loading { position: fixed; inset: 0; background: rgba(255,255,255,.6); }
+  .q-btn--disabled { opacity: .4; }
+  .table_info { display: block; padding: 6px; border-bottom: 1px solid #eee; }
+  .table_info .item { margin-right: 12px; }
+</style>
+</head>
+<body>
+<div class="search-condition">
+  <div class="row"><div>申请人：</div><input name="applicant"></div>
+  <button class="q-btn q-btn--standard" id="search"><span>查询</span></button>
+</div>
+<div class="total">共 <strong>0</strong> 条</div>
+<div class="tableList"></div>
+<div class="q-pagination"></div>
+<script>
+const MAX_BUTTONS = __MAX_BUTTONS__;
+let currentPage = 1;
+let totalPages = 1;
+
+function showLoading() {
+  if (!document.querySelector('.q-loading')) {
+    const overlay = document.createElement('div');
+    overlay.className = 'q-loading';
+    document.body.appendChild(overlay);
+  }
+}
+
+function hideLoading() {
+  document.querySelectorAll('.q-loading').forEach(el => el.remove());
+}
+
+function button(inner, classes, onClick, disabled) {
+  const btn = document.createElement('button');
+  btn.className = 'q-btn ' + classes + (disabled ? ' q-btn--disabled' : '');
+  btn.innerHTML = inner;
+  btn.disabled = !!disabled;
+  if (!disabled) btn.addEventListener('click', onClick);
+  return btn;
+}
+
+function pageWindow() {
+  let start = Math.max(1, currentPage - Math.floor(MAX_BUTTONS / 2));
+  let end = Math.min(totalPages, start + MAX_BUTTONS - 1);
+  start = Math.max(1, end - MAX_BUTTONS + 1);
+  const pages = new Set([1, totalPages]);
+  for (let p = start; p <= end; p++) pages.add(p);
+  return Array.from(pages).sort((a, b) => a - b);
+}
+
+function renderPagination() {
+  const container = document.querySelector('.q-pagination');
+  container.innerHTML = '';
+  container.appendChild(button('<i class="material-icons">keyboard_arrow_left</i>', 'q-btn--flat',
+    () => loadPage(currentPage - 1), currentPage <= 1));
+  pageWindow().forEach(p => {
+    container.appendChild(button(String(p), p === currentPage ? 'q-btn--standard' : 'q-btn--flat',
+      () => loadPage(p), false));
+  });
+  container.appendChild(button('<i class="material-icons">keyboard_arrow_right</i>', 'q-btn--flat',
+    () => loadPage(currentPage + 1), currentPage >= totalPages));
+}
+
+function loadPage(page) {
+  showLoading();
+  fetch('/api/results?page=' + page, { credentials: 'same-origin' })
+    .then(resp => {
+      if (!resp.ok) throw new Error('HTTP ' + resp.status);
+      return resp.json();
+    })
+    .then(data => {
+      currentPage = data.page;
+      totalPages = data.pages;
+      document.querySelector('.total strong').textContent = String(data.total);
+      document.querySelector('.tableList').innerHTML = data.records.join('');
+      renderPagination();
+      hideLoading();
+    })
+    .catch(() => setTimeout(() => loadPage(page), 200));
+}
+
+document.getElementById('search').addEventListener('click', () => loadPage(1));
+loadPage(1);
+</script>
+</body>
+</html>
+"""
+
+LOGIN_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>登录</title></head>
+<body><a class="login-btn" href="/login">登录</a></body>
+</html>
+"""
+
+
+class CpqueryEmulator:
+    """cpquery 模拟服务器"""
+
+    def __init__(self, config: Optional[EmulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """初始化模拟服务器，port为0时自动分配端口"""
+        self.config = config or EmulatorConfig()
+        self.records = generate_records(self.config.total_results, self.config.seed)
+        self.latency = LatencyModel(self.config.latency, self.config.seed)
+        self.rng = random.Random(self.config.seed + 1)
+        self.sessions = set()
+        self.stats = {"page_requests": 0, "failures_injected": 0, "short_pages": 0}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def index_url(self) -> str:
+        return self.base_url + INDEX_PATH
+
+    @property
+    def login_url(self) -> str:
+        return self.base_url + LOGIN_PATH
+
+    def start(self) -> "CpqueryEmulator":
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def page_payload(self, page: int) -> Optional[Dict]:
+        """生成指定页的结果数据，返回None表示注入了故障"""
+        config = self.config
+        page = min(max(page, 1), config.total_pages)
+        with self._lock:
+            self.stats["page_requests"] += 1
+            if self.rng.random() < config.failure_rate:
+                self.stats["failures_injected"] += 1
+                return None
+            short = self.rng.random() < config.short_page_rate
+
+        start = (page - 1) * config.page_size
+        records = self.records[start:start + config.page_size]
+        if short and len(records) > 1:
+            with self._lock:
+                self.stats["short_pages"] += 1
+            records = records[: len(records) // 2]
+
+        return {
+            "page": page,
+            "pages": config.total_pages,
+            "total": config.total_results,
+            "records": [render_table_info(record) for record in records],
+        }
+
+    def _make_handler(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _logged_in(self) -> bool:
+                if not emulator.config.require_login:
+                    return True
+                cookie = SimpleCookie(self.headers.get("Cookie", ""))
+                morsel = cookie.get(SESSION_COOKIE)
+                return bool(morsel and morsel.value in emulator.sessions)
+
+            def _send(self, status: int, body: str, content_type: str, headers: Optional[Dict] = None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _redirect(self, location: str, headers: Optional[Dict] = None):
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+
+                if parsed.path == LOGIN_PATH:
+                    token = secrets.token_hex(16)
+                    emulator.sessions.add(token)
+                    cookie = f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"
+                    self._redirect(INDEX_PATH, {"Set-Cookie": cookie})
+                    return
+
+                if parsed.path == INDEX_PATH:
+                    if not self._logged_in():
+                        self._send(200, LOGIN_HTML, "text/html")
+                        return
+                    body = INDEX_HTML.replace("__MAX_BUTTONS__", str(emulator.config.max_page_buttons))
+                    self._send(200, body, "text/html")
+                    return
+
+                if parsed.path == "/api/results":
+                    if not self._logged_in():
+                        self._send(401, json.dumps({"message": "未登录"}), "application/json")
+                        return
+                    page = int(query.get("page", ["1"])[0])
+                    time.sleep(emulator.latency.sample_ms() / 1000)
+                    payload = emulator.page_payload(page)
+                    if payload is None:
+                        self._send(500, json.dumps({"message": "服务器繁忙"}), "application/json")
+                        return
+                    self._send(200, json.dumps(payload, ensure_ascii=False), "application/json")
+                    return
+
+                if parsed.path == "/api/stats":
+                    self._send(200, json.dumps(emulator.stats), "application/json")
+                    return
+
+                self._send(404, "not found", "text/plain")
+
+        return Handler
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="cpquery 离线模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--results", type=int, default=200, help="查询结果总数")
+    parser.add_argument("--page-size", type=int, default=10, help="每页结果数")
+    parser.add_argument("--latency", default="fixed:0", help="延迟分布，如 uniform:100,400")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="HTTP 500 故障注入概率")
+    parser.add_argument("--short-page-rate", type=float, default=0.0, help="不完整页面注入概率")
+    parser.add_argument("--no-login", action="store_true", help="不要求登录Cookie")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = EmulatorConfig(
+        total_results=args.results,
+        page_size=args.page_size,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        short_page_rate=args.short_page_rate,
+        require_login=not args.no_login,
+        seed=args.seed,
+    )
+    emulator = CpqueryEmulator(config, args.host, args.port)
+    print(f"🌐 模拟服务器已启动: {emulator.login_url} (登录后跳转到 {INDEX_PATH})")
+    try:
+        emulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
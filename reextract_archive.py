@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+归档重新提取脚本 - 在所有CPU核心上对页面归档重新运行解析并导出
+
+用法:
+    python reextract_archive.py data/archive/任务名 --formats csv,json
+"""
+
+import argparse
+import time
+
+from src.crawler.data_exporter import DataExporter
+from src.crawler.page_archive import PageArchive, reextract_archive
+
+
+def main():
+    """执行重新提取"""
+    parser = argparse.ArgumentParser(description="对页面归档重新运行解析并导出")
+    parser.add_argument("archive_dir", help="归档目录")
+    parser.add_argument("--formats", default="csv,json", help="导出格式，逗号分隔")
+    parser.add_argument("--processes", type=int, default=None, help="进程数，默认使用全部CPU核心")
+    parser.add_argument("--name", default="reextract", help="导出文件名前缀")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive_dir)
+    print(f"📦 归档页面数: {len(archive)}")
+
+    started = time.perf_counter()
+    records = reextract_archive(args.archive_dir, processes=args.processes)
+    elapsed = time.perf_counter() - started
+    print(f"✅ 重新提取完成: {len(records)} 条记录，耗时 {elapsed:.2f} 秒")
+
+    exporter = DataExporter()
+    filename = exporter.generate_filename(args.name)
+    results = exporter.export_multi_format(records, filename, args.formats.split(","))
+    for fmt, path in results.items():
+        print(f"💾 已导出{fmt}格式: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,18 @@
 """浏览器控制模块"""
 
+from .backend import BrowserBackend
+from .replay_controller import RecordingController, ReplayController
+
 # from .playwright_controller import PlaywrightController
-from .qwebengine_controller import QWebEngineController
+try:
+    from .qwebengine_controller import QWebEngineController
+except ImportError:
+    # 回放后端不依赖Chromium，缺少QtWebEngine运行库时仍可使用
+    QWebEngineController = None
 
-__all__ = ['PlaywrightController', 'QWebEngineController']
\ No newline at end of file
+__all__ = [
+    'BrowserBackend',
+    'RecordingController',
+    'ReplayController',
+    'QWebEngineController',
+]
@@ -0,0 +1,45 @@
+"""
+浏览器后端协议
+
+CrawlerEngine 只通过这里定义的同步接口访问浏览器，
+因此可以在 QWebEngineController 和录制/回放后端之间自由切换。
+"""
+
+from typing import Any, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class BrowserBackend(Protocol):
+    """爬虫引擎使用的浏览器后端接口"""
+
+    def goto_sync(self, url: str) -> bool:
+        """导航到指定URL"""
+        ...
+
+    def get_content_sync(self) -> str:
+        """获取页面HTML内容"""
+        ...
+
+    def get_current_url_sync(self) -> str:
+        """获取当前URL"""
+        ...
+
+    def click_sync(self, selector: str) -> bool:
+        """点击元素"""
+        ...
+
+    def wait_for_navigation_sync(self, timeout: int = 30000):
+        """等待页面导航完成"""
+        ...
+
+    def evaluate_sync(self, script: str, mutates: bool = False) -> Any:
+        """执行JavaScript并返回结果；mutates 表示脚本会改变页面状态"""
+        ...
+
+    def wait_sync(self, ms: int):
+        """等待指定毫秒数"""
+        ...
+
+    def close(self):
+        """关闭浏览器"""
+        ...
@@ -169,6 +169,36 @@ class QWebEngineController(QObject):
             print(f"等待导航失败(sync): {e}")
             return False
 
+    def evaluate_sync(self, script: str, mutates: bool = False):
+        """
+        执行JavaScript并返回结果（同步版本）
+
+        Args:
+            script: JavaScript代码
+            mutates: 脚本是否会改变页面状态（如点击按钮），供录制/回放后端使用
+        """
+        try:
+            loop = QEventLoop()
+            result = [None]
+
+            def on_script_result(script_result):
+                result[0] = script_result
+                loop.quit()
+
+            self.page.runJavaScript(script, on_script_result)
+            loop.exec()
+            return result[0]
+        except Exception as e:
+            print(f"执行JavaScript失败(sync): {e}")
+            return None
+
+    def wait_sync(self, ms: int):
+        """等待指定毫秒数，期间继续处理Qt事件（同步版本）"""
+        from PyQt6.QtCore import QTimer
+        loop = QEventLoop()
+        QTimer.singleShot(ms, loop.quit)
+        loop.exec()
+
     # 保留异步方法以保持兼容性
     async def wait_for_selector(self, selector: str, timeout: int = 10000) -> bool:
         """等待元素出现"""
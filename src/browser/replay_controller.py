@@ -0,0 +1,204 @@
+"""
+录制/回放浏览器后端
+
+RecordingController 包装任意浏览器后端，把每次调用的返回值（结果列表、分页状态、
+加载状态等）和耗时写入JSON Lines录制文件；ReplayController 不依赖Chromium，
+按录制顺序返回这些结果，可以按原始耗时回放，也可以不等待地全速回放。
+"""
+
+import hashlib
+import json
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Tuple
+
+from .backend import BrowserBackend
+
+RECORDING_VERSION = 1
+
+
+def _call_key(value: str) -> str:
+    """生成调用参数的稳定键（脚本内容可能很长，只保存摘要）"""
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+
+class RecordingController:
+    """
+    录制后端
+
+    每次调用都会记录所在的“页面状态纪元”(epoch)。导航、点击以及 mutates=True 的脚本
+    会改变页面状态并使纪元加一，回放时据此把结果对应回正确的页面状态。
+    """
+
+    def __init__(self, inner: BrowserBackend, path: str):
+        """
+        Args:
+            inner: 实际执行调用的浏览器后端
+            path: 录制文件路径（JSON Lines）
+        """
+        self.inner = inner
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.epoch = 0
+        self._file = None
+        self._write({
+            "type": "header",
+            "version": RECORDING_VERSION,
+            "created_at": datetime.now().isoformat(),
+        })
+
+    def _write(self, event: Dict):
+        """追加一条录制事件"""
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def _record(self, op: str, key: str, func, *args, mutates: bool = False):
+        """执行调用并记录结果和耗时"""
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._write({
+            "type": "call",
+            "op": op,
+            "key": key,
+            "epoch": self.epoch,
+            "result": result,
+            "elapsed_ms": round(elapsed_ms, 3),
+        })
+        if mutates:
+            self.epoch += 1
+        return result
+
+    def goto_sync(self, url: str) -> bool:
+        return self._record("goto", url, self.inner.goto_sync, url, mutates=True)
+
+    def get_content_sync(self) -> str:
+        return self._record("content", "", self.inner.get_content_sync)
+
+    def get_current_url_sync(self) -> str:
+        return self._record("url", "", self.inner.get_current_url_sync)
+
+    def click_sync(self, selector: str) -> bool:
+        return self._record("click", selector, self.inner.click_sync, selector, mutates=True)
+
+    def wait_for_navigation_sync(self, timeout: int = 30000):
+        return self._record("navigation", "", self.inner.wait_for_navigation_sync, timeout)
+
+    def evaluate_sync(self, script: str, mutates: bool = False) -> Any:
+        return self._record(
+            "evaluate", _call_key(script), self.inner.evaluate_sync, script, mutates, mutates=mutates
+        )
+
+    def wait_sync(self, ms: int):
+        self.inner.wait_sync(ms)
+
+    def close(self):
+        """关闭被包装的后端并结束当前录制文件的写入"""
+        result = self.inner.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return result
+
+
+def load_recording(path: str) -> List[Dict]:
+    """读取录制文件中的调用事件"""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get("type") == "header":
+                if event.get("version", RECORDING_VERSION) > RECORDING_VERSION:
+                    raise ValueError(f"不支持的录制文件版本: {event.get('version')}")
+                continue
+            events.append(event)
+    return events
+
+
+class ReplayController:
+    """
+    回放后端
+
+    按 (纪元, 操作, 参数) 分组依次返回录制结果。同一纪元内的轮询次数与录制时不同也能正确回放：
+    队列耗尽后重复该纪元的最后一个结果，多余的录制结果在纪元推进时丢弃。
+    """
+
+    def __init__(self, path: str, speed: float = 0.0):
+        """
+        Args:
+            path: 录制文件路径
+            speed: 时间倍率。1.0 按录制时的耗时和引擎等待时间回放，0 表示完全不等待
+        """
+        self.path = path
+        self.speed = speed
+        self.epoch = 0
+        self.stats = {"calls": 0, "misses": 0, "waited_ms": 0.0}
+        self._queues: Dict[Tuple[int, str, str], Deque[Dict]] = {}
+        self._epoch_last: Dict[Tuple[int, str, str], Dict] = {}
+        self._last: Dict[Tuple[str, str], Dict] = {}
+        for event in load_recording(path):
+            queue_key = (event["epoch"], event["op"], event["key"])
+            self._queues.setdefault(queue_key, deque()).append(event)
+
+    def _sleep(self, ms: float):
+        """按时间倍率等待"""
+        if self.speed > 0 and ms > 0:
+            time.sleep(ms * self.speed / 1000)
+        self.stats["waited_ms"] += ms
+
+    def _serve(self, op: str, key: str, default: Any = None, mutates: bool = False) -> Any:
+        """返回当前纪元下对应调用的录制结果"""
+        self.stats["calls"] += 1
+        queue_key = (self.epoch, op, key)
+        queue = self._queues.get(queue_key)
+        if queue:
+            event = queue.popleft()
+            self._epoch_last[queue_key] = event
+            self._last[(op, key)] = event
+        else:
+            event = self._epoch_last.get(queue_key) or self._last.get((op, key))
+            if event is None:
+                self.stats["misses"] += 1
+
+        if mutates:
+            self.epoch += 1
+
+        if event is None:
+            return default
+        self._sleep(event.get("elapsed_ms", 0.0))
+        return event.get("result")
+
+    def goto_sync(self, url: str) -> bool:
+        return bool(self._serve("goto", url, True, mutates=True))
+
+    def get_content_sync(self) -> str:
+        return self._serve("content", "", "")
+
+    def get_current_url_sync(self) -> str:
+        return self._serve("url", "", "")
+
+    def click_sync(self, selector: str) -> bool:
+        return bool(self._serve("click", selector, False, mutates=True))
+
+    def wait_for_navigation_sync(self, timeout: int = 30000):
+        return self._serve("navigation", "", True)
+
+    def evaluate_sync(self, script: str, mutates: bool = False) -> Any:
+        return self._serve("evaluate", _call_key(script), None, mutates=mutates)
+
+    def wait_sync(self, ms: int):
+        self._sleep(ms)
+
+    def close(self):
+        return True
+
+    def remaining_events(self) -> int:
+        """尚未回放的录制事件数量"""
+        return sum(len(queue) for queue in self._queues.values())
@@ -0,0 +1,2 @@
+# 取值种类很少（几个到几千个）的专利字段：提取时驻留字符串，存储和导出时字典编码
+CATEGORICAL_FIELDS = ("专利类型", "案件状态", "申请人", "主分类号")
@@ -0,0 +1,80 @@
+"""
+完整性校验 - 抓取结束后核对收集到的记录数与查询结果总数
+
+根据 totalResults 和每页条数推算每一页应有的记录数，找出记录不足的页（加载不完整）
+和未抓取到的页（翻页中断），CrawlerEngine 只重新获取这些页，而不是重新抓取全部页面。
+"""
+
+import re
+from typing import Dict, Optional
+
+
+def parse_total_results(value) -> int:
+    """解析结果总数（如 "1,234"、"共 1234 条"），无法解析时返回0"""
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r"[,，\s]", "", str(value or ""))
+    match = re.search(r"\d+", digits)
+    return int(match.group(0)) if match else 0
+
+
+def expected_page_size(total_results: int, page: int, page_size: int) -> int:
+    """某一页应有的记录数"""
+    return max(0, min(page_size, total_results - (page - 1) * page_size))
+
+
+def verify_completeness(
+    total_results: int,
+    page_counts: Dict[int, int],
+    unique_records: int,
+    page_size: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> Dict:
+    """
+    校验抓取结果是否完整
+
+    Args:
+        total_results: 查询结果总数
+        page_counts: 页码 -> 该页最近一次获取到的记录数
+        unique_records: 去重后的记录数
+        page_size: 每页条数，未提供时取各页记录数的最大值
+        max_pages: 抓取页数上限，超出上限的页不计为缺失
+
+    Returns:
+        校验报告，short_pages / missing_pages 为需要重新获取的页码
+    """
+    if not page_size:
+        page_size = max(page_counts.values(), default=0)
+    if total_results <= 0 or page_size <= 0:
+        return {
+            "total_results": total_results,
+            "collected": unique_records,
+            "page_size": page_size,
+            "expected_pages": 0,
+            "short_pages": [],
+            "missing_pages": [],
+            "missing_records": 0,
+            "complete": True,
+        }
+
+    expected_pages = (total_results + page_size - 1) // page_size
+    checked_pages = min(expected_pages, max_pages) if max_pages else expected_pages
+    short_pages = []
+    missing_pages = []
+    for page in range(1, checked_pages + 1):
+        if page not in page_counts:
+            missing_pages.append(page)
+        elif page_counts[page] < expected_page_size(total_results, page, page_size):
+            short_pages.append(page)
+
+    expected_records = min(total_results, checked_pages * page_size)
+    return {
+        "total_results": total_results,
+        "collected": unique_records,
+        "page_size": page_size,
+        "expected_pages": expected_pages,
+        "short_pages": short_pages,
+        "missing_pages": missing_pages,
+        "missing_records": max(0, expected_records - unique_records),
+        "complete": not short_pages and not missing_pages and unique_records >= expected_records,
+    }
@@ -4,29 +4,75 @@
 
 import asyncio
 import time
-import uuid
-from typing import List, Dict, Optional, Callable
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, TYPE_CHECKING
 # from src.browser.playwright_controller import PlaywrightController
-from src.browser.qwebengine_controller import QWebEngineController
+from src.browser.backend import BrowserBackend
+from src.browser.replay_controller import RecordingController
 from src.crawler.data_extractor import DataExtractor
-from src.crawler.data_exporter import DataExporter
-from ..database.models import Database, CrawlStrategy, FormConfig
+from src.crawler.completeness import parse_total_results, verify_completeness
+from src.crawler.data_exporter import FORMAT_KEYS, DataExporter
+from src.crawler.dedup import DedupEngine
+from src.crawler.export_sinks import RowSink
+from src.crawler.extraction_plan import ExtractionPlan
+from src.crawler.progress import CrawlMetrics
+from src.crawler.page_archive import PageArchive
+from src.crawler.record_store import RecordStore
+from src.crawler.streaming_extractor import iter_table_info
+from src.crawler.patent_parser import parse_patent_info, parse_patent_info_text, extract_table_info
+from ..database.models import Database, CrawlStrategy, CrawlTask, FormConfig
+
+
+if TYPE_CHECKING:
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
 
 
 class CrawlerEngine:
     """爬虫引擎"""
 
-    def __init__(self, web_view: Optional[QWebEngineView] = None):
-        """初始化爬虫引擎"""
-        # 根据是否提供web_view决定使用哪种浏览器控制器
-        if web_view:
+    def __init__(
+        self,
+        web_view: Optional["QWebEngineView"] = None,
+        browser: Optional[BrowserBackend] = None,
+        exporter: Optional[DataExporter] = None,
+    ):
+        """
+        初始化爬虫引擎
+
+        Args:
+            web_view: QWebEngineView实例，提供时使用QWebEngineController
+            browser: 直接指定浏览器后端（如回放后端），优先于web_view
+            exporter: 流式写入使用的数据导出器（如主窗口共用的导出器），默认新建
+        """
+        # 根据参数决定使用哪种浏览器后端
+        self.browser: Optional[BrowserBackend] = browser
+        if self.browser is None and web_view:
+            from src.browser.qwebengine_controller import QWebEngineController
             self.browser = QWebEngineController(web_view)
         
         self.extractor = DataExtractor()
-        self.exporter = DataExporter()
+        self.exporter = exporter or DataExporter()
         self.is_running = False
         self.is_paused = False
+        # 完整进度事件，UI只接收合并后的快照
+        self.metrics = CrawlMetrics()
+        # 可选的结果页归档，用于离线重新提取
+        self.archive: Optional[PageArchive] = None
+        # 本次抓取的提取计划，start_crawl 时由页面配置编译一次
+        self.plan: Optional[ExtractionPlan] = None
+        self.dedup = DedupEngine()
+        self.completeness: Optional[Dict] = None
+        # 抓取过程中的流式写入器（格式 -> 写入器）及定稿后的文件路径（格式 -> 路径）
+        self.sinks: Dict[str, RowSink] = {}
+        self.stream_paths: Dict[str, str] = {}
+        # 降级写入的格式 -> 实际写入的格式（缺少依赖时 Excel、Parquet 写入CSV）
+        self.stream_aliases: Dict[str, str] = {}
+        # 设置任务模型后，start_crawl(task_id=...) 更新任务状态；策略启用 store_results 时把每页新记录写入该任务的结果表
+        self.task_model: Optional[CrawlTask] = None
+        self.task_id: Optional[str] = None
+        self.store_results = False
+        # 策略配置了 record_dir 时本次抓取的浏览器交互录制文件，可用 ReplayController 回放
+        self.recording_path: Optional[str] = None
         
         # 数据库相关初始化
         self.db = Database()
@@ -42,9 +88,8 @@ class CrawlerEngine:
             # 按钮点击翻页
             next_button_selector = pagination_params.get("next_button_selector", ".next-page")
             
-            # 检查按钮是否存在且可点击
-            html = self.browser.get_content_sync()
-            if not self.extractor.check_element_exists(html, next_button_selector):
+            # 检查按钮是否存在且可点击（直接在页面中查询，无需拉取整页HTML）
+            if not self._check_element_exists_sync(next_button_selector):
                 return False
             
             # 点击下一页按钮
@@ -53,10 +98,7 @@ class CrawlerEngine:
                 # 等待导航完成
                 self.browser.wait_for_navigation_sync()
                 # 等待页面加载
-                from PyQt6.QtCore import QEventLoop, QTimer
-                loop = QEventLoop()
-                QTimer.singleShot(1000, loop.quit)
-                loop.exec()
+                self.browser.wait_sync(1000)
             return success
         
         elif pagination_type == "url":
@@ -74,6 +116,8 @@ class CrawlerEngine:
     ) -> List[Dict]:
         """抓取链接页面数据（同步版本）"""
         link_data = []
+        # 所有子页面共用同一个编译好的提取计划
+        plan = self.plan or ExtractionPlan.from_page_config(page_config)
         
         # 从主数据中提取链接
         links = []
@@ -92,19 +136,23 @@ class CrawlerEngine:
                 self.browser.goto_sync(link)
                 
                 # 等待页面加载
-                from PyQt6.QtCore import QEventLoop, QTimer
-                loop = QEventLoop()
-                QTimer.singleShot(1000, loop.quit)
-                loop.exec()
+                self.browser.wait_sync(1000)
                 
                 html = self.browser.get_content_sync()
                 
                 # 提取子页面数据
-                sub_data = self.extractor.extract_table_data(
+                # 大页面可启用流式提取，不构建整棵文档树
+                extract = (
+                    self.extractor.iter_table_data
+                    if strategy.get("streaming_extraction")
+                    else self.extractor.extract_table_data
+                )
+                sub_data = list(extract(
                     html,
                     page_config.get("table_selector", ""),
                     page_config.get("field_mappings", {}),
-                )
+                    plan=plan,
+                ))
                 
                 for record in sub_data:
                     record["_source_url"] = link
@@ -137,6 +185,49 @@ class CrawlerEngine:
         """停止抓取"""
         self.is_running = False
     
+    @staticmethod
+    def _new_record_store(strategy: Dict) -> RecordStore:
+        """按策略中的内存预算（memory_budget_mb）创建记录存储，超出预算时溢写到 spill_dir"""
+        budget_mb = strategy.get("memory_budget_mb")
+        memory_budget = int(budget_mb * 1024 * 1024) if budget_mb else None
+        return RecordStore(memory_budget=memory_budget, spill_dir=strategy.get("spill_dir"))
+
+    def _open_sinks(self, strategy: Dict):
+        """
+        按策略打开流式写入器
+
+        缺少 xlsxwriter / pyarrow 时 Excel、Parquet 降级为CSV；不支持流式写入的格式抛出 ValueError，
+        此时已打开的写入器已关闭并删除。
+        """
+        keys = [FORMAT_KEYS.get(fmt.lower(), fmt.lower()) for fmt in strategy.get("stream_formats") or []]
+        if strategy.get("stream_csv"):
+            keys.insert(0, "csv")
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        filename = strategy.get("stream_name") or self.exporter.generate_filename("crawl")
+        # export_compression（gzip / zstd）只作用于支持压缩的格式（CSV、JSON、JSON Lines）
+        self.sinks, self.stream_aliases = self.exporter.open_sinks(
+            keys, filename, strategy.get("export_compression")
+        )
+        for fmt, sink in self.sinks.items():
+            print(f"📝 流式写入{fmt}: {sink.part_path}")
+
+    def _write_sinks(self, records: List):
+        """把一页新记录写入所有流式写入器（只规范化一次）"""
+        if not self.sinks or not records:
+            return
+        start = next(iter(self.sinks.values())).rows_written + 1
+        rows = self.exporter.normalizer.normalize(records, start=start)
+        for sink in self.sinks.values():
+            sink.write_records(records, rows)
+
+    def _store_results(self, records: List):
+        """把一页新记录写入任务结果表（一页一个事务，低基数字段保存为查找表ID）"""
+        if not self.store_results or not records:
+            return
+        self.task_model.add_results(self.task_id, records)
+
     def start_crawl(
         self,
         start_url: str,
@@ -145,7 +236,8 @@ class CrawlerEngine:
         form_data: Optional[Dict] = {},
         page_config_id: Optional[int] = None,
         progress_callback: Optional[Callable] = None,
-    ) -> List[Dict]:
+        task_id: Optional[str] = None,
+    ) -> RecordStore:
         """
         开始基于表单查询的抓取任务（同步版本）
         
@@ -156,18 +248,44 @@ class CrawlerEngine:
             form_data: 表单数据，包含输入字段和查询按钮配置
             page_config_id: 页面配置ID，用于加载表单配置
             progress_callback: 进度回调函数
+            task_id: 抓取任务ID，设置了 task_model 时更新任务状态，策略启用 store_results 时逐页保存结果
             
         Returns:
-            抓取的数据列表
+            抓取的数据（列式存储，可按 list-of-dicts 方式遍历）
         """
         self.is_running = True
         self.is_paused = False
-        
-        all_data = []
-        current_page = 1
-        max_pages = strategy.get("max_pages", 100)
+        # 每次抓取重新设置，初始化失败时 finally 中只清理本次已创建的资源
+        self.archive = None
+        self.sinks = {}
+        self.stream_paths = {}
+        self.stream_aliases = {}
+        self.task_id = task_id if self.task_model is not None else None
+        self.store_results = self.task_id is not None and bool(strategy.get("store_results"))
+        self.recording_path = None
+        browser = self.browser
 
         try:
+            # 策略中配置了录制目录时，本次抓取的浏览器交互写入录制文件，结束后恢复原后端
+            if strategy.get("record_dir"):
+                name = strategy.get("stream_name") or self.exporter.generate_filename("crawl")
+                self.recording_path = str(Path(strategy["record_dir"]) / f"{name}.jsonl")
+                self.browser = RecordingController(browser, self.recording_path)
+                print(f"🎬 录制浏览器交互: {self.recording_path}")
+
+            if self.task_id is not None:
+                self.task_model.update_status(self.task_id, "running")
+
+            # 策略中配置了归档目录时启用页面归档，未配置时不沿用上一次的归档
+            if strategy.get("archive_dir"):
+                self.archive = PageArchive(strategy["archive_dir"])
+
+            # 页面配置（字段映射、清洗规则）每次抓取只编译一次，所有页共用
+            self.plan = ExtractionPlan.from_page_config(page_config)
+
+            # 策略中配置了 stream_formats（或 stream_csv）时，抓取过程中逐页写入这些格式
+            self._open_sinks(strategy)
+
             # 点击查询按钮
             # 优先使用表单配置中的查询按钮选择器和JavaScript定位函数
             search_button_selector = form_data.get("search_button_selector", "")
@@ -202,13 +320,32 @@ class CrawlerEngine:
             all_data = self._get_all_pages_results_sync(
                 page_config, strategy, form_data, progress_callback
             )
+
+            for fmt, sink in self.sinks.items():
+                self.stream_paths[fmt] = sink.close()
+                print(f"💾 已写入{fmt}: {self.stream_paths[fmt]}")
+            for fmt, written_as in self.stream_aliases.items():
+                self.stream_paths[fmt] = self.stream_paths[written_as]
+
+            if self.task_id is not None:
+                self.task_model.update_status(
+                    self.task_id, "completed", len(self.dedup.page_stats), len(all_data)
+                )
             
         except Exception as e:
             import traceback
             traceback.print_exc()
+            if self.task_id is not None:
+                self.task_model.update_status(self.task_id, "failed", len(self.dedup.page_stats))
             raise Exception(f"抓取过程出错: {e}")
         finally:
+            for sink in self.sinks.values():
+                if sink.is_open:
+                    print(f"⚠️ 抓取未完成，已写入的数据保留在: {sink.abort()}")
+            if self.archive is not None:
+                self.archive.close()
             self.browser.close()
+            self.browser = browser
             self.is_running = False
         
         return all_data
@@ -216,34 +353,21 @@ class CrawlerEngine:
     def _fill_form_field_sync(self, selector: str, value: str) -> bool:
         """填充表单字段（同步版本）"""
         try:
-            # 先尝试直接填写
-            if isinstance(self.browser, QWebEngineController):
-                # 使用JavaScript直接设置值并触发事件
-                safe_selector = selector.replace("'", "\\'")
-                safe_value = value.replace("'", "\\'")
-                js_code = "(function() { " \
-                         "const element = document.querySelector('" + safe_selector + "'); " \
-                         "if (element) { " \
-                         "element.value = '" + safe_value + "'; " \
-                         "element.dispatchEvent(new Event('input', { bubbles: true })); " \
-                         "element.dispatchEvent(new Event('change', { bubbles: true })); " \
-                         "return true; " \
-                         "}" \
-                         "return false; " \
-                         "})()"
-                
-                from PyQt6.QtCore import QEventLoop
-                loop = QEventLoop()
-                result = [False]
-                
-                def on_script_result(filled):
-                    result[0] = filled
-                    loop.quit()
-                
-                self.browser.page.runJavaScript(js_code, on_script_result)
-                loop.exec()
-                return result[0]
-            return False
+            # 使用JavaScript直接设置值并触发事件
+            safe_selector = selector.replace("'", "\\'")
+            safe_value = value.replace("'", "\\'")
+            js_code = "(function() { " \
+                     "const element = document.querySelector('" + safe_selector + "'); " \
+                     "if (element) { " \
+                     "element.value = '" + safe_value + "'; " \
+                     "element.dispatchEvent(new Event('input', { bubbles: true })); " \
+                     "element.dispatchEvent(new Event('change', { bubbles: true })); " \
+                     "return true; " \
+                     "}" \
+                     "return false; " \
+                     "})()"
+
+            return bool(self.browser.evaluate_sync(js_code, mutates=True))
         except Exception as e:
             print(f"填充表单字段失败: {e}")
             return False
@@ -257,46 +381,31 @@ class CrawlerEngine:
             if js_function and js_function.strip():
                 print("使用JavaScript定位函数查找查询按钮...")
                 
-                # 检查浏览器类型并执行JavaScript
-                if isinstance(self.browser, QWebEngineController):
-                    from PyQt6.QtCore import QEventLoop
-                    loop = QEventLoop()
-                    result = [False]
-                    
-                    def on_script_result(script_result):
-                        try:
-                            # 解析结果
-                            if isinstance(script_result, dict) and script_result.get('success'):
-                                print(f"✅ JavaScript定位函数成功找到并点击查询按钮")
-                                print(f"  策略: {script_result.get('strategy')}")
-                                button_info = script_result.get('buttonInfo', {})
-                                print(f"  按钮信息: 文本='{button_info.get('text', '').strip()}', 类名='{button_info.get('className', '')}'")
-                                result[0] = True
-                            else:
-                                print(f"❌ JavaScript定位函数未找到查询按钮")
-                                if isinstance(script_result, dict):
-                                    print(f"  错误信息: {script_result.get('message', '未知错误')}")
-                                    print(f"  找到按钮数量: {script_result.get('foundButtons', 0)}")
-                                result[0] = False
-                        except Exception as e:
-                            print(f"处理JavaScript结果时出错: {e}")
-                            result[0] = False
-                        finally:
-                            loop.quit()
-                    
-                    # 执行JavaScript定位函数
-                    self.browser.page.runJavaScript(js_function, on_script_result)
-                    loop.exec()
-                    
-                    if result[0]:
-                        # 等待点击后页面响应
-                        from PyQt6.QtCore import QTimer
-                        loop = QEventLoop()
-                        QTimer.singleShot(1000, loop.quit)
-                        loop.exec()
-                        print("✅ 查询按钮已点击")
-                        return True
-                    print("JavaScript定位函数执行失败，尝试使用内置策略...")
+                # 执行JavaScript定位函数
+                script_result = self.browser.evaluate_sync(js_function, mutates=True)
+                clicked = False
+                try:
+                    # 解析结果
+                    if isinstance(script_result, dict) and script_result.get('success'):
+                        print(f"✅ JavaScript定位函数成功找到并点击查询按钮")
+                        print(f"  策略: {script_result.get('strategy')}")
+                        button_info = script_result.get('buttonInfo', {})
+                        print(f"  按钮信息: 文本='{button_info.get('text', '').strip()}', 类名='{button_info.get('className', '')}'")
+                        clicked = True
+                    else:
+                        print(f"❌ JavaScript定位函数未找到查询按钮")
+                        if isinstance(script_result, dict):
+                            print(f"  错误信息: {script_result.get('message', '未知错误')}")
+                            print(f"  找到按钮数量: {script_result.get('foundButtons', 0)}")
+                except Exception as e:
+                    print(f"处理JavaScript结果时出错: {e}")
+
+                if clicked:
+                    # 等待点击后页面响应
+                    self.browser.wait_sync(1000)
+                    print("✅ 查询按钮已点击")
+                    return True
+                print("JavaScript定位函数执行失败，尝试使用内置策略...")
             
             # 如果没有提供有效的JS函数或执行失败，使用内置的多策略查询按钮定位
             if not js_function or not js_function.strip():
@@ -417,42 +526,28 @@ class CrawlerEngine:
                 """
                 
                 # 执行高级定位JavaScript
-                if isinstance(self.browser, QWebEngineController):
-                    from PyQt6.QtCore import QEventLoop
-                    loop = QEventLoop()
-                    result = [False]
-                    
-                    def on_script_result(script_result):
-                        try:
-                            if isinstance(script_result, dict) and script_result.get('success'):
-                                print(f"✅ 高级定位策略成功找到并点击查询按钮")
-                                print(f"  策略: {script_result.get('strategy')}")
-                                button_info = script_result.get('buttonInfo', {})
-                                print(f"  按钮信息: 文本='{button_info.get('text', '').strip()}', 类名='{button_info.get('className', '')}'")
-                                result[0] = True
-                            else:
-                                print(f"❌ 高级定位策略未找到查询按钮")
-                                if isinstance(script_result, dict):
-                                    print(f"  错误信息: {script_result.get('message', '未知错误')}")
-                                    print(f"  找到按钮数量: {script_result.get('foundButtons', 0)}")
-                                result[0] = False
-                        except Exception as e:
-                            print(f"处理JavaScript结果时出错: {e}")
-                            result[0] = False
-                        finally:
-                            loop.quit()
-                    
-                    self.browser.page.runJavaScript(advanced_js_function, on_script_result)
-                    loop.exec()
-                    
-                    if result[0]:
-                        # 等待点击后页面响应
-                        from PyQt6.QtCore import QTimer
-                        loop = QEventLoop()
-                        QTimer.singleShot(1000, loop.quit)
-                        loop.exec()
-                        print("✅ 查询按钮已点击")
-                        return True
+                script_result = self.browser.evaluate_sync(advanced_js_function, mutates=True)
+                clicked = False
+                try:
+                    if isinstance(script_result, dict) and script_result.get('success'):
+                        print(f"✅ 高级定位策略成功找到并点击查询按钮")
+                        print(f"  策略: {script_result.get('strategy')}")
+                        button_info = script_result.get('buttonInfo', {})
+                        print(f"  按钮信息: 文本='{button_info.get('text', '').strip()}', 类名='{button_info.get('className', '')}'")
+                        clicked = True
+                    else:
+                        print(f"❌ 高级定位策略未找到查询按钮")
+                        if isinstance(script_result, dict):
+                            print(f"  错误信息: {script_result.get('message', '未知错误')}")
+                            print(f"  找到按钮数量: {script_result.get('foundButtons', 0)}")
+                except Exception as e:
+                    print(f"处理JavaScript结果时出错: {e}")
+
+                if clicked:
+                    # 等待点击后页面响应
+                    self.browser.wait_sync(1000)
+                    print("✅ 查询按钮已点击")
+                    return True
             
             # 最后的后备策略 - 使用简单选择器
             strategies = [
@@ -488,8 +583,6 @@ class CrawlerEngine:
             print("\n6️⃣ 等待查询结果加载...")
             print(f"⏳ 等待加载组件消失，监控元素: {loading_selector}")
             
-            from PyQt6.QtCore import QEventLoop, QTimer
-            
             # 最大等待时间
             max_wait_time = 30  # 秒
             check_interval = 500  # 毫秒
@@ -523,32 +616,16 @@ class CrawlerEngine:
                 """ % loading_selector.replace("'", "\\'")
                 
                 # 执行JavaScript检查加载状态
-                loop = QEventLoop()
-                loading_complete = [False]
-                
-                def on_script_result(result):
-                    loading_complete[0] = result
-                    loop.quit()
-                
-                if isinstance(self.browser, QWebEngineController):
-                    self.browser.page.runJavaScript(loading_check_js, on_script_result)
-                    loop.exec()
-                else:
-                    # 降级到简单的元素检查
-                    loading_complete[0] = not self._check_element_exists_sync(loading_selector)
+                loading_complete = self.browser.evaluate_sync(loading_check_js)
                 
-                if loading_complete[0]:
+                if loading_complete:
                     # 再等待一小段时间确保页面完全加载
-                    loop = QEventLoop()
-                    QTimer.singleShot(2000, loop.quit)
-                    loop.exec()
+                    self.browser.wait_sync(2000)
                     print("✅ 查询结果加载完成")
                     return True
                 
                 # 等待下一次检查
-                loop = QEventLoop()
-                QTimer.singleShot(check_interval, loop.quit)
-                loop.exec()
+                self.browser.wait_sync(check_interval)
                 
                 elapsed_time += check_interval
             
@@ -569,17 +646,7 @@ class CrawlerEngine:
                      "return element !== null; " \
                      "})()"
             
-            from PyQt6.QtCore import QEventLoop
-            loop = QEventLoop()
-            result = [False]
-            
-            def on_script_result(exists):
-                result[0] = exists
-                loop.quit()
-            
-            self.browser.page.runJavaScript(js_code, on_script_result)
-            loop.exec()
-            return result[0]
+            return bool(self.browser.evaluate_sync(js_code))
         except Exception as e:
             print(f"检查元素存在性失败: {e}")
             return False
@@ -590,15 +657,18 @@ class CrawlerEngine:
         strategy: Dict,
         form_data: Dict,
         progress_callback: Optional[Callable] = None,
-    ) -> List[Dict]:
+    ) -> RecordStore:
         """获取所有页面的查询结果（同步版本）- 第七步完整实现"""
         print("\n7️⃣ 正在获取查询结果...")
         print("📄 开始获取所有页面数据...")
         
-        all_data = []
+        all_data = self._new_record_store(strategy)
         current_page = 1
         max_pages = strategy.get("max_pages", 100)
-        result_ids = set()  # 用于去重
+        # 按规范化记录键（申请号/专利号）或内容哈希去重
+        self.dedup = DedupEngine.from_strategy(strategy, form_data)
+        # 页码 -> 该页最近一次获取到的记录数（用于完整性校验）
+        page_counts: Dict[int, int] = {}
         
         # 数据收集统计信息
         pagination_stats = {
@@ -608,21 +678,15 @@ class CrawlerEngine:
             'pagesCollected': 0
         }
         
-        # 获取结果ID字段名（用于去重）
-        result_id_field = form_data.get("result_id_field", "申请号")
-        
         while self.is_running and current_page <= max_pages:
             # 检查暂停
             while self.is_paused:
-                from PyQt6.QtCore import QEventLoop, QTimer
-                loop = QEventLoop()
-                QTimer.singleShot(500, loop.quit)  # 等待500ms
-                loop.exec()
+                self.browser.wait_sync(500)  # 等待500ms
 
             print(f"\n📖 正在获取第 {current_page} 页数据...")
             
             # 获取当前页数据
-            page_data = self._get_query_results_sync(page_config)
+            page_data = self._get_query_results_sync(page_config, strategy)
             
             # 如果是第一页，获取分页信息
             if current_page == 1:
@@ -631,15 +695,15 @@ class CrawlerEngine:
                 pagination_stats['totalResults'] = pagination_info.get('totalResults', '0')
             
             # 去重并添加到总数据
-            new_records_count = 0
-            for record in page_data:
-                # 使用ID字段去重
-                record_id = record.get(result_id_field, str(uuid.uuid4()))
-                if record_id not in result_ids:
-                    result_ids.add(record_id)
-                    record["_page_number"] = current_page
-                    all_data.append(record)
-                    new_records_count += 1
+            page_counts[current_page] = len(page_data)
+            new_records = self.dedup.filter_page(page_data, current_page)
+            for record in new_records:
+                record["_page_number"] = current_page
+                all_data.append(record)
+            self._write_sinks(new_records)
+            self._store_results(new_records)
+            new_records_count = len(new_records)
+            duplicates = len(page_data) - new_records_count
             
             # 更新统计信息
             pagination_stats['pagesCollected'] = current_page
@@ -647,6 +711,8 @@ class CrawlerEngine:
             
             print(f"✅ 第 {current_page} 页数据获取成功")
             print(f"  新增数据: {new_records_count} 条")
+            if duplicates:
+                print(f"  重复数据: {duplicates} 条（已丢弃）")
             
             # 回调进度
             if progress_callback:
@@ -696,10 +762,7 @@ class CrawlerEngine:
                 raise Exception("❌ 下一页加载失败")
             
             # 等待页面稳定
-            from PyQt6.QtCore import QEventLoop, QTimer
-            loop = QEventLoop()
-            QTimer.singleShot(2000, loop.quit)  # 增加等待时间确保页面稳定
-            loop.exec()
+            self.browser.wait_sync(2000)  # 增加等待时间确保页面稳定
             
             current_page += 1
         
@@ -709,9 +772,117 @@ class CrawlerEngine:
         print(f"  已收集页数: {pagination_stats['pagesCollected']}")
         print(f"  总结果数: {pagination_stats['totalResults']}")
         print(f"  最终数据条数: {len(all_data)}")
+        print(f"  丢弃重复记录: {self.dedup.stats['duplicates']} 条")
+
+        # 核对结果总数，只重新获取记录不足或缺失的页
+        if self.is_running and strategy.get("verify_completeness", True):
+            self.completeness = self._verify_and_repair_sync(
+                all_data, page_counts, pagination_stats, page_config, strategy, form_data
+            )
         
         print("🎉 所有页面查询结果获取成功！")
         return all_data
+
+    def _verify_and_repair_sync(
+        self,
+        all_data: RecordStore,
+        page_counts: Dict[int, int],
+        pagination_stats: Dict,
+        page_config: Dict,
+        strategy: Dict,
+        form_data: Dict,
+    ) -> Dict:
+        """校验抓取完整性，通过页码按钮直接跳转重新获取不完整的页"""
+        total_results = parse_total_results(pagination_stats['totalResults'])
+        page_size = strategy.get("page_size")
+        max_pages = strategy.get("max_pages", 100)
+        loading_selector = form_data.get("loading_selector", ".q-loading")
+
+        report = verify_completeness(total_results, page_counts, len(all_data), page_size, max_pages)
+        repair_rounds = strategy.get("repair_rounds", 2)
+        while not report["complete"] and repair_rounds > 0 and self.is_running:
+            gap_pages = sorted(report["short_pages"] + report["missing_pages"])
+            if not gap_pages:
+                break
+            repair_rounds -= 1
+            print(f"\n🩹 结果不完整（缺少 {report['missing_records']} 条），重新获取页: {gap_pages}")
+
+            for page in gap_pages:
+                if not self.is_running:
+                    break
+                if not self._goto_page_sync(page, loading_selector):
+                    print(f"❌ 无法跳转到第 {page} 页")
+                    continue
+                page_data = self._get_query_results_sync(page_config, strategy)
+                page_counts[page] = max(page_counts.get(page, 0), len(page_data))
+                new_records = self.dedup.filter_page(page_data, page)
+                for record in new_records:
+                    record["_page_number"] = page
+                    all_data.append(record)
+                self._write_sinks(new_records)
+                self._store_results(new_records)
+                print(f"  第 {page} 页: {len(page_data)} 条，新增 {len(new_records)} 条")
+
+            report = verify_completeness(total_results, page_counts, len(all_data), page_size, max_pages)
+
+        if report["complete"]:
+            print(f"✅ 完整性校验通过: {report['collected']}/{report['total_results']}")
+        else:
+            print(
+                f"⚠️ 完整性校验未通过: {report['collected']}/{report['total_results']}，"
+                f"不完整页 {report['short_pages']}，缺失页 {report['missing_pages']}"
+            )
+        return report
+
+    def _goto_page_sync(self, page: int, loading_selector: str, max_hops: int = 20) -> bool:
+        """
+        点击页码按钮直接跳转到指定页
+
+        目标页码不在当前显示的页码按钮中时，先跳到最接近目标的可见页码，逐步逼近。
+        """
+        goto_page_js = """
+            (function(targetPage) {
+                const paginationContainer = document.querySelector('.q-pagination');
+                if (!paginationContainer) {
+                    return { success: false, message: '未找到分页容器' };
+                }
+                const pageButtons = Array.from(paginationContainer.querySelectorAll('.q-btn'))
+                    .map(btn => ({ btn: btn, page: parseInt(btn.textContent.trim(), 10) }))
+                    .filter(item => !isNaN(item.page));
+                const active = pageButtons.find(item => item.btn.classList.contains('q-btn--standard'));
+                const currentPage = active ? active.page : 1;
+                if (currentPage === targetPage) {
+                    return { success: true, clicked: null, reached: true };
+                }
+
+                let choice = pageButtons.find(item => item.page === targetPage);
+                if (!choice) {
+                    // 目标页码不可见，跳到最接近目标的页码
+                    const candidates = pageButtons.filter(item => targetPage > currentPage
+                        ? item.page > currentPage && item.page < targetPage
+                        : item.page < currentPage && item.page > targetPage);
+                    candidates.sort((a, b) => Math.abs(targetPage - a.page) - Math.abs(targetPage - b.page));
+                    choice = candidates[0];
+                }
+                if (!choice || choice.btn.disabled) {
+                    return { success: false, message: '未找到可跳转的页码按钮' };
+                }
+                choice.btn.click();
+                return { success: true, clicked: choice.page, reached: choice.page === targetPage };
+            })(""" + str(int(page)) + """)
+        """
+
+        for _ in range(max_hops):
+            result = self.browser.evaluate_sync(goto_page_js, mutates=True)
+            if not isinstance(result, dict) or not result.get('success'):
+                return False
+            if result.get('clicked') is None:
+                return True
+            self._wait_for_loading_complete_sync(loading_selector)
+            self.browser.wait_sync(500)
+            if result.get('reached'):
+                return True
+        return False
     
     def _get_pagination_info_sync(self) -> Dict:
         """获取分页信息（同步版本）"""
@@ -774,19 +945,10 @@ class CrawlerEngine:
             """
             
             # 执行JavaScript获取分页信息
-            from PyQt6.QtCore import QEventLoop
-            loop = QEventLoop()
-            result = [{'totalResults': '0', 'currentPage': 1, 'totalPages': 1, 'hasNextPage': False}]
-            
-            def on_script_result(pagination_info):
-                result[0] = pagination_info
-                loop.quit()
-            
-            if isinstance(self.browser, QWebEngineController):
-                self.browser.page.runJavaScript(pagination_js, on_script_result)
-                loop.exec()
-            
-            return result[0]
+            pagination_info = self.browser.evaluate_sync(pagination_js)
+            if not isinstance(pagination_info, dict):
+                return {'totalResults': '0', 'currentPage': 1, 'totalPages': 1, 'hasNextPage': False}
+            return pagination_info
         except Exception as e:
             print(f"获取分页信息失败: {e}")
             return {'totalResults': '0', 'currentPage': 1, 'totalPages': 1, 'hasNextPage': False}
@@ -836,185 +998,40 @@ class CrawlerEngine:
             """
             
             # 执行JavaScript点击下一页
-            from PyQt6.QtCore import QEventLoop
-            loop = QEventLoop()
-            result = [{'success': False, 'message': '执行失败'}]
-            
-            def on_script_result(click_result):
-                result[0] = click_result
-                loop.quit()
-            
-            if isinstance(self.browser, QWebEngineController):
-                self.browser.page.runJavaScript(next_page_js, on_script_result)
-                loop.exec()
-            
-            return result[0]
+            click_result = self.browser.evaluate_sync(next_page_js, mutates=True)
+            if not isinstance(click_result, dict):
+                return {'success': False, 'message': '执行失败'}
+            return click_result
         except Exception as e:
             print(f"点击下一页失败: {e}")
             return {'success': False, 'message': str(e)}
     
     def _parse_patent_info(self, info_html):
         """解析专利信息HTML"""
-        import re
-        patent_data = {}
-        
-        # 如果传入的是纯文本，使用更精确的纯文本解析
-        if not info_html.startswith('<'):
-            return self._parse_patent_info_text(info_html)
-        
-        # 对于HTML格式，我们使用更精确的HTML标签结构来提取字段
-        # 提取申请号/专利号
-        app_number_match = re.search(r'申请号/专利号：\s*</span>\s*<span[^>]*class="hover_active"[^>]*>([^<]*)</span>', info_html)
-        if app_number_match:
-            patent_data['专利号'] = app_number_match.group(1).strip()
-        
-        # 提取发明名称
-        invention_name_match = re.search(r'发明名称：<span[^>]*>([^<]*)</span>', info_html)
-        if invention_name_match:
-            patent_data['专利名称'] = invention_name_match.group(1).strip()
-        
-        # 提取申请人
-        applicant_match = re.search(r'申请人：([^<]*)(?=<span|</span>|$)', info_html)
-        if applicant_match:
-            applicant_text = applicant_match.group(1).strip()
-            # 清理可能包含的HTML标签
-            applicant_text = re.sub(r'<[^>]+>', '', applicant_text).strip()
-            patent_data['申请人'] = applicant_text
-        
-        # 提取专利类型
-        patent_type_match = re.search(r'专利类型：([^<]*)(?=<span|</span>|$)', info_html)
-        if patent_type_match:
-            patent_type_text = patent_type_match.group(1).strip()
-            patent_type_text = re.sub(r'<[^>]+>', '', patent_type_text).strip()
-            patent_data['专利类型'] = patent_type_text
-        
-        # 提取申请日
-        application_date_match = re.search(r'申请日：([^<]*)(?=<span|</span>|$)', info_html)
-        if application_date_match:
-            application_date_text = application_date_match.group(1).strip()
-            application_date_text = re.sub(r'<[^>]+>', '', application_date_text).strip()
-            patent_data['申请日期'] = application_date_text
-        
-        # 提取发明专利申请公布号
-        publication_number_match = re.search(r'发明专利申请公布号：([^<]*)(?=<span|</span>|$)', info_html)
-        if publication_number_match:
-            publication_number_text = publication_number_match.group(1).strip()
-            publication_number_text = re.sub(r'<[^>]+>', '', publication_number_text).strip()
-            patent_data['公布号'] = publication_number_text
-        
-        # 提取授权公告号
-        grant_number_match = re.search(r'授权公告号：([^<]*)(?=<span|</span>|$)', info_html)
-        if grant_number_match:
-            grant_number_text = grant_number_match.group(1).strip()
-            grant_number_text = re.sub(r'<[^>]+>', '', grant_number_text).strip()
-            patent_data['授权公告号'] = grant_number_text
-        
-        # 提取案件状态
-        case_status_match = re.search(r'案件状态：([^<]*)(?=<span|</span>|$)', info_html)
-        if case_status_match:
-            case_status_text = case_status_match.group(1).strip()
-            case_status_text = re.sub(r'<[^>]+>', '', case_status_text).strip()
-            patent_data['案件状态'] = case_status_text
-        
-        # 提取授权公告日 - 使用更通用的匹配模式
-        grant_date_match = re.search(r'授权公告日：([^<]*)(?=<span|</span>|$)', info_html)
-        if grant_date_match:
-            grant_date_text = grant_date_match.group(1).strip()
-            grant_date_text = re.sub(r'<[^>]+>', '', grant_date_text).strip()
-            patent_data['授权公告日'] = grant_date_text
-        
-        # 提取主分类号 - 使用更通用的匹配模式
-        main_class_match = re.search(r'主分类号：([^<]*)(?=<span|</span>|$)', info_html)
-        if main_class_match:
-            main_class_text = main_class_match.group(1).strip()
-            main_class_text = re.sub(r'<[^>]+>', '', main_class_text).strip()
-            patent_data['主分类号'] = main_class_text
-
-        # 如果HTML解析失败，回退到纯文本解析
-        if not patent_data:
-            clean_text = re.sub(r'<[^>]+>', ' ', info_html)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            patent_data = self._parse_patent_info_text(clean_text)
-        
-        return patent_data
+        return parse_patent_info(info_html)
     
     def _parse_patent_info_text(self, info_text):
         """解析纯文本格式的专利信息"""
-        import re
-        patent_data = {}
-        
-        # 提取申请号/专利号
-        app_number_match = re.search(r'申请号/专利号：\s*([^\s]+)', info_text)
-        if app_number_match:
-            patent_data['专利号'] = app_number_match.group(1).strip()
-        
-        # 提取发明名称
-        invention_name_match = re.search(r'发明名称：([^申]+?)(?=\s*申请人：|\s*专利类型：|$)', info_text)
-        if invention_name_match:
-            patent_data['专利名称'] = invention_name_match.group(1).strip()
-        
-        # 提取申请人
-        applicant_match = re.search(r'申请人：([^专]+?)(?=\s*专利类型：|\s*申请日：|$)', info_text)
-        if applicant_match:
-            patent_data['申请人'] = applicant_match.group(1).strip()
-        
-        # 提取专利类型
-        patent_type_match = re.search(r'专利类型：([^申]+?)(?=\s*申请日：|\s*发明专利申请公布号：|$)', info_text)
-        if patent_type_match:
-            patent_data['专利类型'] = patent_type_match.group(1).strip()
-        
-        # 提取申请日
-        application_date_match = re.search(r'申请日：\s*([^\s]+)', info_text)
-        if application_date_match:
-            patent_data['申请日期'] = application_date_match.group(1).strip()
-        
-        return patent_data
+        return parse_patent_info_text(info_text)
     
     def _extract_table_info(self, result_data):
         """从查询结果中提取table_info结构化数据"""
-        import re
-        table_info_list = []
-        
-        # 检查是否有tableInfoData字段
-        if 'tableInfoData' in result_data and result_data['tableInfoData']:
-            for table_info in result_data['tableInfoData']:
-                info_html = table_info.get('html', '')
-                patent_data = self._parse_patent_info(info_html)
-                patent_data['raw_text'] = table_info.get('text', '')
-                # 添加元数据
-                patent_data['_source_url'] = result_data.get('url', '')
-                patent_data['_page_title'] = result_data.get('pageTitle', '')
-                table_info_list.append(patent_data)
-        
-        # 如果没有新的tableInfoData，尝试从tableContent中提取
-        elif 'resultInfo' in result_data and 'tableContent' in result_data['resultInfo']:
-            table_content = result_data['resultInfo']['tableContent']
-            
-            # 使用正则表达式从tableContent中提取table_info块
-            table_info_pattern = r'<div[^>]*class="table_info"[^>]*>(.*?)</div>'
-            table_info_matches = re.findall(table_info_pattern, table_content, re.DOTALL)
-            
-            for table_info_html in table_info_matches:
-                # 提取纯文本内容
-                info_text = re.sub(r'<[^>]+>', ' ', table_info_html)
-                info_text = re.sub(r'\s+', ' ', info_text).strip()
-                
-                patent_data = self._parse_patent_info(table_info_html)
-                patent_data['raw_text'] = info_text
-                # 添加元数据
-                patent_data['_source_url'] = result_data.get('url', '')
-                patent_data['_page_title'] = result_data.get('pageTitle', '')
-                table_info_list.append(patent_data)
-        
-        return table_info_list
+        return extract_table_info(result_data)
     
-    def _get_query_results_sync(self, page_config: Dict) -> List[Dict]:
-        """获取当前页的查询结果（同步版本）"""
+    def _get_query_results_sync(self, page_config: Dict, strategy: Optional[Dict] = None) -> List[Dict]:
+        """
+        获取当前页的查询结果（同步版本）
+
+        策略启用 streaming_extraction 时，浏览器只返回结果列表HTML（不逐元素序列化、不带整页HTML），
+        由 iter_table_info 流式解析，不构建整棵文档树。
+        """
         print("\n🔄 正在获取查询结果...")
+        streaming = bool((strategy or {}).get("streaming_extraction"))
         
         # 构建JavaScript代码获取查询结果
         js_code = """
             (function() {
+                const streaming = """ + ("true" if streaming else "false") + """;
                 // 获取查询结果信息
                 const resultInfo = {
                     totalResults: document.querySelector('.total strong') ? document.querySelector('.total strong').textContent : '0',
@@ -1023,14 +1040,14 @@ class CrawlerEngine:
                 };
                 
                 // 获取所有可见的表格数据
-                const tableRows = document.querySelectorAll('.tableList tr, .tableList .row');
+                const tableRows = streaming ? [] : document.querySelectorAll('.tableList tr, .tableList .row');
                 const tableData = Array.from(tableRows).map(row => ({
                     html: row.outerHTML,
                     text: row.textContent.trim()
                 }));
                 
                 // 获取所有table_info数据
-                const tableInfoElements = document.querySelectorAll('.table_info');
+                const tableInfoElements = streaming ? [] : document.querySelectorAll('.table_info');
                 const tableInfoData = Array.from(tableInfoElements).map(info => ({
                     html: info.outerHTML,
                     text: info.textContent.trim()
@@ -1040,7 +1057,7 @@ class CrawlerEngine:
                     resultInfo: resultInfo,
                     tableData: tableData,
                     tableInfoData: tableInfoData,
-                    fullPageHTML: document.documentElement.outerHTML,
+                    fullPageHTML: streaming ? '' : document.documentElement.outerHTML,
                     pageTitle: document.title,
                     url: window.location.href
                 };
@@ -1049,28 +1066,15 @@ class CrawlerEngine:
         
         # 执行JavaScript获取结果
         try:
-            from PyQt6.QtCore import QEventLoop
-            loop = QEventLoop()
-            result = [None]
-            
-            def on_script_result(script_result):
-                result[0] = script_result
-                loop.quit()
-            
-            # 检查浏览器类型并执行JavaScript
-            if isinstance(self.browser, QWebEngineController):
-                self.browser.page.runJavaScript(js_code, on_script_result)
-                loop.exec()
-            else:
-                print("❌ 不支持的浏览器类型")
-                return []
-            
-            # 获取JavaScript执行结果
-            result_data = result[0]
+            result_data = self.browser.evaluate_sync(js_code)
             if not result_data:
                 print("❌ JavaScript执行失败或返回空结果")
                 return []
             
+            # 归档结果页的相关HTML
+            if self.archive is not None:
+                self.archive.add(result_data)
+
             # 显示JavaScript执行结果摘要
             print("\n📊 JavaScript提取结果摘要:")
             if 'resultInfo' in result_data:
@@ -1080,7 +1084,19 @@ class CrawlerEngine:
             if 'tableInfoData' in result_data:
                 print(f"   - 详情信息数: {len(result_data['tableInfoData'])}")
             # 提取结构化数据
-            table_info_list = self._extract_table_info(result_data)
+            if streaming:
+                result_info = result_data.get("resultInfo") or {}
+                table_content = result_info.get("tableContent") or result_data.get("fullPageHTML") or ""
+                table_info_list = list(iter_table_info(
+                    table_content,
+                    page_url=result_data.get("url", ""),
+                    page_title=result_data.get("pageTitle", ""),
+                ))
+            else:
+                table_info_list = self._extract_table_info(result_data)
+            # 按页面配置的清洗规则批量清洗
+            if self.plan is not None:
+                self.plan.batch_cleaner.clean(table_info_list)
             
             # 打印提取的结构化数据信息
             print(f"\n📋 结构化数据提取结果:")
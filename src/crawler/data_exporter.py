@@ -1,177 +1,485 @@
 """
 数据导出器 - 支持多种格式导出
+
+export_multi_format 单次遍历记录，分块规范化后同时写入所有格式，按格式回调进度，可通过 threading.Event 取消。
+多核时每种格式在各自的线程中写入：gzip / zstd 压缩、pyarrow 编码和文件写入、fsync 期间释放 GIL，
+可与下一块的规范化并行。
 """
 
-import csv
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
 from datetime import datetime
 
+from src.crawler.export_sinks import (
+    COMPRESSION_SUFFIXES,
+    SINKS,
+    CsvSink,
+    ExcelSink,
+    JsonSink,
+    JsonlSink,
+    ParquetSink,
+    RowSink,
+    normalize_compression,
+)
+from src.crawler.incremental import MasterDataset, safe_name
+from src.crawler.normalizer import RecordNormalizer
+from src.crawler.record_store import RecordStore
+
+if TYPE_CHECKING:
+    from src.database.models import CrawlTask
+
+
+# 分块写出的行数：每块写完后回调进度并检查是否取消
+EXPORT_CHUNK_ROWS = 5000
+
+# 导出格式 -> 结果键
+FORMAT_KEYS = {
+    "csv": "csv",
+    "json": "json",
+    "jsonl": "jsonl",
+    "excel": "excel",
+    "xlsx": "excel",
+    "parquet": "parquet",
+    "text": "text",
+    "txt": "text",
+}
+
+# 需要规范化导出列的格式
+NORMALIZED_FORMATS = ("csv", "excel", "parquet")
+
+Checkpoint = Callable[[int], None]
+
+
+class ExportCancelled(Exception):
+    """导出已取消"""
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    """按块读取（适用于列表、RecordStore 等可迭代对象）"""
+    if isinstance(items, RecordStore):
+        # 已溢写的记录逐段读回，不会整体加载到内存
+        yield from items.iter_chunks(size)
+        return
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
 
 class DataExporter:
     """数据导出器"""
 
-    def __init__(self, export_dir: str = "data/exports"):
-        """初始化导出器"""
+    def __init__(
+        self,
+        export_dir: str = "data/exports",
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        初始化导出器
+
+        Args:
+            export_dir: 导出目录
+            compression: CSV、JSON、JSON Lines 写入时压缩（gzip / zstd），文件名追加 .gz / .zst
+            compression_level: 压缩级别
+        """
         self.export_dir = Path(export_dir)
         self.export_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = normalize_compression(compression)
+        self.compression_level = compression_level
+        # 导出列解析器只编译一次
+        self.normalizer = RecordNormalizer()
+        # 同一导出器可能被多个后台导出任务共用：同一秒内生成的文件名追加序号，
+        # 同一站点的增量合并串行执行
+        self._lock = threading.Lock()
+        self._filename_second = ""
+        self._filename_counts: Dict[str, int] = {}
+        self._site_locks: Dict[str, threading.Lock] = {}
+
+    def _write_sink(
+        self,
+        sink: RowSink,
+        records: Iterable[Mapping],
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> str:
+        """
+        分块写入流式写入器（需要规范化的格式由写入器逐块规范化），每块写完后调用 checkpoint
+
+        Args:
+            sink: 未打开的写入器
+            records: 原始记录
+            checkpoint: 进度检查点，抛出 ExportCancelled 时删除未完成的文件
+        """
+        try:
+            with sink:
+                for chunk in _chunks(records, EXPORT_CHUNK_ROWS):
+                    sink.write_records(chunk)
+                    if checkpoint:
+                        checkpoint(sink.rows_written)
+        except ExportCancelled:
+            sink.part_path.unlink(missing_ok=True)
+            raise
+        return str(sink.filepath)
 
-    def export_to_csv(self, data: List[Dict], filename: str) -> str:
-        """导出为CSV格式"""
+    def export_to_csv(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
+        """导出为CSV格式（分块规范化后逐块写出）"""
         if not data:
             return ""
+        sink = CsvSink(
+            self._output_path(filename, ".csv", self.compression), self.normalizer, flush_rows=EXPORT_CHUNK_ROWS,
+            compression=self.compression, compression_level=self.compression_level,
+        )
+        return self._write_sink(sink, data, checkpoint)
 
-        filepath = self.export_dir / f"{filename}.csv"
-        
-        # 按照用户要求的列顺序
-        required_columns = [
-            "序号", "专利权人", "申请日", "专利名称", "专利号", 
-            "授权公告日", "专利类型", "发明专利申请公布号", 
-            "授权公告号", "案件状态", "主分类号"
-        ]
-        
-        # 处理数据，只保留需要的字段
-        processed_data = []
-        for idx, record in enumerate(data, 1):
-            # 创建新字典，只包含需要的字段
-            processed_record = {}
-            processed_record["序号"] = idx
-            
-            # 映射可能的字段名变体
-            field_mappings = {
-                "专利权人": ["专利权人", "申请人"],
-                "申请日": ["申请日", "申请日期"],
-                "专利名称": ["专利名称", "名称"],
-                "专利号": ["专利号", "申请号"],
-                "授权公告日": ["授权公告日", "公告日期"],
-                "专利类型": ["专利类型", "类型"],
-                "发明专利申请公布号": ["发明专利申请公布号", "公布号"],
-                "授权公告号": ["授权公告号", "公告号"],
-                "案件状态": ["案件状态", "状态"],
-                "主分类号": ["主分类号", "分类号"]
-            }
-            
-            # 填充字段值
-            for target_col, source_cols in field_mappings.items():
-                for source_col in source_cols:
-                    if source_col in record:
-                        processed_record[target_col] = record[source_col]
-                        break
-                else:
-                    # 如果所有可能的源字段都不存在，设置为空字符串
-                    processed_record[target_col] = ""
-            
-            processed_data.append(processed_record)
-        
-        with open(filepath, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=required_columns)
-            writer.writeheader()
-            writer.writerows(processed_data)
-        
-        return str(filepath)
+    def _output_path(self, filename: str, extension: str, compression: Optional[str]) -> Path:
+        """导出文件路径（启用压缩时追加压缩后缀）"""
+        return self.export_dir / f"{filename}{extension}{COMPRESSION_SUFFIXES[compression]}"
 
-    def export_to_json(self, data: List[Dict], filename: str) -> str:
-        """导出为JSON格式"""
-        filepath = self.export_dir / f"{filename}.json"
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return str(filepath)
+    def open_sink(self, fmt: str, filename: str, **kwargs) -> RowSink:
+        """打开流式写入器（抓取过程中逐页写入，结束时调用 close 定稿）"""
+        sink_class = SINKS.get(fmt.lower())
+        if sink_class is None:
+            raise ValueError(f"不支持流式导出的格式: {fmt}")
+        kwargs.setdefault("normalizer", self.normalizer)
+        if not sink_class.compressible:
+            # Excel、Parquet 文件格式自带压缩，忽略压缩参数
+            kwargs.pop("compression", None)
+            kwargs.pop("compression_level", None)
+            return sink_class(self.export_dir / f"{filename}{sink_class.extension}", **kwargs).open()
+        compression = kwargs["compression"] = normalize_compression(kwargs.get("compression", self.compression))
+        kwargs.setdefault("compression_level", self.compression_level)
+        return sink_class(self._output_path(filename, sink_class.extension, compression), **kwargs).open()
 
-    def export_to_text(self, data: List[Dict], filename: str) -> str:
+    def export_to_json(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
+        """导出为JSON格式（逐条写出，不在内存中构造完整文档）"""
+        sink = JsonSink(
+            self._output_path(filename, ".json", self.compression),
+            compression=self.compression, compression_level=self.compression_level,
+        )
+        return self._write_sink(sink, data, checkpoint)
+
+    def export_to_jsonl(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
+        """导出为JSON Lines格式（每行一条记录，紧凑格式）"""
+        sink = JsonlSink(
+            self._output_path(filename, ".jsonl", self.compression),
+            compression=self.compression, compression_level=self.compression_level,
+        )
+        return self._write_sink(sink, data, checkpoint)
+
+    def export_to_text(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
         """导出为纯文本格式"""
         filepath = self.export_dir / f"{filename}.txt"
         
-        with open(filepath, "w", encoding="utf-8") as f:
-            for i, record in enumerate(data, 1):
-                f.write(f"=== 记录 {i} ===\n")
-                for key, value in record.items():
-                    f.write(f"{key}: {value}\n")
-                f.write("\n")
+        try:
+            with open(filepath, "w", encoding="utf-8") as f:
+                i = 0
+                for chunk in _chunks(data, EXPORT_CHUNK_ROWS):
+                    for record in chunk:
+                        i += 1
+                        f.write(f"=== 记录 {i} ===\n")
+                        for key, value in record.items():
+                            f.write(f"{key}: {value}\n")
+                        f.write("\n")
+                    if checkpoint:
+                        checkpoint(i)
+        except ExportCancelled:
+            filepath.unlink(missing_ok=True)
+            raise
         
         return str(filepath)
 
-    def export_to_excel(self, data: List[Dict], filename: str) -> str:
-        """导出为Excel格式"""
+    def export_to_excel(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
+        """
+        导出为Excel格式
+
+        分块规范化后使用 xlsxwriter constant_memory 模式逐行写出，内存中只有一块行；
+        超过工作表行数上限时自动新建工作表。
+        """
+        try:
+            sink = ExcelSink(self.export_dir / f"{filename}.xlsx", self.normalizer)
+            return self._write_sink(sink, data, checkpoint)
+        except ImportError:
+            # 如果xlsxwriter不可用，降级为CSV
+            print("xlsxwriter未安装，使用CSV格式替代")
+            return self.export_to_csv(data, filename, checkpoint)
+
+    def export_to_parquet(
+        self, data: List[Dict], filename: str, checkpoint: Optional[Checkpoint] = None
+    ) -> str:
+        """
+        导出为Parquet格式（需要 pyarrow）
+
+        分块规范化后写出；日期列写为日期类型，低基数字段使用字典编码，按行组写出。
+        """
         try:
-            import pandas as pd
-            
-            filepath = self.export_dir / f"{filename}.xlsx"
-            
-            # 按照用户要求的列顺序
-            required_columns = [
-                "序号", "专利权人", "申请日", "专利名称", "专利号", 
-                "授权公告日", "专利类型", "发明专利申请公布号", 
-                "授权公告号", "案件状态", "主分类号"
-            ]
-            
-            # 处理数据，只保留需要的字段（复用CSV导出的处理逻辑）
-            processed_data = []
-            for idx, record in enumerate(data, 1):
-                # 创建新字典，只包含需要的字段
-                processed_record = {}
-                processed_record["序号"] = idx
-                
-                # 映射可能的字段名变体
-                field_mappings = {
-                    "专利权人": ["专利权人", "申请人"],
-                    "申请日": ["申请日", "申请日期"],
-                    "专利名称": ["专利名称", "名称"],
-                    "专利号": ["专利号", "申请号"],
-                    "授权公告日": ["授权公告日", "公告日期"],
-                    "专利类型": ["专利类型", "类型"],
-                    "发明专利申请公布号": ["发明专利申请公布号", "公布号"],
-                    "授权公告号": ["授权公告号", "公告号"],
-                    "案件状态": ["案件状态", "状态"],
-                    "主分类号": ["主分类号", "分类号"]
-                }
-                
-                # 填充字段值
-                for target_col, source_cols in field_mappings.items():
-                    for source_col in source_cols:
-                        if source_col in record:
-                            processed_record[target_col] = record[source_col]
-                            break
-                    else:
-                        # 如果所有可能的源字段都不存在，设置为空字符串
-                        processed_record[target_col] = ""
-                
-                processed_data.append(processed_record)
-            
-            # 创建DataFrame并按照指定顺序排列列
-            df = pd.DataFrame(processed_data)
-            df = df[required_columns]  # 重新排列列顺序
-            df.to_excel(filepath, index=False, engine="openpyxl")
-            
-            return str(filepath)
+            sink = ParquetSink(self.export_dir / f"{filename}.parquet", self.normalizer)
+            return self._write_sink(sink, data, checkpoint)
         except ImportError:
-            # 如果pandas不可用，降级为CSV
-            print("pandas未安装，使用CSV格式替代")
-            return self.export_to_csv(data, filename)
+            # 如果pyarrow不可用，降级为CSV
+            print("pyarrow未安装，使用CSV格式替代")
+            return self.export_to_csv(data, filename, checkpoint)
 
     def export_multi_format(
-        self, data: List[Dict], base_filename: str, formats: List[str]
+        self,
+        data: List[Dict],
+        base_filename: str,
+        formats: List[str],
+        progress_callback: Optional[Callable] = None,
+        cancel_event: Optional[threading.Event] = None,
+        compression: Optional[str] = None,
+        max_workers: Optional[int] = None,
     ) -> Dict[str, str]:
-        """导出多种格式"""
+        """
+        导出多种格式：单次遍历记录，每块只规范化一次，CSV、Excel、Parquet 共用同一块规范化的行
+
+        Args:
+            data: 抓取结果
+            base_filename: 文件名（不含扩展名）
+            formats: 导出格式列表
+            progress_callback: 进度回调 progress_callback(fmt=..., written=..., total=...)
+            cancel_event: 设置后在下一个分块处停止，并删除未完成的文件
+            compression: 本次导出的压缩方式（gzip / zstd），为空时使用导出器的设置
+            max_workers: 写入线程数，默认每种格式一个线程、不超过CPU核数；为 1 时在当前线程中依次写入
+
+        Returns:
+            结果键 -> 文件路径；取消时返回空字典
+        """
+        keys = []
+        for fmt in formats:
+            key = FORMAT_KEYS.get(fmt.lower())
+            if key and key not in keys:
+                keys.append(key)
+        if not keys or not data:
+            return {}
+        total = len(data)
+
         results = {}
-        
+        try:
+            sink_keys = [key for key in keys if key in SINKS]
+            if sink_keys:
+                sinks, aliases = self.open_sinks(sink_keys, base_filename, compression)
+                paths = self._stream_to_sinks(
+                    data, sinks, total, EXPORT_CHUNK_ROWS, progress_callback, cancel_event, max_workers
+                )
+                results.update((key, paths[aliases.get(key, key)]) for key in sink_keys)
+            if "text" in keys:
+                # 纯文本不是流式格式，单独遍历一次
+                def checkpoint(written: int):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled("text")
+                    if progress_callback:
+                        progress_callback(fmt="text", written=written, total=total)
+
+                results["text"] = self.export_to_text(data, base_filename, checkpoint)
+        except ExportCancelled:
+            for path in results.values():
+                Path(path).unlink(missing_ok=True)
+            print(f"⏹️ 已取消导出 {base_filename}")
+            return {}
+
+        # 按请求的格式顺序返回
+        return {key: results[key] for key in keys}
+
+    def open_sinks(self, keys: List[str], base_filename: str, compression: Optional[str] = None):
+        """
+        打开各格式的写入器；缺少 xlsxwriter / pyarrow 时 Excel、Parquet 降级为CSV，
+        任一写入器打开失败时关闭已打开的写入器并删除其 .part 文件
+
+        Args:
+            compression: 压缩方式，为空时使用导出器的设置
+
+        Returns:
+            (写入器键 -> 写入器, 降级的结果键 -> 写入器键)
+        """
+        options = {"compression": compression} if compression else {}
+        sinks: Dict[str, RowSink] = {}
+        aliases: Dict[str, str] = {}
+        try:
+            for key in keys:
+                if key in sinks:
+                    continue
+                try:
+                    sinks[key] = self.open_sink(key, base_filename, **options)
+                except ImportError:
+                    if key not in ("excel", "parquet"):
+                        raise
+                    print(f"{key}导出依赖未安装，使用CSV格式替代")
+                    aliases[key] = "csv"
+                    if "csv" not in sinks:
+                        sinks["csv"] = self.open_sink("csv", base_filename, **options)
+        except BaseException:
+            for sink in sinks.values():
+                sink.abort()
+                sink.part_path.unlink(missing_ok=True)
+            raise
+        return sinks, aliases
+
+    def _stream_to_sinks(
+        self,
+        records: Iterable[Mapping],
+        sinks: Dict[str, RowSink],
+        total: int,
+        chunk_rows: int = EXPORT_CHUNK_ROWS,
+        progress_callback: Optional[Callable] = None,
+        cancel_event: Optional[threading.Event] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        单次遍历记录，分块规范化后写入所有已打开的写入器
+
+        多个写入线程时，每个写入器在线程池中写入上一块的同时，当前线程规范化下一块；
+        上一块全部写完后才提交下一块，同一写入器不会被两个线程同时写入。
+
+        Args:
+            max_workers: 写入线程数，默认每个写入器一个线程、不超过CPU核数；为 1 时在当前线程中依次写入
+
+        Returns:
+            写入器键 -> 文件路径
+
+        Raises:
+            ExportCancelled: 已取消，未完成的文件已删除
+        """
+        normalize = any(key in NORMALIZED_FORMATS for key in sinks)
+        workers = min(len(sinks), max_workers or os.cpu_count() or 1)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") if workers > 1 else None
+
+        def submit(chunk: List[Mapping], rows) -> List:
+            if pool is None:
+                for sink in sinks.values():
+                    sink.write_records(chunk, rows)
+                return []
+            return [pool.submit(sink.write_records, chunk, rows) for sink in sinks.values()]
+
+        def settle(futures: List, written: int):
+            for future in futures:
+                future.result()
+            if progress_callback and written:
+                for key in sinks:
+                    progress_callback(fmt=key, written=written, total=total)
+
+        try:
+            # 退出 with 时等待仍在写入的线程结束，之后才中止写入器
+            with pool or nullcontext():
+                pending: List = []
+                submitted = 0
+                for chunk in _chunks(records, chunk_rows):
+                    rows = self.normalizer.normalize(chunk, start=submitted + 1) if normalize else None
+                    settle(pending, submitted)
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    pending = submit(chunk, rows)
+                    submitted += len(chunk)
+                settle(pending, submitted)
+                # 定稿（Parquet 写尾部、压缩流收尾、fsync）同样在各自的线程中进行
+                if pool is None:
+                    return {key: sink.close() for key, sink in sinks.items()}
+                return dict(zip(sinks, pool.map(lambda sink: sink.close(), sinks.values())))
+        except ExportCancelled:
+            for sink in sinks.values():
+                sink.abort()
+                sink.part_path.unlink(missing_ok=True)
+            raise
+        except BaseException:
+            for sink in sinks.values():
+                sink.abort()
+            raise
+
+    def export_task(
+        self,
+        tasks: "CrawlTask",
+        task_id: str,
+        base_filename: str,
+        formats: List[str],
+        batch_size: int = 1000,
+        progress_callback: Optional[Callable] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict[str, str]:
+        """
+        按任务ID从数据库导出：游标分批读取 crawl_results，单次遍历同时写入所有格式，内存占用与结果数无关
+
+        Args:
+            tasks: 抓取任务模型
+            task_id: 任务ID
+            base_filename: 文件名（不含扩展名）
+            formats: 导出格式（csv / json / jsonl / excel / parquet）
+            batch_size: 每批读取的记录数
+            progress_callback: 进度回调 progress_callback(fmt=..., written=..., total=...)
+            cancel_event: 设置后在下一批处停止，并删除未完成的文件
+
+        Returns:
+            结果键 -> 文件路径；取消时返回空字典
+        """
+        keys = []
         for fmt in formats:
-            if fmt.lower() == "csv":
-                results["csv"] = self.export_to_csv(data, base_filename)
-            elif fmt.lower() == "json":
-                results["json"] = self.export_to_json(data, base_filename)
-            elif fmt.lower() == "excel" or fmt.lower() == "xlsx":
-                results["excel"] = self.export_to_excel(data, base_filename)
-            elif fmt.lower() == "text" or fmt.lower() == "txt":
-                results["text"] = self.export_to_text(data, base_filename)
-        
-        return results
+            key = FORMAT_KEYS.get(fmt.lower())
+            if key not in SINKS:
+                raise ValueError(f"不支持按任务导出的格式: {fmt}")
+            if key not in keys:
+                keys.append(key)
+        total = tasks.count_results(task_id)
+
+        sinks, aliases = self.open_sinks(keys, base_filename)
+        try:
+            paths = self._stream_to_sinks(
+                tasks.iter_records(task_id, batch_size), sinks, total, batch_size, progress_callback, cancel_event
+            )
+        except ExportCancelled:
+            print(f"⏹️ 已取消导出任务 {task_id}")
+            return {}
+        return {key: paths[aliases.get(key, key)] for key in keys}
+
+    def export_incremental(
+        self,
+        data: List[Dict],
+        site_name: str,
+        key_field: Optional[str] = None,
+        compression: Optional[str] = None,
+    ) -> Dict:
+        """
+        增量导出：合并到站点主数据集（按专利号追加/更新），只为本次变化的记录生成差异文件
+
+        Args:
+            compression: 差异文件压缩方式，为空时使用导出器的设置
+
+        Returns:
+            {"master": 主数据集路径, "delta": 差异文件路径（无变化时为空）, "stats": 合并统计}
+        """
+        with self._lock:
+            site_lock = self._site_locks.setdefault(safe_name(site_name), threading.Lock())
+        # 同一站点的主数据集同一时刻只允许一个任务合并
+        with site_lock:
+            master = MasterDataset(self.export_dir, site_name, key_field, compression or self.compression)
+            try:
+                stats = master.apply(data)
+            finally:
+                master.close()
+        return {"master": str(master.db_path), "delta": stats["delta_path"], "stats": stats}
 
     def generate_filename(self, task_name: str) -> str:
-        """生成带时间戳的文件名"""
+        """生成带时间戳的文件名（同一秒内重复的文件名追加序号 _2、_3 ...）"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         # 清理任务名称中的特殊字符
-        safe_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in task_name)
-        return f"{safe_name}_{timestamp}"
+        filename = f"{safe_name(task_name)}_{timestamp}"
+        with self._lock:
+            if timestamp != self._filename_second:
+                self._filename_second = timestamp
+                self._filename_counts = {}
+            count = self._filename_counts[filename] = self._filename_counts.get(filename, 0) + 1
+        return filename if count == 1 else f"{filename}_{count}"
@@ -1,18 +1,159 @@
 """
 数据提取器 - 使用BeautifulSoup提取表格数据
+
+安装 cssselect 后，extract_table_data / extract_links 直接在 lxml.html 树上
+用编译好的XPath提取（每个CSS选择器只转换一次），结果与BeautifulSoup完全一致；
+解析失败或选择器不受支持时回退到BeautifulSoup。
 """
 
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+import hashlib
+import json
 import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from src.crawler.cleaning_rules import get_cleaner
+from src.crawler.extraction_plan import ExtractionPlan
+from src.crawler.streaming_extractor import (
+    DEFAULT_CHUNK_SIZE,
+    HtmlSource,
+    SimpleSelector,
+    iter_table_rows,
+)
+
+try:
+    from cssselect import SelectorError
+    from cssselect.xpath import ExpressionError
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    CSSSelector = None
+
+
+# 与 BeautifulSoup get_text() 一致：不包含注释以及 script/style/template 中的文本
+_CELL_TEXT = etree.XPath(
+    "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
+
+
+def _lxml_text(element) -> str:
+    """等价于 BeautifulSoup 的 get_text(strip=True)"""
+    return "".join(part.strip() for part in _CELL_TEXT(element) if part.strip())
+
+
+def _lxml_first_link(element):
+    """等价于 BeautifulSoup 的 cell.find("a")"""
+    return next(element.iterdescendants("a"), None)
 
 
 class DataExtractor:
     """数据提取器"""
 
-    def __init__(self):
-        """初始化提取器"""
-        pass
+    # 解析树内存占用约为HTML源码长度的倍数（用于估算缓存大小）
+    TREE_SIZE_FACTOR = 10
+
+    def __init__(
+        self,
+        cache_max_entries: int = 16,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        use_lxml: bool = True,
+    ):
+        """
+        初始化提取器
+
+        Args:
+            cache_max_entries: 解析文档缓存的最大条目数
+            cache_max_bytes: 解析文档缓存的估算内存上限（字节）
+            use_lxml: 是否启用lxml快速路径（需要安装cssselect）
+        """
+        self.cache_max_entries = cache_max_entries
+        self.cache_max_bytes = cache_max_bytes
+        self.use_lxml = use_lxml and CSSSelector is not None
+        self._doc_cache: OrderedDict[Tuple[str, str], Tuple[Any, int]] = OrderedDict()
+        self._cache_bytes = 0
+        self._selectors: Dict[str, Optional[Callable]] = {}
+        self._plans: Dict[Any, ExtractionPlan] = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.engine_stats = {"lxml": 0, "fallback": 0}
+
+    def _get_document(self, kind: str, html: str, parse: Callable[[str], Any]) -> Any:
+        """获取解析后的文档，同一内容只解析一次（按内容哈希LRU缓存）"""
+        key = (kind, hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest())
+        cached = self._doc_cache.get(key)
+        if cached is not None:
+            self._doc_cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+            return cached[0]
+
+        self.cache_stats["misses"] += 1
+        document = parse(html)
+        size = len(html) * self.TREE_SIZE_FACTOR
+        if size > self.cache_max_bytes or self.cache_max_entries <= 0:
+            return document
+
+        self._doc_cache[key] = (document, size)
+        self._cache_bytes += size
+        while (
+            len(self._doc_cache) > self.cache_max_entries
+            or self._cache_bytes > self.cache_max_bytes
+        ):
+            _, (_, evicted_size) = self._doc_cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+            self.cache_stats["evictions"] += 1
+        return document
+
+    def _get_soup(self, html: str) -> BeautifulSoup:
+        """获取BeautifulSoup文档"""
+        return self._get_document("soup", html, lambda text: BeautifulSoup(text, "lxml"))
+
+    def _get_tree(self, html: str):
+        """获取lxml.html文档树（空文档或带编码声明的字符串会抛出异常）"""
+        return self._get_document("lxml", html, lxml.html.document_fromstring)
+
+    def _compile_selector(self, selector: str) -> Optional[Callable]:
+        """把CSS选择器编译为XPath并缓存；cssselect不支持的选择器返回None"""
+        if selector not in self._selectors:
+            try:
+                self._selectors[selector] = CSSSelector(selector)
+            except (SelectorError, ExpressionError):
+                self._selectors[selector] = None
+        return self._selectors[selector]
+
+    def _select_lxml(self, html: str, selector: str) -> Optional[List]:
+        """在lxml树上执行选择器，无法使用快速路径时返回None"""
+        if not self.use_lxml:
+            return None
+        compiled = self._compile_selector(selector)
+        if compiled is None:
+            self.engine_stats["fallback"] += 1
+            return None
+        try:
+            elements = compiled(self._get_tree(html))
+        except (etree.LxmlError, ValueError):
+            self.engine_stats["fallback"] += 1
+            return None
+        self.engine_stats["lxml"] += 1
+        return elements
+
+    def get_plan(self, field_mappings: Dict, cleaning_rules: Optional[Dict] = None) -> ExtractionPlan:
+        """获取编译后的提取计划，相同配置只编译一次"""
+        try:
+            key = (tuple(field_mappings.items()), tuple((cleaning_rules or {}).items()))
+            hash(key)
+        except TypeError:
+            key = json.dumps([list(field_mappings.items()), cleaning_rules], default=str)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = ExtractionPlan(field_mappings, cleaning_rules)
+        return plan
+
+    def clear_cache(self):
+        """清空解析文档缓存"""
+        self._doc_cache.clear()
+        self._cache_bytes = 0
 
     def extract_table_data(
         self,
@@ -20,106 +161,105 @@ class DataExtractor:
         table_selector: str,
         field_mappings: Dict[int, str],
         cleaning_rules: Optional[Dict] = None,
+        plan: Optional[ExtractionPlan] = None,
     ) -> List[Dict]:
         """
         从HTML中提取表格数据
-        
+
         Args:
             html: HTML内容
             table_selector: 表格CSS选择器
             field_mappings: 列索引到字段名的映射 {0: "name", 1: "price"}
             cleaning_rules: 数据清洗规则
-            
+            plan: 预先编译的提取计划，提供时忽略 field_mappings / cleaning_rules
+
         Returns:
             提取的数据列表
         """
-        soup = BeautifulSoup(html, "lxml")
-        results = []
+        if plan is None:
+            plan = self.get_plan(field_mappings, cleaning_rules)
+
+        tables = self._select_lxml(html, table_selector)
+        if tables is not None:
+            if not tables:
+                return []
+            rows = (list(row.iterdescendants("td", "th")) for row in tables[0].iterdescendants("tr"))
+            records = plan.apply(rows, _lxml_text, _lxml_first_link, clean=False)
+            return plan.batch_cleaner.clean(records)
+
+        soup = self._get_soup(html)
 
         # 查找表格
         table = soup.select_one(table_selector)
         if not table:
-            return results
+            return []
 
         # 查找所有行
-        rows = table.find_all("tr")
-        
-        for row in rows:
-            cells = row.find_all(["td", "th"])
-            if not cells:
-                continue
-
-            row_data = {}
-            for col_index, field_name in field_mappings.items():
-                # 确保col_index是整数类型
-                try:
-                    col_idx = int(col_index)
-                    if col_idx < len(cells):
-                        cell = cells[col_idx]
-                    
-                        # 提取文本内容
-                        text = cell.get_text(strip=True)
-                        
-                        # 检查是否包含链接
-                        link = cell.find("a")
-                        if link and link.get("href"):
-                            # 如果字段名包含"链接"或"url"，保存链接地址
-                            if "链接" in field_name.lower() or "url" in field_name.lower():
-                                text = link.get("href")
-                            # 否则同时保存文本和链接
-                            row_data[f"{field_name}_url"] = link.get("href")
-                        
-                        # 应用清洗规则
-                        if cleaning_rules and field_name in cleaning_rules:
-                            text = self._apply_cleaning_rule(text, cleaning_rules[field_name])
-                        
-                        row_data[field_name] = text
-                except (ValueError, TypeError):
-                    # 忽略无法转换为整数的列索引
-                    print(f"警告: 列索引 '{col_index}' 不是有效的整数，跳过该字段")
-
-            if row_data:
-                results.append(row_data)
-
-        return results
+        rows = (row.find_all(["td", "th"]) for row in table.find_all("tr"))
+        records = plan.apply(
+            rows, lambda c: c.get_text(strip=True), lambda c: c.find("a"), clean=False
+        )
+        return plan.batch_cleaner.clean(records)
+
+    def iter_table_data(
+        self,
+        source: HtmlSource,
+        table_selector: str,
+        field_mappings: Dict[int, str],
+        cleaning_rules: Optional[Dict] = None,
+        plan: Optional[ExtractionPlan] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: str = "utf-8",
+    ) -> Iterator[Dict]:
+        """
+        流式提取表格数据，每行结束时立即产出记录
+
+        结果与 extract_table_data 相同，但不构建整棵文档树。
+        表格选择器不是简单选择器时退回到完整解析。
+
+        Args:
+            source: HTML字符串，或逐块产出HTML的可迭代对象（如分块读取的文件）
+            chunk_size: 字符串输入时每次送入解析器的长度
+            encoding: 字节输入的编码
+        """
+        if plan is None:
+            plan = self.get_plan(field_mappings, cleaning_rules)
+
+        selector = SimpleSelector.parse(table_selector)
+        if selector is None:
+            if not isinstance(source, (str, bytes)):
+                chunks = list(source)
+                source = b"".join(chunks) if chunks and isinstance(chunks[0], bytes) else "".join(chunks)
+            if isinstance(source, bytes):
+                source = source.decode(encoding, errors="replace")
+            yield from self.extract_table_data(source, table_selector, field_mappings, plan=plan)
+            return
+
+        for cells in iter_table_rows(source, selector, chunk_size, encoding):
+            yield from plan.apply([cells], _lxml_text, _lxml_first_link)
 
     def _apply_cleaning_rule(self, text: str, rule: str) -> str:
         """应用数据清洗规则"""
-        text = text.strip()
-        
-        if rule == "extract_number":
-            # 提取数字
-            numbers = re.findall(r"\d+\.?\d*", text)
-            return numbers[0] if numbers else text
-        elif rule == "remove_spaces":
-            # 移除所有空格
-            return re.sub(r"\s+", "", text)
-        elif rule == "lowercase":
-            # 转小写
-            return text.lower()
-        elif rule == "uppercase":
-            # 转大写
-            return text.upper()
-        
-        return text
+        return get_cleaner(rule)(text)
 
     def extract_links(self, html: str, selector: str) -> List[str]:
         """提取页面中的链接"""
-        soup = BeautifulSoup(html, "lxml")
         links = []
-        
-        elements = soup.select(selector)
+
+        elements = self._select_lxml(html, selector)
+        if elements is None:
+            elements = self._get_soup(html).select(selector)
         for element in elements:
             link = element.get("href")
             if link:
                 links.append(link)
-        
+
         return links
 
     def get_table_total_count(self, html: str, total_selector: str) -> Optional[int]:
         """获取表格数据总数"""
         try:
-            soup = BeautifulSoup(html, "lxml")
+            soup = self._get_soup(html)
             total_element = soup.select_one(total_selector)
             if total_element:
                 text = total_element.get_text(strip=True)
@@ -134,5 +274,5 @@ class DataExtractor:
 
     def check_element_exists(self, html: str, selector: str) -> bool:
         """检查元素是否存在"""
-        soup = BeautifulSoup(html, "lxml")
+        soup = self._get_soup(html)
         return soup.select_one(selector) is not None
@@ -0,0 +1,115 @@
+"""
+去重引擎 - 按规范化记录键或64位内容哈希去除重复记录
+
+分页结果可能互相重叠（翻页期间数据变化、重试时重复抓取同一页），
+去重后的记录数才能与查询结果总数对应。
+
+去重策略（crawl_strategies.dedup_strategy）:
+    key      按记录键去重（默认），键字段缺失时退回内容哈希
+    content  按记录内容（不含 _ 开头的元数据字段）的64位哈希去重
+    none     不去重
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# 记录键字段别名：表单配置中的字段名 -> 解析结果中的字段名
+KEY_ALIASES = {
+    "申请号": "专利号",
+    "申请号/专利号": "专利号",
+}
+
+DEDUP_STRATEGIES = ("key", "content", "none")
+
+
+def resolve_key_field(field: Optional[str]) -> str:
+    """把表单配置中的结果ID字段名解析为解析结果中实际使用的字段名"""
+    field = (field or "专利号").strip()
+    return KEY_ALIASES.get(field, field)
+
+
+def normalize_key(value) -> str:
+    """规范化记录键：去除空白和校验位前的点号，统一大写，去掉 CN/ZL 前缀"""
+    text = "".join(str(value).split()).replace(".", "").upper()
+    for prefix in ("CN", "ZL"):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return text
+
+
+def _hash64(text: str) -> int:
+    """64位blake2b哈希"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def content_hash(record: Mapping) -> int:
+    """记录内容的64位哈希（忽略 _ 开头的元数据字段和字段顺序）"""
+    content = sorted((str(k), str(v)) for k, v in record.items() if not str(k).startswith("_"))
+    return _hash64(json.dumps(content, ensure_ascii=False))
+
+
+class DedupEngine:
+    """去重引擎"""
+
+    def __init__(self, strategy: Optional[str] = "key", key_field: Optional[str] = None):
+        """
+        Args:
+            strategy: 去重策略 key / content / none
+            key_field: 记录键字段，支持别名（如 申请号 -> 专利号）
+        """
+        strategy = (strategy or "key").lower()
+        if strategy not in DEDUP_STRATEGIES:
+            raise ValueError(f"未知的去重策略: {strategy}")
+        self.strategy = strategy
+        self.key_field = resolve_key_field(key_field)
+        self._seen = set()
+        self.stats = {"records": 0, "unique": 0, "duplicates": 0, "missing_key": 0}
+        # 页码 -> {"records": 本页记录数, "duplicates": 本页丢弃的重复记录数}
+        self.page_stats: Dict[int, Dict[str, int]] = {}
+
+    @classmethod
+    def from_strategy(cls, strategy: Dict, form_data: Optional[Dict] = None) -> "DedupEngine":
+        """根据抓取策略和表单配置创建去重引擎"""
+        form_data = form_data or {}
+        return cls(strategy.get("dedup_strategy"), form_data.get("result_id_field"))
+
+    def fingerprint(self, record: Mapping) -> int:
+        """记录指纹：记录键的哈希，键缺失或按内容去重时为内容哈希"""
+        if self.strategy == "key":
+            value = record.get(self.key_field)
+            key = normalize_key(value) if value is not None else ""
+            if key:
+                return _hash64("key:" + key)
+            self.stats["missing_key"] += 1
+        return content_hash(record)
+
+    def add(self, record: Mapping) -> bool:
+        """登记一条记录，返回是否为新记录"""
+        self.stats["records"] += 1
+        if self.strategy == "none":
+            self.stats["unique"] += 1
+            return True
+        fingerprint = self.fingerprint(record)
+        if fingerprint in self._seen:
+            self.stats["duplicates"] += 1
+            return False
+        self._seen.add(fingerprint)
+        self.stats["unique"] += 1
+        return True
+
+    def filter_page(self, records: Iterable[Mapping], page_number: Optional[int] = None) -> List:
+        """过滤一页记录，返回其中的新记录并记录该页的重复数"""
+        records = list(records)
+        new_records = [record for record in records if self.add(record)]
+        if page_number is not None:
+            page = self.page_stats.setdefault(page_number, {"records": 0, "duplicates": 0})
+            page["records"] += len(records)
+            page["duplicates"] += len(records) - len(new_records)
+        return new_records
+
+    def reset(self):
+        """清空已登记的记录和统计"""
+        self._seen.clear()
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.page_stats = {}
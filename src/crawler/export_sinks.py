@@ -0,0 +1,587 @@
+"""
+流式导出 - 抓取过程中逐页写出规范化的导出行
+
+抓取开始时打开文件，每页数据到达时立即写入，抓取结束时定稿。
+写入过程中文件名带 .part 后缀，定稿时改为正式文件名；抓取中途崩溃时 .part 文件保留已写入的数据。
+
+    csv      CsvSink，按行数/时间间隔刷新到 .part 文件，定稿时 fsync
+    excel    ExcelSink，xlsxwriter constant_memory 模式逐行写出，超过工作表行数上限时自动新建工作表
+    parquet  ParquetSink（需要 pyarrow），带类型的列、低基数字段字典编码，按行组增量写出
+    jsonl    JsonlSink，每行一条完整的原始记录（安装 orjson 时使用 orjson 序列化，pip install .[fast]），每页写入后刷新
+    json     JsonSink，逐条写出缩进的JSON数组（格式与 json.dump(..., indent=2) 相同）
+
+CSV、JSON、JSON Lines 支持在写入时直接压缩：gzip（.gz）或 zstd（.zst，
+需要 zstandard，默认多线程压缩）。
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+from src.const.fields import CATEGORICAL_FIELDS
+from src.crawler.cleaning_rules import get_cleaner
+from src.crawler.normalizer import COLUMN_SOURCES, INDEX_COLUMN, RecordNormalizer, RowBuffer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Excel 单个工作表的行数上限（含表头）
+MAX_EXCEL_ROWS = 1048576
+
+# Parquet 列类型：日期列写为 date32，低基数列写为字典编码，其余为字符串
+PARQUET_DATE_COLUMNS = ("申请日", "授权公告日")
+# 来源字段属于 CATEGORICAL_FIELDS 的导出列（如 申请人 -> 专利权人）
+PARQUET_DICTIONARY_COLUMNS = tuple(
+    column for column, sources in COLUMN_SOURCES.items() if any(field in CATEGORICAL_FIELDS for field in sources)
+)
+
+
+# 压缩方式 -> 文件名后缀
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+_COMPRESSION_ALIASES = {"": None, "none": None, "gz": "gzip", "gzip": "gzip", "zst": "zstd", "zstd": "zstd"}
+
+
+def normalize_compression(compression: Optional[str]) -> Optional[str]:
+    """规范化压缩方式名（gz -> gzip，zst -> zstd，none -> None）"""
+    if compression is None:
+        return None
+    key = str(compression).lower()
+    if key not in _COMPRESSION_ALIASES:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+    return _COMPRESSION_ALIASES[key]
+
+
+class CompressedOutput:
+    """按压缩方式打开的输出文件，写入时直接压缩"""
+
+    def __init__(
+        self,
+        path,
+        compression: Optional[str] = None,
+        text: bool = False,
+        encoding: str = "utf-8",
+        newline: Optional[str] = None,
+        level: Optional[int] = None,
+        threads: int = -1,
+    ):
+        """
+        Args:
+            path: 输出文件路径
+            compression: None / gzip / zstd
+            text: 是否以文本方式写入
+            encoding, newline: 文本方式的编码和换行处理
+            level: 压缩级别，默认 gzip 6、zstd 3
+            threads: zstd 压缩线程数，-1 表示按CPU核数
+        """
+        compression = normalize_compression(compression)
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd压缩需要安装 zstandard")
+        self.raw = open(path, "wb")
+        if compression == "gzip":
+            self._compressor = gzip.GzipFile(fileobj=self.raw, mode="wb", compresslevel=level or 6)
+        elif compression == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level or 3, threads=threads).stream_writer(
+                self.raw, closefd=False
+            )
+        else:
+            self._compressor = self.raw
+        if text:
+            self.stream = io.TextIOWrapper(self._compressor, encoding=encoding, newline=newline)
+        else:
+            self.stream = self._compressor
+
+    def write(self, data):
+        return self.stream.write(data)
+
+    def flush(self, sync: bool = False):
+        """刷新压缩缓冲区（写出完整的压缩块，已写入的数据可被读取方解压）"""
+        self.stream.flush()
+        if self._compressor is not self.raw:
+            self._compressor.flush()
+        self.raw.flush()
+        if sync:
+            os.fsync(self.raw.fileno())
+
+    def close(self, sync: bool = False):
+        """
+        关闭输出：先关闭压缩流（写出压缩尾部，不关闭底层文件），再 fsync 并关闭底层文件
+
+        Args:
+            sync: 是否在关闭前 fsync 到磁盘
+        """
+        if self._compressor is not self.raw:
+            self.stream.close()
+        else:
+            self.stream.flush()
+        self.raw.flush()
+        if sync:
+            os.fsync(self.raw.fileno())
+        # 未压缩时文本流包装底层文件，关闭时一并关闭
+        self.stream.close()
+        self.raw.close()
+
+
+class RowSink:
+    """流式写入器基类：子类实现 _open_part / write_rows / _close_part"""
+
+    extension = ""
+    # 是否支持写入时压缩（Excel、Parquet 文件格式自带压缩）
+    compressible = False
+
+    def __init__(self, filepath: str, normalizer: Optional[RecordNormalizer] = None):
+        """
+        Args:
+            filepath: 最终的导出文件路径
+            normalizer: 导出列解析器，默认为 RecordNormalizer()
+        """
+        self.filepath = Path(filepath)
+        self.part_path = self.filepath.with_name(self.filepath.name + ".part")
+        self.normalizer = normalizer or RecordNormalizer()
+        self.rows_written = 0
+        self._opened = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened
+
+    def open(self) -> "RowSink":
+        """创建 .part 文件并写入表头"""
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        self._open_part()
+        self._opened = True
+        return self
+
+    def write_records(self, records: Iterable[Mapping], rows: Optional[RowBuffer] = None) -> int:
+        """
+        写入一批记录（通常是一页），返回写入的行数
+
+        Args:
+            records: 原始记录
+            rows: 这批记录已规范化的行（多个写入器共用），未提供时在此规范化
+        """
+        if rows is None:
+            rows = self.normalizer.normalize(records, start=self.rows_written + 1)
+        self.write_rows(rows)
+        return len(rows)
+
+    def write_rows(self, rows: RowBuffer):
+        """写入已规范化的行"""
+        raise NotImplementedError
+
+    def close(self) -> str:
+        """定稿：把 .part 文件改为正式文件名，返回文件路径"""
+        if self._opened:
+            self._close_part()
+            self._opened = False
+            os.replace(self.part_path, self.filepath)
+        return str(self.filepath)
+
+    def abort(self) -> str:
+        """中止：关闭文件但保留 .part 文件，返回其路径"""
+        if self._opened:
+            self._close_part()
+            self._opened = False
+        return str(self.part_path)
+
+    def _open_part(self):
+        raise NotImplementedError
+
+    def _close_part(self):
+        raise NotImplementedError
+
+    def __enter__(self) -> "RowSink":
+        if not self._opened:
+            self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CsvSink(RowSink):
+    """流式CSV写入器"""
+
+    extension = ".csv"
+    compressible = True
+
+    def __init__(
+        self,
+        filepath: str,
+        normalizer: Optional[RecordNormalizer] = None,
+        flush_rows: int = 500,
+        flush_interval: float = 5.0,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        Args:
+            filepath: 最终的CSV文件路径
+            normalizer: 导出列解析器，默认为 RecordNormalizer()
+            flush_rows: 每写入多少行刷新一次
+            flush_interval: 距上次刷新超过多少秒时刷新
+            compression: 写入时压缩（gzip / zstd）
+            compression_level: 压缩级别
+        """
+        super().__init__(filepath, normalizer)
+        self.compression = normalize_compression(compression)
+        self.compression_level = compression_level
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._file = None
+        self._writer = None
+        self._pending = 0
+        self._last_flush = 0.0
+
+    def _open_part(self):
+        self._file = CompressedOutput(
+            self.part_path, self.compression, text=True, encoding="utf-8-sig", newline="",
+            level=self.compression_level,
+        )
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.normalizer.columns)
+        self.flush()
+
+    def write_rows(self, rows: RowBuffer):
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+        self._pending += len(rows)
+        if self._pending >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, sync: bool = False):
+        """
+        把缓冲的行写入 .part 文件（进程崩溃后已刷新的行可见）
+
+        Args:
+            sync: 是否同时 fsync 到磁盘（只在定稿时使用，避免每次刷新都阻塞抓取线程）
+        """
+        if self._file is None:
+            return
+        self._file.flush(sync=sync)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _close_part(self):
+        self._file.close(sync=True)
+        self._file = None
+
+
+class ExcelSink(RowSink):
+    """流式Excel写入器（xlsxwriter constant_memory 模式，内存占用与行数无关）"""
+
+    extension = ".xlsx"
+
+    def __init__(
+        self,
+        filepath: str,
+        normalizer: Optional[RecordNormalizer] = None,
+        max_rows: int = MAX_EXCEL_ROWS,
+        sheet_prefix: str = "Sheet",
+    ):
+        """
+        Args:
+            filepath: 最终的Excel文件路径
+            normalizer: 导出列解析器，默认为 RecordNormalizer()
+            max_rows: 每个工作表的行数上限（含表头），超出时新建工作表
+            sheet_prefix: 工作表名前缀，依次命名为 Sheet1、Sheet2 ...
+        """
+        super().__init__(filepath, normalizer)
+        # 保留 .xlsx 后缀，未定稿的文件也能直接用 Excel 打开
+        self.part_path = self.filepath.with_suffix(".part" + self.filepath.suffix)
+        if max_rows < 2:
+            raise ValueError("max_rows 至少为2（表头 + 1行数据）")
+        self.max_rows = max_rows
+        self.sheet_prefix = sheet_prefix
+        self.sheets = 0
+        self._workbook = None
+        self._worksheet = None
+        self._row = 0
+
+    def _open_part(self):
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(
+            str(self.part_path), {"constant_memory": True, "strings_to_urls": False}
+        )
+        self._add_sheet()
+
+    def _add_sheet(self):
+        """新建工作表并写入表头（constant_memory 模式下旧工作表的行已写入临时文件）"""
+        self.sheets += 1
+        self._worksheet = self._workbook.add_worksheet(f"{self.sheet_prefix}{self.sheets}")
+        self._worksheet.write_row(0, 0, self.normalizer.columns)
+        self._row = 1
+
+    def write_rows(self, rows: RowBuffer):
+        for row in rows:
+            if self._row >= self.max_rows:
+                self._add_sheet()
+            try:
+                self._worksheet.write_row(self._row, 0, row)
+            except TypeError:
+                # 不支持的值类型（列表、字典等）按文本写出
+                self._worksheet.write_row(
+                    self._row, 0, [value if isinstance(value, (str, int, float)) else str(value) for value in row]
+                )
+            self._row += 1
+        self.rows_written += len(rows)
+
+    def _close_part(self):
+        self._workbook.close()
+        self._workbook = None
+        self._worksheet = None
+
+
+class ParquetSink(RowSink):
+    """
+    流式Parquet写入器（需要 pyarrow），缓冲满 row_group_size 行后写出一个行组
+
+    每批行到达时立即转换为 Arrow 记录批（列式、字典编码），缓冲区中不保留 Python 行元组。
+    """
+
+    extension = ".parquet"
+
+    def __init__(
+        self,
+        filepath: str,
+        normalizer: Optional[RecordNormalizer] = None,
+        row_group_size: int = 65536,
+        compression: str = "zstd",
+    ):
+        """
+        Args:
+            filepath: 最终的Parquet文件路径
+            normalizer: 导出列解析器，默认为 RecordNormalizer()
+            row_group_size: 每个行组的行数
+            compression: 列压缩算法（zstd / snappy / gzip / none）
+        """
+        super().__init__(filepath, normalizer)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.row_groups = 0
+        self._writer = None
+        self._schema = None
+        # 已转换、尚未写出的 Arrow 记录批
+        self._batches: List = []
+        self._buffered = 0
+        self._parse_date = get_cleaner("parse_date")
+        self._dates: Dict[str, Optional[date]] = {}
+
+    def _open_part(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = []
+        for column in self.normalizer.columns:
+            if column == INDEX_COLUMN:
+                fields.append(pa.field(column, pa.int64()))
+            elif column in PARQUET_DATE_COLUMNS:
+                fields.append(pa.field(column, pa.date32()))
+            elif column in PARQUET_DICTIONARY_COLUMNS:
+                fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(
+            str(self.part_path),
+            self._schema,
+            compression=self.compression,
+            use_dictionary=[c for c in self.normalizer.columns if c in PARQUET_DICTIONARY_COLUMNS],
+        )
+
+    def _to_date(self, value) -> Optional[date]:
+        """解析日期（按取值缓存），无法识别时为空"""
+        if not value:
+            return None
+        text = str(value)
+        if text not in self._dates:
+            try:
+                self._dates[text] = date.fromisoformat(self._parse_date(text))
+            except ValueError:
+                self._dates[text] = None
+        return self._dates[text]
+
+    def _to_array(self, field, values):
+        import pyarrow as pa
+
+        if field.name == INDEX_COLUMN:
+            return pa.array(values, pa.int64())
+        if field.name in PARQUET_DATE_COLUMNS:
+            return pa.array([self._to_date(value) for value in values], pa.date32())
+        strings = pa.array(
+            [value if value is None or isinstance(value, str) else str(value) for value in values],
+            pa.string(),
+        )
+        if pa.types.is_dictionary(field.type):
+            return strings.dictionary_encode()
+        return strings
+
+    def _to_batch(self, rows: Iterable[Tuple]):
+        """把一批行转换为 Arrow 记录批"""
+        import pyarrow as pa
+
+        columns = list(zip(*rows))
+        arrays = [self._to_array(field, values) for field, values in zip(self._schema, columns)]
+        return pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+
+    def _write_row_group(self, table):
+        """把一个 Arrow 表写为一个行组"""
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self.row_groups += 1
+
+    def write_rows(self, rows: RowBuffer):
+        import pyarrow as pa
+
+        if not len(rows):
+            return
+        self._batches.append(self._to_batch(rows))
+        self._buffered += len(rows)
+        self.rows_written += len(rows)
+        # 只写出满行组，剩余的行留在缓冲区等待下一页
+        size = self.row_group_size
+        while self._buffered >= size:
+            table = pa.Table.from_batches(self._batches, schema=self._schema)
+            self._write_row_group(table.slice(0, size))
+            rest = table.slice(size)
+            self._batches = rest.to_batches()
+            self._buffered = rest.num_rows
+
+    def _close_part(self):
+        if self._buffered:
+            import pyarrow as pa
+
+            self._write_row_group(pa.Table.from_batches(self._batches, schema=self._schema))
+        self._batches = []
+        self._buffered = 0
+        self._writer.close()
+        self._writer = None
+
+
+def dumps_record(record: Mapping) -> bytes:
+    """把一条记录序列化为紧凑的单行JSON（UTF-8，不转义中文）"""
+    if orjson is not None:
+        return orjson.dumps(dict(record), default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(dict(record), ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class JsonlSink(RowSink):
+    """流式JSON Lines写入器：写出原始记录（含 _ 开头的元数据字段），不做列规范化"""
+
+    extension = ".jsonl"
+    compressible = True
+
+    def __init__(
+        self,
+        filepath: str,
+        normalizer: Optional[RecordNormalizer] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        Args:
+            filepath: 最终的JSON Lines文件路径
+            normalizer: 导出列解析器（只用于 write_rows）
+            compression: 写入时压缩（gzip / zstd）
+            compression_level: 压缩级别
+        """
+        super().__init__(filepath, normalizer)
+        self.compression = normalize_compression(compression)
+        self.compression_level = compression_level
+        self._file = None
+
+    def _open_part(self):
+        self._file = CompressedOutput(self.part_path, self.compression, level=self.compression_level)
+
+    def write_records(self, records: Iterable[Mapping], rows: Optional[RowBuffer] = None) -> int:
+        lines = [dumps_record(record) for record in records]
+        if lines:
+            self._file.write(b"\n".join(lines) + b"\n")
+            # 每批写入后刷新，读取方可以在抓取过程中逐行处理
+            self._file.flush()
+        self.rows_written += len(lines)
+        return len(lines)
+
+    def write_rows(self, rows: RowBuffer):
+        self.write_records(rows.as_dicts())
+
+    def _close_part(self):
+        self._file.close()
+        self._file = None
+
+
+class JsonSink(RowSink):
+    """流式JSON数组写入器：逐条写出原始记录，输出与 json.dump(records, indent=2) 一致"""
+
+    extension = ".json"
+    compressible = True
+
+    def __init__(
+        self,
+        filepath: str,
+        normalizer: Optional[RecordNormalizer] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ):
+        """
+        Args:
+            filepath: 最终的JSON文件路径
+            normalizer: 导出列解析器（只用于 write_rows）
+            compression: 写入时压缩（gzip / zstd）
+            compression_level: 压缩级别
+        """
+        super().__init__(filepath, normalizer)
+        self.compression = normalize_compression(compression)
+        self.compression_level = compression_level
+        self._file = None
+
+    def _open_part(self):
+        self._file = CompressedOutput(
+            self.part_path, self.compression, text=True, encoding="utf-8", level=self.compression_level
+        )
+
+    def write_records(self, records: Iterable[Mapping], rows: Optional[RowBuffer] = None) -> int:
+        count = 0
+        for record in records:
+            text = json.dumps(dict(record), ensure_ascii=False, indent=2)
+            self._file.write(",\n" if self.rows_written else "[\n")
+            self._file.write("  " + text.replace("\n", "\n  "))
+            self.rows_written += 1
+            count += 1
+        return count
+
+    def write_rows(self, rows: RowBuffer):
+        self.write_records(rows.as_dicts())
+
+    def _close_part(self):
+        self._file.write("\n]" if self.rows_written else "[]")
+        self._file.close()
+        self._file = None
+
+
+# 格式名 -> 流式写入器
+SINKS: Dict[str, Type[RowSink]] = {
+    "csv": CsvSink,
+    "excel": ExcelSink,
+    "xlsx": ExcelSink,
+    "parquet": ParquetSink,
+    "jsonl": JsonlSink,
+    "json": JsonSink,
+}
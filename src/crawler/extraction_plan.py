@@ -0,0 +1,107 @@
+"""
+提取计划 - 把页面配置编译为可直接执行的表格提取步骤
+
+page_configs 中的 field_mappings / data_cleaning_rules 只在编译时解析一次：
+列索引转换为整数向量，清洗规则名解析为函数，链接捕获方式预先确定。
+应用计划时逐行执行紧凑循环，不再对每个单元格做类型转换和规则名比较。
+"""
+
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.crawler.cleaning_rules import BatchCleaner, get_cleaner
+
+
+def _is_link_field(field_name: str) -> bool:
+    """字段名包含"链接"或"url"时，字段值取链接地址"""
+    lowered = field_name.lower()
+    return "链接" in lowered or "url" in lowered
+
+
+class ExtractionPlan:
+    """编译后的表格提取计划"""
+
+    def __init__(self, field_mappings: Dict, cleaning_rules: Optional[Dict] = None):
+        """
+        编译提取计划
+
+        Args:
+            field_mappings: 列索引到字段名的映射 {0: "name", 1: "price"}
+            cleaning_rules: 字段名到清洗规则名的映射
+        """
+        # 清洗规则按字段名生效：既用于映射的列，也用于结果页解析出的同名字段
+        self.cleaning_rules: Dict[str, str] = dict(cleaning_rules or {})
+        fields: List[Tuple[str, int, Optional[Callable[[str], str]], str, bool]] = []
+        for col_index, field_name in field_mappings.items():
+            try:
+                column = int(col_index)
+            except (ValueError, TypeError):
+                print(f"警告: 列索引 '{col_index}' 不是有效的整数，跳过该字段")
+                continue
+            cleaner = None
+            if field_name in self.cleaning_rules:
+                cleaner = get_cleaner(self.cleaning_rules[field_name])
+            fields.append((field_name, column, cleaner, f"{field_name}_url", _is_link_field(field_name)))
+
+        # (字段名, 列索引, 清洗函数, 链接字段名, 是否以链接作为字段值)
+        self.fields = tuple(fields)
+        self._unclean_fields = tuple(field[:2] + (None,) + field[3:] for field in fields)
+        self.columns = tuple(field[1] for field in fields)
+        self.batch_cleaner = BatchCleaner(self.cleaning_rules)
+
+    @classmethod
+    def from_page_config(cls, page_config: Dict) -> "ExtractionPlan":
+        """从页面配置（字典或数据库中的JSON文本）编译计划"""
+        field_mappings = page_config.get("field_mappings") or {}
+        cleaning_rules = page_config.get("data_cleaning_rules") or {}
+        if isinstance(field_mappings, str):
+            field_mappings = json.loads(field_mappings)
+        if isinstance(cleaning_rules, str):
+            cleaning_rules = json.loads(cleaning_rules)
+        return cls(field_mappings, cleaning_rules)
+
+    def apply(
+        self, rows: Iterable[List], get_text: Callable, find_link: Callable, clean: bool = True
+    ) -> List[Dict]:
+        """
+        对表格行执行计划
+
+        Args:
+            rows: 每行的单元格列表
+            get_text: 取单元格文本的函数
+            find_link: 取单元格中第一个链接的函数（没有链接返回None）
+            clean: 是否逐单元格清洗；为False时由调用方用 batch_cleaner 按列批量清洗
+
+        Returns:
+            提取的数据列表
+        """
+        fields = self.fields if clean else self._unclean_fields
+        results = []
+        for cells in rows:
+            count = len(cells)
+            if not count:
+                continue
+
+            row_data = {}
+            for field_name, column, cleaner, url_key, link_as_value in fields:
+                if column >= count or column < -count:
+                    continue
+                cell = cells[column]
+                text = get_text(cell)
+
+                link = find_link(cell)
+                if link is not None:
+                    href = link.get("href")
+                    if href:
+                        if link_as_value:
+                            text = href
+                        row_data[url_key] = href
+
+                if cleaner is not None:
+                    text = cleaner(text)
+                row_data[field_name] = text
+
+            if row_data:
+                results.append(row_data)
+
+        return results
@@ -0,0 +1,240 @@
+"""
+增量导出 - 按站点维护主数据集，每次运行只输出变化的记录
+
+主数据集是站点导出目录下的一个 SQLite 文件（<站点>_master.db），按规范化的专利号保存每条记录的
+最新内容和64位内容哈希。每次运行：
+    新记录        插入主数据集，差异文件中标记为 insert
+    内容变化的记录  更新主数据集（upsert），差异文件中标记为 update
+    未变化的记录    只更新 last_seen
+差异文件为 JSON Lines（<站点>_delta_<时间戳>_<运行ID>.jsonl），每行一条完整记录，_change 字段为变化类型；
+运行ID为 runs 表的行ID，同一秒内的多次运行不会互相覆盖差异文件。
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+from src.crawler.dedup import content_hash, normalize_key, resolve_key_field
+from src.crawler.export_sinks import COMPRESSION_SUFFIXES, JsonlSink, normalize_compression
+
+# 每批查询/写入主数据集的记录数
+BATCH_SIZE = 500
+
+
+def safe_name(name: str) -> str:
+    """把站点名转换为可用作文件名的字符串"""
+    return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in name)
+
+
+class MasterDataset:
+    """站点主数据集"""
+
+    def __init__(
+        self,
+        export_dir: str,
+        site_name: str,
+        key_field: Optional[str] = None,
+        compression: Optional[str] = None,
+    ):
+        """
+        Args:
+            export_dir: 导出目录
+            site_name: 站点名，用于主数据集和差异文件的文件名
+            key_field: 记录键字段，支持别名（申请号 -> 专利号），默认为专利号
+            compression: 差异文件压缩方式（gzip / zstd）
+        """
+        self.export_dir = Path(export_dir)
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self.site_name = safe_name(site_name)
+        self.key_field = resolve_key_field(key_field)
+        self.compression = normalize_compression(compression)
+        self.db_path = self.export_dir / f"{self.site_name}_master.db"
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                content_hash INTEGER NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_at TEXT NOT NULL,
+                records INTEGER DEFAULT 0,
+                inserted INTEGER DEFAULT 0,
+                updated INTEGER DEFAULT 0,
+                unchanged INTEGER DEFAULT 0,
+                delta_path TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def record_key(self, record: Mapping) -> str:
+        """记录键：规范化的专利号，缺失时为内容哈希"""
+        value = record.get(self.key_field)
+        key = normalize_key(value) if value is not None else ""
+        return key or f"hash:{content_hash(record):016x}"
+
+    def apply(self, records: Iterable[Mapping], run_at: Optional[datetime] = None) -> Dict:
+        """
+        把一次运行的记录合并到主数据集，并写出差异文件
+
+        记录先按键暂存到临时表（同一次运行中重复的键以最后一条为准），再分批与主数据集比较，
+        每个键在一次运行中只计数一次。差异文件先写为 .part，主数据集提交后才改为正式文件名。
+
+        Returns:
+            统计 {run_id, records, inserted, updated, unchanged, delta_path}；没有变化时不生成差异文件
+        """
+        run_at = run_at or datetime.now()
+        timestamp = run_at.isoformat(timespec="seconds")
+        stats = {"run_id": 0, "records": 0, "inserted": 0, "updated": 0, "unchanged": 0, "delta_path": ""}
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        delta: Optional[JsonlSink] = None
+
+        try:
+            # 先登记本次运行，行ID用于差异文件名；失败时随事务一起回滚
+            stats["run_id"] = self.conn.execute(
+                "INSERT INTO runs (run_at) VALUES (?)", (timestamp,)
+            ).lastrowid
+            delta = JsonlSink(
+                self.export_dir / f"{self.site_name}_delta_{run_at:%Y%m%d_%H%M%S}_{stats['run_id']}.jsonl{suffix}",
+                compression=self.compression,
+            )
+            self._stage(records, stats)
+            cursor = self.conn.execute("SELECT key, data, content_hash FROM staged ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                self._apply_batch(rows, timestamp, stats, delta)
+            self.conn.execute("DELETE FROM staged")
+
+            if delta.is_open:
+                # 关闭并 fsync .part 文件，提交后再改名，主数据集和差异文件不会只有一方生效
+                delta.abort()
+                stats["delta_path"] = str(delta.filepath)
+            self.conn.execute(
+                """
+                UPDATE runs SET records = ?, inserted = ?, updated = ?, unchanged = ?, delta_path = ?
+                WHERE id = ?
+                """,
+                (
+                    stats["records"], stats["inserted"], stats["updated"],
+                    stats["unchanged"], stats["delta_path"], stats["run_id"],
+                ),
+            )
+            self.conn.commit()
+        except BaseException:
+            # 主数据集回滚到本次运行之前，差异文件保留为 .part
+            self.conn.rollback()
+            if delta is not None:
+                delta.abort()
+            raise
+
+        if stats["delta_path"]:
+            os.replace(delta.part_path, delta.filepath)
+        return stats
+
+    def _stage(self, records: Iterable[Mapping], stats: Dict):
+        """按键暂存本次运行的记录，重复的键保留第一次出现的位置和最后一条的内容"""
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staged (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                content_hash INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("DELETE FROM staged")
+        sql = """
+            INSERT INTO staged (key, data, content_hash) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET data = excluded.data, content_hash = excluded.content_hash
+        """
+        rows = []
+        for record in records:
+            stats["records"] += 1
+            # 内容哈希不含 _ 开头的元数据字段；SQLite 整数为有符号64位
+            rows.append((
+                self.record_key(record),
+                json.dumps(dict(record), ensure_ascii=False, default=str),
+                _signed(content_hash(record)),
+            ))
+            if len(rows) >= BATCH_SIZE:
+                self.conn.executemany(sql, rows)
+                rows = []
+        if rows:
+            self.conn.executemany(sql, rows)
+
+    def _apply_batch(self, rows: List[tuple], timestamp: str, stats: Dict, delta: JsonlSink):
+        """合并一批暂存的记录 (键, JSON, 内容哈希)"""
+        keys = [key for key, _, _ in rows]
+        placeholders = ",".join("?" * len(keys))
+        existing = dict(self.conn.execute(
+            f"SELECT key, content_hash FROM records WHERE key IN ({placeholders})", keys
+        ).fetchall())
+
+        inserts, updates, unchanged, changes = [], [], [], []
+        for key, data, digest in rows:
+            if key not in existing:
+                inserts.append((key, data, digest, timestamp, timestamp, timestamp))
+                changes.append(dict(json.loads(data), _change="insert"))
+            elif existing[key] != digest:
+                updates.append((data, digest, timestamp, timestamp, key))
+                changes.append(dict(json.loads(data), _change="update"))
+            else:
+                unchanged.append((timestamp, key))
+
+        self.conn.executemany(
+            """
+            INSERT INTO records (key, data, content_hash, first_seen, last_seen, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            inserts,
+        )
+        self.conn.executemany(
+            "UPDATE records SET data = ?, content_hash = ?, last_seen = ?, updated_at = ? WHERE key = ?",
+            updates,
+        )
+        self.conn.executemany("UPDATE records SET last_seen = ? WHERE key = ?", unchanged)
+        stats["inserted"] += len(inserts)
+        stats["updated"] += len(updates)
+        stats["unchanged"] += len(unchanged)
+
+        if changes:
+            if not delta.is_open:
+                delta.open()
+            delta.write_records(changes)
+
+    def iter_records(self, batch_size: int = BATCH_SIZE) -> Iterator[Dict]:
+        """按键顺序遍历主数据集中的所有记录"""
+        cursor = self.conn.execute("SELECT data FROM records ORDER BY key")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def runs(self) -> List[Dict]:
+        """历次运行的统计"""
+        cursor = self.conn.execute("SELECT * FROM runs ORDER BY id")
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        """关闭主数据集"""
+        self.conn.close()
+
+
+def _signed(value: int) -> int:
+    """把无符号64位哈希转换为 SQLite 可存储的有符号整数"""
+    return value - (1 << 64) if value >= 1 << 63 else value
@@ -0,0 +1,123 @@
+"""
+导出规范化 - 把抓取记录转换为导出列
+
+列解析器（导出列 -> 候选源字段）只编译一次；记录只遍历一次，结果写入共享的行缓冲区，
+CSV、Excel 等需要规范化列的格式都从同一个缓冲区读取。
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from src.crawler.record_store import RecordStore
+
+# 导出列顺序
+EXPORT_COLUMNS = [
+    "序号", "专利权人", "申请日", "专利名称", "专利号",
+    "授权公告日", "专利类型", "发明专利申请公布号",
+    "授权公告号", "案件状态", "主分类号"
+]
+
+# 导出列 -> 可能的源字段名（取第一个存在的字段）
+COLUMN_SOURCES = {
+    "专利权人": ["专利权人", "申请人"],
+    "申请日": ["申请日", "申请日期"],
+    "专利名称": ["专利名称", "名称"],
+    "专利号": ["专利号", "申请号"],
+    "授权公告日": ["授权公告日", "公告日期"],
+    "专利类型": ["专利类型", "类型"],
+    "发明专利申请公布号": ["发明专利申请公布号", "公布号"],
+    "授权公告号": ["授权公告号", "公告号"],
+    "案件状态": ["案件状态", "状态"],
+    "主分类号": ["主分类号", "分类号"]
+}
+
+# 序号列（从1开始）
+INDEX_COLUMN = "序号"
+
+_MISSING = object()
+
+
+class RowBuffer:
+    """规范化后的导出行（按 columns 顺序的元组）"""
+
+    def __init__(self, columns: Sequence[str], rows: Optional[List[Tuple]] = None):
+        self.columns = list(columns)
+        self.rows: List[Tuple] = rows if rows is not None else []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self.rows)
+
+    def as_dicts(self) -> Iterator[Dict]:
+        """按字典逐行产出"""
+        for row in self.rows:
+            yield dict(zip(self.columns, row))
+
+
+class RecordNormalizer:
+    """编译后的列解析器"""
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, column_sources: Optional[Dict] = None):
+        """
+        Args:
+            columns: 导出列顺序，默认为 EXPORT_COLUMNS
+            column_sources: 导出列 -> 候选源字段列表，默认为 COLUMN_SOURCES；未列出的列取同名字段
+        """
+        self.columns = list(columns or EXPORT_COLUMNS)
+        column_sources = COLUMN_SOURCES if column_sources is None else column_sources
+        # (导出列, 候选源字段元组)，序号列为 None
+        self._resolvers = tuple(
+            (column, None if column == INDEX_COLUMN else tuple(column_sources.get(column, [column])))
+            for column in self.columns
+        )
+
+    def normalize_record(self, record: Mapping, index: int) -> Tuple:
+        """把一条记录转换为导出行，源字段都不存在时为空字符串"""
+        get = record.get
+        row = []
+        for _, sources in self._resolvers:
+            if sources is None:
+                row.append(index)
+                continue
+            for source in sources:
+                value = get(source, _MISSING)
+                if value is not _MISSING:
+                    break
+            else:
+                value = ""
+            row.append(value)
+        return tuple(row)
+
+    def normalize(self, records: Iterable[Mapping], start: int = 1) -> RowBuffer:
+        """单次遍历记录，生成共享的行缓冲区"""
+        if isinstance(records, RecordStore) and not records.segments:
+            return RowBuffer(self.columns, self._normalize_store(records, start))
+        # 已溢写的 RecordStore 逐条读回（按列读取会为每个源字段重新解压所有段）
+        normalize_record = self.normalize_record
+        return RowBuffer(
+            self.columns,
+            [normalize_record(record, index) for index, record in enumerate(records, start)],
+        )
+
+    def _normalize_store(self, store: RecordStore, start: int) -> List[Tuple]:
+        """按列解析 RecordStore：每个源字段只读取一次整列"""
+        count = len(store)
+        columns: List[Sequence[Any]] = []
+        for _, sources in self._resolvers:
+            if sources is None:
+                columns.append(range(start, start + count))
+                continue
+            present = [source for source in sources if source in store.fields]
+            if not present:
+                columns.append([""] * count)
+                continue
+            values = store.column(present[0], _MISSING)
+            for source in present[1:]:
+                source_values = store.column(source, _MISSING)
+                values = [
+                    source_value if value is _MISSING else value
+                    for value, source_value in zip(values, source_values)
+                ]
+            columns.append(["" if value is _MISSING else value for value in values])
+        return list(zip(*columns))
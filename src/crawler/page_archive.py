@@ -0,0 +1,221 @@
+"""
+渲染页面归档 - 保存结果页的相关HTML，支持离线批量重新提取
+
+归档目录包含两个只追加写入的文件：
+    pages.pack  按内容哈希去重、zlib压缩后的页面数据
+    pages.idx   偏移索引，每行一个JSON对象 {hash, offset, length, url, seq, archived_at}
+
+解析器修复或新增字段后，用 reextract_archive 在所有CPU核心上重新运行
+extract_table_info，无需重新抓取。
+
+每个页面写入后只刷新到操作系统（进程崩溃不丢数据），每 sync_every 页及 close 时 fsync 到磁盘。
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.crawler.patent_parser import extract_table_info
+
+PACK_FILE = "pages.pack"
+INDEX_FILE = "pages.idx"
+
+
+def relevant_page_data(result_data: Dict) -> Dict:
+    """只保留重新提取所需的页面数据（去掉整页HTML等大字段）"""
+    result_info = result_data.get("resultInfo") or {}
+    return {
+        "url": result_data.get("url", ""),
+        "pageTitle": result_data.get("pageTitle", ""),
+        "tableInfoData": result_data.get("tableInfoData") or [],
+        "resultInfo": {
+            "totalResults": result_info.get("totalResults", ""),
+            "tableContent": result_info.get("tableContent", ""),
+        },
+    }
+
+
+class PageArchive:
+    """渲染页面归档"""
+
+    def __init__(self, archive_dir: str, compression_level: int = 6, sync_every: int = 50):
+        """
+        初始化归档
+
+        Args:
+            archive_dir: 归档目录，不存在时自动创建
+            compression_level: zlib压缩级别
+            sync_every: 每归档多少页 fsync 一次，0 表示只在 close 时 fsync
+        """
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.pack_path = self.archive_dir / PACK_FILE
+        self.index_path = self.archive_dir / INDEX_FILE
+        self.compression_level = compression_level
+        self.sync_every = sync_every
+        self.stats = {"added": 0, "duplicates": 0}
+        self._entries: List[Dict] = []
+        self._hashes = set()
+        self._pack = None
+        self._index = None
+        self._unsynced = 0
+        self._load_index()
+
+    def _load_index(self):
+        """读取索引，忽略崩溃时写了一半的条目"""
+        if not self.index_path.exists():
+            return
+        pack_size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry["offset"] + entry["length"] > pack_size:
+                    continue
+                self._entries.append(entry)
+                self._hashes.add(entry["hash"])
+
+    def _open_files(self):
+        """以追加方式打开包文件和索引文件"""
+        self._pack = open(self.pack_path, "ab")
+        # 崩溃时最后一行索引可能没有写完，新条目另起一行，避免和残缺的行合并后一起丢失
+        torn = False
+        if self.index_path.exists() and self.index_path.stat().st_size:
+            with open(self.index_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self._index = open(self.index_path, "a", encoding="utf-8")
+        if torn:
+            self._index.write("\n")
+
+    def sync(self):
+        """把已归档的页面 fsync 到磁盘（先包文件，后索引）"""
+        if self._pack is None:
+            return
+        self._pack.flush()
+        os.fsync(self._pack.fileno())
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """fsync 并关闭归档文件（之后再调用 add 会重新打开）"""
+        if self._pack is None:
+            return
+        self.sync()
+        self._pack.close()
+        self._index.close()
+        self._pack = None
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self._entries))
+
+    def add(self, result_data: Dict) -> Optional[Dict]:
+        """
+        归档一个结果页
+
+        Returns:
+            新的索引条目；内容已存在时返回None
+        """
+        page = relevant_page_data(result_data)
+        payload = json.dumps(page, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        content_hash = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        if content_hash in self._hashes:
+            self.stats["duplicates"] += 1
+            return None
+
+        if self._pack is None:
+            self._open_files()
+        blob = zlib.compress(payload, self.compression_level)
+        offset = self._pack.tell()
+        self._pack.write(blob)
+        # 先写出页面数据再写索引，索引条目不会指向未写出的数据
+        self._pack.flush()
+
+        entry = {
+            "hash": content_hash,
+            "offset": offset,
+            "length": len(blob),
+            "url": page["url"],
+            "seq": len(self._entries),
+            "archived_at": datetime.now().isoformat(),
+        }
+        self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._index.flush()
+
+        self._entries.append(entry)
+        self._hashes.add(content_hash)
+        self.stats["added"] += 1
+        self._unsynced += 1
+        if self.sync_every and self._unsynced >= self.sync_every:
+            self.sync()
+        return entry
+
+    def read(self, entry: Dict) -> Dict:
+        """读取一个归档页面"""
+        return _read_page(str(self.pack_path), entry)
+
+    def iter_pages(self) -> Iterator[Dict]:
+        """按归档顺序读取所有页面"""
+        with open(self.pack_path, "rb") as pack:
+            for entry in self._entries:
+                pack.seek(entry["offset"])
+                yield json.loads(zlib.decompress(pack.read(entry["length"])))
+
+
+def _read_page(pack_path: str, entry: Dict) -> Dict:
+    """从包文件中读取并解压一个页面"""
+    with open(pack_path, "rb") as pack:
+        pack.seek(entry["offset"])
+        return json.loads(zlib.decompress(pack.read(entry["length"])))
+
+
+def _extract_entries(pack_path: str, entries: List[Dict]) -> List[Dict]:
+    """工作进程：重新提取一批归档页面"""
+    records = []
+    with open(pack_path, "rb") as pack:
+        for entry in entries:
+            pack.seek(entry["offset"])
+            page = json.loads(zlib.decompress(pack.read(entry["length"])))
+            records.extend(extract_table_info(page))
+    return records
+
+
+def reextract_archive(
+    archive_dir: str, processes: Optional[int] = None, batch_size: int = 64
+) -> List[Dict]:
+    """
+    在多个进程中对归档页面重新运行 extract_table_info
+
+    Args:
+        archive_dir: 归档目录
+        processes: 进程数，默认使用全部CPU核心；为1时在当前进程中执行
+        batch_size: 每个任务包含的页面数
+
+    Returns:
+        按归档顺序排列的提取结果
+    """
+    archive = PageArchive(archive_dir)
+    entries = list(archive)
+    pack_path = str(archive.pack_path)
+    batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+
+    if processes == 1 or len(batches) <= 1:
+        return [record for batch in batches for record in _extract_entries(pack_path, batch)]
+
+    records = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for batch_records in executor.map(_extract_entries, [pack_path] * len(batches), batches):
+            records.extend(batch_records)
+    return records
@@ -0,0 +1,175 @@
+"""
+专利信息解析 - 从查询结果的 .table_info 块中提取结构化专利数据
+
+不依赖浏览器，可在基准测试、离线重新提取和多进程任务中直接使用。
+"""
+
+import re
+import sys
+from typing import Dict, List
+
+from src.const.fields import CATEGORICAL_FIELDS
+
+
+def intern_categorical(patent_data: Dict) -> Dict:
+    """驻留低基数字段的字符串，相同取值的记录共享同一个字符串对象"""
+    for field in CATEGORICAL_FIELDS:
+        value = patent_data.get(field)
+        if type(value) is str:
+            patent_data[field] = sys.intern(value)
+    return patent_data
+
+
+def parse_patent_info(info_html: str) -> Dict:
+    """解析专利信息HTML"""
+    patent_data = {}
+
+    # 如果传入的是纯文本，使用更精确的纯文本解析
+    if not info_html.startswith('<'):
+        return parse_patent_info_text(info_html)
+
+    # 对于HTML格式，我们使用更精确的HTML标签结构来提取字段
+    # 提取申请号/专利号
+    app_number_match = re.search(r'申请号/专利号：\s*</span>\s*<span[^>]*class="hover_active"[^>]*>([^<]*)</span>', info_html)
+    if app_number_match:
+        patent_data['专利号'] = app_number_match.group(1).strip()
+
+    # 提取发明名称
+    invention_name_match = re.search(r'发明名称：<span[^>]*>([^<]*)</span>', info_html)
+    if invention_name_match:
+        patent_data['专利名称'] = invention_name_match.group(1).strip()
+
+    # 提取申请人
+    applicant_match = re.search(r'申请人：([^<]*)(?=<span|</span>|$)', info_html)
+    if applicant_match:
+        applicant_text = applicant_match.group(1).strip()
+        # 清理可能包含的HTML标签
+        applicant_text = re.sub(r'<[^>]+>', '', applicant_text).strip()
+        patent_data['申请人'] = applicant_text
+
+    # 提取专利类型
+    patent_type_match = re.search(r'专利类型：([^<]*)(?=<span|</span>|$)', info_html)
+    if patent_type_match:
+        patent_type_text = patent_type_match.group(1).strip()
+        patent_type_text = re.sub(r'<[^>]+>', '', patent_type_text).strip()
+        patent_data['专利类型'] = patent_type_text
+
+    # 提取申请日
+    application_date_match = re.search(r'申请日：([^<]*)(?=<span|</span>|$)', info_html)
+    if application_date_match:
+        application_date_text = application_date_match.group(1).strip()
+        application_date_text = re.sub(r'<[^>]+>', '', application_date_text).strip()
+        patent_data['申请日期'] = application_date_text
+
+    # 提取发明专利申请公布号
+    publication_number_match = re.search(r'发明专利申请公布号：([^<]*)(?=<span|</span>|$)', info_html)
+    if publication_number_match:
+        publication_number_text = publication_number_match.group(1).strip()
+        publication_number_text = re.sub(r'<[^>]+>', '', publication_number_text).strip()
+        patent_data['公布号'] = publication_number_text
+
+    # 提取授权公告号
+    grant_number_match = re.search(r'授权公告号：([^<]*)(?=<span|</span>|$)', info_html)
+    if grant_number_match:
+        grant_number_text = grant_number_match.group(1).strip()
+        grant_number_text = re.sub(r'<[^>]+>', '', grant_number_text).strip()
+        patent_data['授权公告号'] = grant_number_text
+
+    # 提取案件状态
+    case_status_match = re.search(r'案件状态：([^<]*)(?=<span|</span>|$)', info_html)
+    if case_status_match:
+        case_status_text = case_status_match.group(1).strip()
+        case_status_text = re.sub(r'<[^>]+>', '', case_status_text).strip()
+        patent_data['案件状态'] = case_status_text
+
+    # 提取授权公告日 - 使用更通用的匹配模式
+    grant_date_match = re.search(r'授权公告日：([^<]*)(?=<span|</span>|$)', info_html)
+    if grant_date_match:
+        grant_date_text = grant_date_match.group(1).strip()
+        grant_date_text = re.sub(r'<[^>]+>', '', grant_date_text).strip()
+        patent_data['授权公告日'] = grant_date_text
+
+    # 提取主分类号 - 使用更通用的匹配模式
+    main_class_match = re.search(r'主分类号：([^<]*)(?=<span|</span>|$)', info_html)
+    if main_class_match:
+        main_class_text = main_class_match.group(1).strip()
+        main_class_text = re.sub(r'<[^>]+>', '', main_class_text).strip()
+        patent_data['主分类号'] = main_class_text
+
+    # 如果HTML解析失败，回退到纯文本解析
+    if not patent_data:
+        clean_text = re.sub(r'<[^>]+>', ' ', info_html)
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+        patent_data = parse_patent_info_text(clean_text)
+
+    return patent_data
+
+
+def parse_patent_info_text(info_text: str) -> Dict:
+    """解析纯文本格式的专利信息"""
+    patent_data = {}
+
+    # 提取申请号/专利号
+    app_number_match = re.search(r'申请号/专利号：\s*([^\s]+)', info_text)
+    if app_number_match:
+        patent_data['专利号'] = app_number_match.group(1).strip()
+
+    # 提取发明名称
+    invention_name_match = re.search(r'发明名称：([^申]+?)(?=\s*申请人：|\s*专利类型：|$)', info_text)
+    if invention_name_match:
+        patent_data['专利名称'] = invention_name_match.group(1).strip()
+
+    # 提取申请人
+    applicant_match = re.search(r'申请人：([^专]+?)(?=\s*专利类型：|\s*申请日：|$)', info_text)
+    if applicant_match:
+        patent_data['申请人'] = applicant_match.group(1).strip()
+
+    # 提取专利类型
+    patent_type_match = re.search(r'专利类型：([^申]+?)(?=\s*申请日：|\s*发明专利申请公布号：|$)', info_text)
+    if patent_type_match:
+        patent_data['专利类型'] = patent_type_match.group(1).strip()
+
+    # 提取申请日
+    application_date_match = re.search(r'申请日：\s*([^\s]+)', info_text)
+    if application_date_match:
+        patent_data['申请日期'] = application_date_match.group(1).strip()
+
+    return patent_data
+
+
+def extract_table_info(result_data: Dict) -> List[Dict]:
+    """从查询结果中提取table_info结构化数据"""
+    table_info_list = []
+
+    # 检查是否有tableInfoData字段
+    if 'tableInfoData' in result_data and result_data['tableInfoData']:
+        for table_info in result_data['tableInfoData']:
+            info_html = table_info.get('html', '')
+            patent_data = intern_categorical(parse_patent_info(info_html))
+            patent_data['raw_text'] = table_info.get('text', '')
+            # 添加元数据
+            patent_data['_source_url'] = result_data.get('url', '')
+            patent_data['_page_title'] = result_data.get('pageTitle', '')
+            table_info_list.append(patent_data)
+
+    # 如果没有新的tableInfoData，尝试从tableContent中提取
+    elif 'resultInfo' in result_data and 'tableContent' in result_data['resultInfo']:
+        table_content = result_data['resultInfo']['tableContent']
+
+        # 使用正则表达式从tableContent中提取table_info块
+        table_info_pattern = r'<div[^>]*class="table_info"[^>]*>(.*?)</div>'
+        table_info_matches = re.findall(table_info_pattern, table_content, re.DOTALL)
+
+        for table_info_html in table_info_matches:
+            # 提取纯文本内容
+            info_text = re.sub(r'<[^>]+>', ' ', table_info_html)
+            info_text = re.sub(r'\s+', ' ', info_text).strip()
+
+            patent_data = intern_categorical(parse_patent_info(table_info_html))
+            patent_data['raw_text'] = info_text
+            # 添加元数据
+            patent_data['_source_url'] = result_data.get('url', '')
+            patent_data['_page_title'] = result_data.get('pageTitle', '')
+            table_info_list.append(patent_data)
+
+    return table_info_list
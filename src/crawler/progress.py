@@ -0,0 +1,127 @@
+"""
+进度通道 - 合并抓取进度事件，按固定频率刷新UI
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class CrawlMetrics:
+    """抓取指标存储，完整保存每一条进度事件"""
+
+    def __init__(self):
+        """初始化指标存储"""
+        self.events: List[Dict] = []
+
+    def record(self, event: Dict):
+        """记录一条进度事件"""
+        self.events.append(event)
+
+    def clear(self):
+        """清空指标"""
+        self.events.clear()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+class ProgressChannel:
+    """
+    进度通道
+
+    引擎的每次进度回调都完整写入指标存储，但只按 refresh_interval
+    向UI发送一次合并后的快照。快照携带累计计数：页数、记录数、速率和预计剩余时间。
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Dict], None],
+        refresh_interval: float = 0.25,
+        metrics: Optional[CrawlMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初始化进度通道
+
+        Args:
+            emit: 接收合并快照的回调（通常是Qt信号的emit）
+            refresh_interval: UI刷新间隔（秒）
+            metrics: 指标存储，为空时自动创建
+            clock: 时钟函数，便于测试替换
+        """
+        self.emit = emit
+        self.refresh_interval = refresh_interval
+        self.metrics = metrics if metrics is not None else CrawlMetrics()
+        self.clock = clock
+        self.start()
+
+    def start(self):
+        """开始新一轮抓取，重置累计计数"""
+        self.metrics.clear()
+        self._started_at = self.clock()
+        self._last_emit_at: Optional[float] = None
+        self._pending = 0
+        self._latest: Dict = {}
+        self._pages_done = 0
+
+    def publish(self, **kwargs):
+        """接收一次进度回调（可直接作为 progress_callback 使用）"""
+        now = self.clock()
+        event = dict(kwargs)
+        event["timestamp"] = now
+        self.metrics.record(event)
+
+        self._latest = event
+        self._pending += 1
+        self._pages_done = max(self._pages_done, event.get("current_page", 0))
+
+        if self._last_emit_at is None or now - self._last_emit_at >= self.refresh_interval:
+            self._emit(now)
+
+    def flush_pending(self):
+        """如果有尚未发送的事件则发送快照（供定时器周期调用）"""
+        if self._pending:
+            self._emit(self.clock())
+
+    def flush(self):
+        """强制发送最新快照（抓取结束时调用）"""
+        if self._latest:
+            self._emit(self.clock())
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """生成包含累计计数的进度快照"""
+        if now is None:
+            now = self.clock()
+        elapsed = max(now - self._started_at, 0.0)
+        current_page = self._latest.get("current_page", 0)
+        total_pages = self._latest.get("total_pages", 0)
+        records_count = self._latest.get("records_count", 0)
+
+        records_per_sec = records_count / elapsed if elapsed > 0 else 0.0
+        pages_per_min = self._pages_done * 60 / elapsed if elapsed > 0 else 0.0
+
+        eta_seconds = None
+        if total_pages and current_page and elapsed > 0:
+            remaining = max(total_pages - current_page, 0)
+            eta_seconds = remaining * elapsed / current_page
+
+        return {
+            "current_page": current_page,
+            "total_pages": total_pages,
+            "records_count": records_count,
+            "message": self._latest.get("message", ""),
+            "pages_done": self._pages_done,
+            "elapsed": elapsed,
+            "records_per_sec": records_per_sec,
+            "pages_per_min": pages_per_min,
+            "eta_seconds": eta_seconds,
+            "coalesced_events": self._pending,
+            "total_events": len(self.metrics),
+        }
+
+    def _emit(self, now: float):
+        """发送快照并重置合并计数"""
+        snapshot = self.snapshot(now)
+        self._last_emit_at = now
+        self._pending = 0
+        self.emit(snapshot)
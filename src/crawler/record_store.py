@@ -0,0 +1,376 @@
+"""
+列式记录存储 - 替代抓取结果的 list-of-dicts
+
+每个字段一个数组；_source_url、_page_title 等在同一页内完全重复的字段，以及专利类型、
+申请人等低基数字段使用共享字典编码，每条记录只保存一个4字节的编码。
+RecordView 把单条记录包装成字典视图，原来按 dict 读写记录的代码（record["专利号"]、record.items()、record["_page_number"] = 1）
+无需修改即可使用。
+
+设置内存预算后，内存中的记录估算大小超出预算时整批溢写到磁盘（zlib压缩的JSON Lines段文件），
+内存中只保留段摘要；遍历、按列读取和导出时透明地读回。已溢写的记录只读（写入时抛出 ValueError），
+溢写时遇到无法写为JSON的值直接抛出 TypeError，不会把值静默转换为字符串。
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import weakref
+import zlib
+from array import array
+from collections.abc import Mapping, MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.const.fields import CATEGORICAL_FIELDS
+
+# 缺失字段占位（区别于值为None的字段）
+_MISSING = object()
+
+
+class RecordView(MutableMapping):
+    """单条记录的字典视图，读写直接作用于所属的 RecordStore"""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "RecordStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.get_value(self._index, key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._store.set_value(self._index, key, value)
+
+    def __delitem__(self, key: str):
+        self._store.get_value(self._index, key)
+        self._store.set_value(self._index, key, _MISSING)
+
+    def __contains__(self, key: object) -> bool:
+        return self._store.has_value(self._index, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.fields_at(self._index))
+
+    def __len__(self) -> int:
+        return len(self._store.fields_at(self._index))
+
+    def __repr__(self) -> str:
+        return f"RecordView({dict(self)!r})"
+
+
+class SpilledRecord(Mapping):
+    """已溢写记录的只读视图，写入时抛出 ValueError（与按索引写入已溢写记录一致）"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict):
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        raise ValueError("记录已溢写到磁盘，不能修改")
+
+    def __delitem__(self, key: str):
+        raise ValueError("记录已溢写到磁盘，不能修改")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"SpilledRecord({self._data!r})"
+
+
+class RecordStore:
+    """列式记录容器"""
+
+    # 默认使用字典编码的字段：同一页的所有记录取值相同的元数据，以及低基数专利字段
+    DICTIONARY_FIELDS = ("_source_url", "_page_title") + CATEGORICAL_FIELDS
+
+    def __init__(
+        self,
+        records: Optional[Iterable[Mapping]] = None,
+        dictionary_fields: Optional[Iterable[str]] = None,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            records: 初始记录
+            dictionary_fields: 使用字典编码的字段，默认为 DICTIONARY_FIELDS
+            memory_budget: 内存中记录的估算大小上限（字节），None表示不限制
+            spill_dir: 溢写目录，默认在首次溢写时创建临时目录；段文件（以及临时目录）在对象回收时删除
+        """
+        self.dictionary_fields = frozenset(
+            self.DICTIONARY_FIELDS if dictionary_fields is None else dictionary_fields
+        )
+        self.fields: List[str] = []
+        self._columns: Dict[str, Union[list, array]] = {}
+        # 所有字典编码字段共享一个字典，编码0表示缺失
+        self._dictionary: List[Any] = [_MISSING]
+        self._codes: Dict[Any, int] = {}
+        # 内存中的记录数；已溢写的记录在前，编号 0 ~ _spilled-1
+        self._length = 0
+        self.memory_budget = memory_budget
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.segments: List[Dict] = []
+        self._spilled = 0
+        self._estimated_bytes = 0
+        self._segment_cache: Tuple[Optional[int], List[Dict]] = (None, [])
+        self._cleanup: Optional[weakref.finalize] = None
+        if records is not None:
+            self.extend(records)
+
+    def _add_field(self, name: str):
+        """新增字段列，已有记录在该字段上为缺失"""
+        self.fields.append(name)
+        if name in self.dictionary_fields:
+            self._columns[name] = array("I", [0]) * self._length
+        else:
+            self._columns[name] = [_MISSING] * self._length
+
+    def _encode(self, value: Any) -> int:
+        """把值加入共享字典并返回编码"""
+        if value is _MISSING:
+            return 0
+        try:
+            code = self._codes.get(value)
+        except TypeError:
+            # 不可哈希的值不去重
+            self._dictionary.append(value)
+            return len(self._dictionary) - 1
+        if code is None:
+            code = self._codes[value] = len(self._dictionary)
+            self._dictionary.append(value)
+        return code
+
+    def append(self, record: Mapping):
+        """追加一条记录"""
+        for name in record:
+            if name not in self._columns:
+                self._add_field(name)
+        get = record.get
+        for name, column in self._columns.items():
+            value = get(name, _MISSING)
+            if name in self.dictionary_fields:
+                column.append(self._encode(value))
+            else:
+                column.append(value)
+        self._length += 1
+
+        if self.memory_budget is not None:
+            self._estimated_bytes += self._estimate_size(record)
+            if self._estimated_bytes > self.memory_budget:
+                self.spill()
+
+    def _estimate_size(self, record: Mapping) -> int:
+        """估算一条记录在内存中的大小（列指针 + 非字典编码字段的值）"""
+        size = 8 * len(self._columns)
+        for name, value in record.items():
+            if name not in self.dictionary_fields:
+                size += sys.getsizeof(value)
+        return size
+
+    def spill(self):
+        """把内存中的记录整批写入磁盘段文件，只保留段摘要"""
+        if not self._length:
+            return
+        if self._cleanup is None:
+            # 对象回收时删除本存储的段文件；溢写目录是临时创建的则整个删除
+            temporary_dir = None
+            if self.spill_dir is None:
+                self.spill_dir = Path(tempfile.mkdtemp(prefix="record_spill_"))
+                temporary_dir = str(self.spill_dir)
+            self._cleanup = weakref.finalize(self, _remove_spill_files, self.segments, temporary_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        path = self.spill_dir / f"segment_{id(self):x}_{len(self.segments):05d}.jsonl.zz"
+        lines = (
+            json.dumps(dict(RecordView(self, self._spilled + i)), ensure_ascii=False)
+            for i in range(self._length)
+        )
+        try:
+            payload = zlib.compress("\n".join(lines).encode("utf-8"), 6)
+        except TypeError as e:
+            raise TypeError(f"记录包含无法溢写为JSON的值: {e}") from e
+        with open(path, "wb") as f:
+            f.write(payload)
+
+        self.segments.append({
+            "path": str(path),
+            "start": self._spilled,
+            "count": self._length,
+            "bytes": len(payload),
+        })
+        self._spilled += self._length
+        self._length = 0
+        self._estimated_bytes = 0
+        self._dictionary = [_MISSING]
+        self._codes = {}
+        for name in self.fields:
+            self._columns[name] = array("I") if name in self.dictionary_fields else []
+
+    def _load_segment(self, number: int) -> List[Dict]:
+        """读取一个段文件（缓存最近读取的一个段）"""
+        cached_number, cached_records = self._segment_cache
+        if cached_number == number:
+            return cached_records
+        with open(self.segments[number]["path"], "rb") as f:
+            text = zlib.decompress(f.read()).decode("utf-8")
+        records = [json.loads(line) for line in text.split("\n")]
+        self._segment_cache = (number, records)
+        return records
+
+    def _spilled_record(self, index: int) -> Dict:
+        """读取已溢写的记录"""
+        for number, segment in enumerate(self.segments):
+            if index < segment["start"] + segment["count"]:
+                return self._load_segment(number)[index - segment["start"]]
+        raise IndexError("记录索引超出范围")
+
+    def _iter_spilled(self) -> Iterator[Dict]:
+        """按顺序读取所有已溢写的记录（逐段读取，不占用缓存）"""
+        for segment in self.segments:
+            with open(segment["path"], "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+            for line in text.split("\n"):
+                yield json.loads(line)
+
+    def iter_chunks(self, size: int) -> Iterator[List[Dict]]:
+        """
+        按块读取记录（字典列表），导出时使用：已溢写的段逐段读回，内存中的记录按列切片，
+        同一时刻只有一块记录转换为字典
+        """
+        chunk: List[Dict] = []
+        for record in self._iter_spilled():
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+        fields = self.fields
+        dictionary = self._dictionary
+        for start in range(0, self._length, size):
+            stop = min(start + size, self._length)
+            if not fields:
+                yield [{} for _ in range(start, stop)]
+                continue
+            columns = []
+            for name in fields:
+                column = self._columns[name][start:stop]
+                if name in self.dictionary_fields:
+                    column = [dictionary[code] for code in column]
+                columns.append(column)
+            yield [
+                {name: value for name, value in zip(fields, row) if value is not _MISSING}
+                for row in zip(*columns)
+            ]
+
+    def extend(self, records: Iterable[Mapping]):
+        """追加多条记录"""
+        for record in records:
+            self.append(record)
+
+    def _raw(self, index: int, key: Any) -> Any:
+        if index < self._spilled:
+            return self._spilled_record(index).get(key, _MISSING)
+        column = self._columns.get(key)
+        if column is None:
+            return _MISSING
+        value = column[index - self._spilled]
+        if key in self.dictionary_fields:
+            return self._dictionary[value]
+        return value
+
+    def get_value(self, index: int, key: str) -> Any:
+        """读取字段值，缺失时抛出KeyError"""
+        value = self._raw(index, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def has_value(self, index: int, key: Any) -> bool:
+        """记录是否包含该字段"""
+        return self._raw(index, key) is not _MISSING
+
+    def set_value(self, index: int, key: str, value: Any):
+        """写入字段值（已溢写的记录只读）"""
+        if index < self._spilled:
+            raise ValueError("记录已溢写到磁盘，不能修改")
+        if key not in self._columns:
+            self._add_field(key)
+        index -= self._spilled
+        if key in self.dictionary_fields:
+            self._columns[key][index] = self._encode(value)
+        else:
+            self._columns[key][index] = value
+
+    def fields_at(self, index: int) -> List[str]:
+        """记录包含的字段（按字段首次出现的顺序）"""
+        return [name for name in self.fields if self._raw(index, name) is not _MISSING]
+
+    def column(self, name: str, default: Any = None) -> List[Any]:
+        """按列读取字段值，缺失的记录取 default"""
+        values = [record.get(name, default) for record in self._iter_spilled()]
+        column = self._columns.get(name)
+        if column is None:
+            return values + [default] * self._length
+        if name in self.dictionary_fields:
+            memory_values = [self._dictionary[code] for code in column]
+        else:
+            memory_values = column
+        values.extend(default if value is _MISSING else value for value in memory_values)
+        return values
+
+    def to_dicts(self) -> List[Dict]:
+        """转换为 list-of-dicts"""
+        return [dict(view) for view in self]
+
+    def __len__(self) -> int:
+        return self._spilled + self._length
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Mapping]:
+        """遍历所有记录：已溢写的记录为只读视图，内存中的记录为可写视图"""
+        for record in self._iter_spilled():
+            yield SpilledRecord(record)
+        for index in range(self._spilled, len(self)):
+            yield RecordView(self, index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RecordView, List[RecordView]]:
+        if isinstance(index, slice):
+            return [RecordView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("记录索引超出范围")
+        return RecordView(self, index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RecordStore):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        spilled = f", 已溢写 {self._spilled} 条" if self._spilled else ""
+        return f"RecordStore({len(self)} 条记录, {len(self.fields)} 个字段{spilled})"
+
+
+def _remove_spill_files(segments: List[Dict], temporary_dir: Optional[str]):
+    """删除段文件，以及溢写时创建的临时目录"""
+    for segment in segments:
+        Path(segment["path"]).unlink(missing_ok=True)
+    if temporary_dir:
+        shutil.rmtree(temporary_dir, True)
@@ -0,0 +1,167 @@
+"""
+流式HTML提取 - 增量解析大页面，逐行产出数据
+
+把HTML分块送入 lxml 的事件驱动解析器（HTMLPullParser），在每个 <tr> 或 .table_info
+结束时立即产出数据，并释放已处理的节点。峰值内存约为一行数据加上解析器缓冲区，
+而不是整棵文档树。
+
+只支持单个简单选择器：标签名、#id、.class 及其组合（如 table.result、div#list）。
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional, Union
+
+from lxml import etree
+
+from src.crawler.patent_parser import intern_categorical, parse_patent_info
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_SIMPLE_SELECTOR = re.compile(r"^\s*([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)\s*$")
+
+HtmlSource = Union[str, bytes, Iterable[Union[str, bytes]]]
+
+
+class SimpleSelector:
+    """单个简单CSS选择器"""
+
+    def __init__(self, tag: Optional[str], element_id: Optional[str], classes: List[str]):
+        self.tag = tag.lower() if tag else None
+        self.element_id = element_id
+        self.classes = classes
+
+    @classmethod
+    def parse(cls, selector: str) -> Optional["SimpleSelector"]:
+        """解析选择器，不支持的选择器（组合器、属性、伪类等）返回None"""
+        match = _SIMPLE_SELECTOR.match(selector or "")
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        element_id = None
+        classes = []
+        for part in re.findall(r"[.#][\w-]+", match.group(2)):
+            if part[0] == "#":
+                if element_id is not None:
+                    return None
+                element_id = part[1:]
+            else:
+                classes.append(part[1:])
+        return cls(match.group(1), element_id, classes)
+
+    def matches(self, element) -> bool:
+        """判断元素是否匹配"""
+        if self.tag and element.tag != self.tag:
+            return False
+        if self.element_id is not None and element.get("id") != self.element_id:
+            return False
+        if self.classes:
+            element_classes = (element.get("class") or "").split()
+            return all(name in element_classes for name in self.classes)
+        return True
+
+
+def _iter_chunks(source: HtmlSource, chunk_size: int) -> Iterator[Union[str, bytes]]:
+    """把HTML字符串切块，或直接透传分块来源（如逐块读取的文件）"""
+    if isinstance(source, (str, bytes)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    else:
+        yield from source
+
+
+def _pull_events(source: HtmlSource, chunk_size: int, encoding: str):
+    """增量解析，产出 (事件, 元素)；encoding 只作用于字节输入"""
+    parser = etree.HTMLPullParser(events=("start", "end"), encoding=encoding)
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from parser.read_events()
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # 空文档
+        return
+    yield from parser.read_events()
+
+
+def _release(element):
+    """释放已处理的元素及其之前的兄弟节点"""
+    element.clear(keep_tail=True)
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def iter_table_rows(
+    source: HtmlSource,
+    table_selector: SimpleSelector,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[List]:
+    """
+    流式产出第一个匹配表格中每一行的单元格列表
+
+    行和单元格的范围与 BeautifulSoup 的 table.find_all("tr") / row.find_all(["td", "th"])
+    一致：嵌套表格中的行在外层行结束后按文档顺序产出。
+    """
+    table = None
+    pending_rows = []
+    row_depth = 0
+
+    for event, element in _pull_events(source, chunk_size, encoding):
+        if table is None:
+            if event == "start" and table_selector.matches(element):
+                table = element
+            elif event == "end":
+                _release(element)
+            continue
+
+        if element.tag == "tr" and element is not table:
+            if event == "start":
+                pending_rows.append(element)
+                row_depth += 1
+            else:
+                row_depth -= 1
+                if row_depth == 0:
+                    for row in pending_rows:
+                        yield list(row.iterdescendants("td", "th"))
+                    pending_rows = []
+                    _release(element)
+        elif event == "end" and element is table:
+            return
+
+
+def iter_table_info(
+    source: HtmlSource,
+    page_url: str = "",
+    page_title: str = "",
+    selector: str = ".table_info",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[dict]:
+    """
+    流式解析 .table_info 专利信息块
+
+    每条记录与 extract_table_info 处理 tableInfoData（outerHTML + textContent）时的结果一致。
+    """
+    info_selector = SimpleSelector.parse(selector)
+    if info_selector is None:
+        raise ValueError(f"流式解析不支持该选择器: {selector}")
+
+    current = None
+    for event, element in _pull_events(source, chunk_size, encoding):
+        if current is None:
+            if event == "start" and info_selector.matches(element):
+                current = element
+            elif event == "end":
+                _release(element)
+            continue
+
+        if event == "end" and element is current:
+            info_html = etree.tostring(element, method="html", encoding="unicode", with_tail=False)
+            patent_data = intern_categorical(parse_patent_info(info_html))
+            patent_data["raw_text"] = "".join(element.itertext()).strip()
+            patent_data["_source_url"] = page_url
+            patent_data["_page_title"] = page_title
+            current = None
+            _release(element)
+            yield patent_data
@@ -3,11 +3,15 @@
 Database Models
 """
 
+import copy
 import sqlite3
 import json
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Mapping
 from pathlib import Path
+import uuid
+
+from src.const.fields import CATEGORICAL_FIELDS
 
 
 class Database:
@@ -80,10 +84,16 @@ class Database:
                 link_filter_rule TEXT,
                 tracking_depth INTEGER DEFAULT 1,
                 dedup_strategy TEXT,
+                options TEXT,  -- JSON格式存储其他策略选项（内存预算、流式导出等）
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (page_config_id) REFERENCES page_configs(id) ON DELETE CASCADE
             )
         """)
+
+        # 迁移：旧数据库的抓取策略表没有 options 列
+        columns = [column[1] for column in cursor.execute("PRAGMA table_info(crawl_strategies)")]
+        if "options" not in columns:
+            cursor.execute("ALTER TABLE crawl_strategies ADD COLUMN options TEXT")
         
         # 表单查询配置表
         cursor.execute("""
@@ -131,6 +141,22 @@ class Database:
             )
         """)
 
+        # 按任务顺序读取结果（iter_results 按 crawled_at 顺序游标遍历）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_crawl_results_task
+            ON crawl_results (task_id, crawled_at)
+        """)
+
+        # 低基数字段取值查找表（crawl_results.data 中只保存取值ID）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS field_values (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                UNIQUE (field, value)
+            )
+        """)
+
         conn.commit()
 
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
@@ -215,6 +241,8 @@ class PageConfig:
 
     def __init__(self, db: Database):
         self.db = db
+        # 页面配置ID -> (映射JSON, 清洗规则JSON, 解析后的映射, 解析后的清洗规则)
+        self._decoded: Dict[str, tuple] = {}
 
     def create(
         self,
@@ -246,32 +274,62 @@ class PageConfig:
         )
         return id
 
+    def _decode(self, config: Dict) -> Dict:
+        """解析映射和清洗规则JSON，配置未修改时复用上次的解析结果"""
+        raw = (config["field_mappings"], config["data_cleaning_rules"])
+        cached = self._decoded.get(config["id"])
+        if not cached or cached[:2] != raw:
+            cached = self._decoded[config["id"]] = raw + (json.loads(raw[0]), json.loads(raw[1]))
+        # 返回副本，调用方修改不影响缓存
+        config["field_mappings"] = dict(cached[2] or {})
+        config["data_cleaning_rules"] = dict(cached[3] or {})
+        return config
+
     def get(self, id: str) -> Optional[Dict]:
         """获取页面配置"""
         config = self.db.fetchone("SELECT * FROM page_configs WHERE id = ?", (id,))
-        if config:
-            config["field_mappings"] = json.loads(config["field_mappings"])
-            config["data_cleaning_rules"] = json.loads(config["data_cleaning_rules"])
-        return config
+        if not config:
+            self._decoded.pop(id, None)
+            return None
+        return self._decode(config)
 
     def get_by_site(self, site_config_id: str) -> List[Dict]:
         """获取网站下的所有页面配置"""
         configs = self.db.fetchall(
             "SELECT * FROM page_configs WHERE site_config_id = ?", (site_config_id,)
         )
-        for config in configs:
-            config["field_mappings"] = json.loads(config["field_mappings"])
-            config["data_cleaning_rules"] = json.loads(config["data_cleaning_rules"])
-        return configs
+        return [self._decode(config) for config in configs]
 
     def delete(self, id: str):
         """删除页面配置"""
         self.db.execute("DELETE FROM page_configs WHERE id = ?", (id,))
+        self._decoded.pop(id, None)
 
 
 class CrawlStrategy:
     """抓取策略模型"""
 
+    # options 列中的策略选项及默认值，get_by_page 时合并到策略字典顶层
+    DEFAULT_OPTIONS: Dict[str, Any] = {
+        # 抓取结果超过内存预算（MB）后溢写到 spill_dir（为空时使用系统临时目录），None 表示不限
+        "memory_budget_mb": 512,
+        "spill_dir": None,
+        # 抓取过程中逐页写入的导出格式（csv / jsonl / json / excel / parquet）
+        "stream_formats": ["csv"],
+        # 结果页归档目录，为空时不归档
+        "archive_dir": None,
+        # 结果页只取列表HTML并流式解析（超大结果页时减少内存占用）
+        "streaming_extraction": False,
+        # 抓取结束后合并到站点主数据集，并只输出本次变化的记录
+        "incremental_export": False,
+        # CSV、JSON、JSON Lines 导出（含流式写入和差异文件）的压缩方式：gzip / zstd，None 不压缩
+        "export_compression": None,
+        # 记录抓取任务，并把每页新记录保存到任务结果表
+        "store_results": False,
+        # 浏览器交互录制目录（可用 ReplayController 脱离浏览器回放），为空时不录制
+        "record_dir": None,
+    }
+
     def __init__(self, db: Database):
         self.db = db
 
@@ -285,14 +343,16 @@ class CrawlStrategy:
         enable_link_tracking: bool = False,
         link_extraction_rule: str = "",
         tracking_depth: int = 1,
+        dedup_strategy: str = "key",
+        options: Optional[Dict] = None,
     ) -> str:
-        """创建抓取策略"""
+        """创建抓取策略（options 只需包含与默认值不同的选项）"""
         self.db.execute(
             """
             INSERT INTO crawl_strategies 
             (id, page_config_id, pagination_type, pagination_params, max_pages,
-             enable_link_tracking, link_extraction_rule, tracking_depth)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+             enable_link_tracking, link_extraction_rule, tracking_depth, dedup_strategy, options)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 id,
@@ -303,10 +363,23 @@ class CrawlStrategy:
                 1 if enable_link_tracking else 0,
                 link_extraction_rule,
                 tracking_depth,
+                dedup_strategy,
+                json.dumps(options or {}),
             ),
         )
         return id
 
+    def update_options(self, id: str, options: Dict):
+        """更新策略选项（与已保存的选项合并）"""
+        row = self.db.fetchone("SELECT options FROM crawl_strategies WHERE id = ?", (id,))
+        if not row:
+            return
+        stored = json.loads(row["options"] or "{}")
+        stored.update(options)
+        self.db.execute(
+            "UPDATE crawl_strategies SET options = ? WHERE id = ?", (json.dumps(stored), id)
+        )
+
     def get_by_page(self, page_config_id: str) -> Optional[Dict]:
         """获取页面的抓取策略"""
         strategy = self.db.fetchone(
@@ -315,6 +388,9 @@ class CrawlStrategy:
         if strategy:
             strategy["pagination_params"] = json.loads(strategy["pagination_params"])
             strategy["enable_link_tracking"] = bool(strategy["enable_link_tracking"])
+            options = json.loads(strategy.pop("options") or "{}")
+            for key, default in self.DEFAULT_OPTIONS.items():
+                strategy[key] = copy.deepcopy(options.get(key, default))
         return strategy
 
 
@@ -394,8 +470,12 @@ class FormConfig:
 class CrawlTask:
     """抓取任务模型"""
 
+    # 结果数据中编码为 field_values ID 的字段列表所在的键
+    CODED_KEY = "_coded"
+
     def __init__(self, db: Database):
         self.db = db
+        self._value_ids: Dict[tuple, int] = {}
 
     def create(
         self, id: str, name: str, page_config_id: str, export_formats: List[str], export_path: str
@@ -454,11 +534,95 @@ class CrawlTask:
             (result_id, task_id, source_url, json.dumps(data)),
         )
 
+    def _value_id(self, field: str, value: str) -> int:
+        """获取字段取值在查找表中的ID，不存在时插入"""
+        key = (field, value)
+        value_id = self._value_ids.get(key)
+        if value_id is None:
+            conn = self.db.connect()
+            conn.execute(
+                "INSERT OR IGNORE INTO field_values (field, value) VALUES (?, ?)", key
+            )
+            value_id = conn.execute(
+                "SELECT id FROM field_values WHERE field = ? AND value = ?", key
+            ).fetchone()[0]
+            self._value_ids[key] = value_id
+        return value_id
+
+    def _encode_result(self, record: Mapping) -> str:
+        """序列化结果，低基数字段替换为查找表ID"""
+        data = dict(record)
+        coded = [field for field in CATEGORICAL_FIELDS if type(data.get(field)) is str]
+        for field in coded:
+            data[field] = self._value_id(field, data[field])
+        if coded:
+            data[self.CODED_KEY] = coded
+        return json.dumps(data)
+
+    def add_results(self, task_id: str, records: Iterable[Mapping], source_url_field: str = "_source_url"):
+        """批量添加抓取结果（接受 list-of-dicts 或 RecordStore），一批在同一事务中写入"""
+        conn = self.db.connect()
+        try:
+            conn.executemany(
+                """
+                INSERT INTO crawl_results (id, task_id, source_url, data)
+                VALUES (?, ?, ?, ?)
+                """,
+                (
+                    (str(uuid.uuid4()), task_id, record.get(source_url_field, ""), self._encode_result(record))
+                    for record in records
+                ),
+            )
+            conn.commit()
+        except Exception:
+            # 回滚会撤销本批新插入的取值，缓存中可能已有这些ID，整体丢弃
+            conn.rollback()
+            self._value_ids.clear()
+            raise
+
     def get_results(self, task_id: str) -> List[Dict]:
         """获取任务的所有结果"""
-        results = self.db.fetchall(
-            "SELECT * FROM crawl_results WHERE task_id = ? ORDER BY crawled_at", (task_id,)
-        )
-        for result in results:
-            result["data"] = json.loads(result["data"])
-        return results
+        return list(self.iter_results(task_id))
+
+    def iter_results(self, task_id: str, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        按批从游标读取任务结果（内存占用与结果数无关）
+
+        Args:
+            task_id: 任务ID
+            batch_size: 每批从数据库读取的行数
+        """
+        # 使用独立连接，遍历期间不受其他写入和提交影响
+        conn = sqlite3.connect(str(self.db.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(
+                "SELECT * FROM crawl_results WHERE task_id = ? ORDER BY crawled_at, rowid", (task_id,)
+            )
+            values = {}
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    result = dict(row)
+                    data = result["data"] = json.loads(result["data"])
+                    for field in data.pop(self.CODED_KEY, None) or ():
+                        value_id = data[field]
+                        if value_id not in values:
+                            # 遍历期间其他写入可能新增取值，查不到时重新读取查找表
+                            values = dict(conn.execute("SELECT id, value FROM field_values").fetchall())
+                        data[field] = values[value_id]
+                    yield result
+        finally:
+            conn.close()
+
+    def iter_records(self, task_id: str, batch_size: int = 1000) -> Iterator[Dict]:
+        """按批读取任务结果的记录数据（用于导出）"""
+        for result in self.iter_results(task_id, batch_size):
+            yield result["data"]
+
+    def count_results(self, task_id: str) -> int:
+        """任务的结果数"""
+        row = self.db.fetchone("SELECT COUNT(*) AS count FROM crawl_results WHERE task_id = ?", (task_id,))
+        return row["count"] if row else 0
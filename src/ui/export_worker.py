@@ -0,0 +1,82 @@
+"""
+后台导出 - 在独立线程中执行导出，不阻塞界面
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..crawler.data_exporter import DataExporter
+
+
+class ExportWorker(QObject):
+    """导出工作器，移动到 QThread 后在后台执行 export_multi_format"""
+    progress = pyqtSignal(dict)  # {"fmt", "written", "total"}
+    finished = pyqtSignal(dict)  # {"results": 格式 -> 路径, "incremental": 增量导出结果, "cancelled": bool}
+    error = pyqtSignal(str)
+
+    def __init__(
+        self,
+        exporter: DataExporter,
+        data,
+        filename: str,
+        formats: List[str],
+        site_name: str = "",
+        incremental: bool = False,
+        compression: Optional[str] = None,
+    ):
+        """
+        Args:
+            exporter: 数据导出器
+            data: 抓取结果（RecordStore 或 list-of-dicts），导出期间不应再修改
+            filename: 导出文件名（不含扩展名）
+            formats: 导出格式
+            site_name: 站点名，增量导出时用于定位主数据集
+            incremental: 是否同时合并到站点主数据集
+            compression: 压缩方式（gzip / zstd），为空时使用导出器的设置
+        """
+        super().__init__()
+        self.exporter = exporter
+        self.data = data
+        self.filename = filename
+        self.formats = formats
+        self.site_name = site_name
+        self.incremental = incremental
+        self.compression = compression
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """请求取消（在下一个分块处停止，未完成的文件会被删除）"""
+        self.cancel_event.set()
+
+    def run(self):
+        """执行导出（在工作线程中调用）"""
+        try:
+            results: Dict[str, str] = {}
+            if self.formats:
+                results = self.exporter.export_multi_format(
+                    self.data,
+                    self.filename,
+                    self.formats,
+                    progress_callback=lambda **kwargs: self.progress.emit(kwargs),
+                    cancel_event=self.cancel_event,
+                    compression=self.compression,
+                )
+            incremental: Optional[Dict] = None
+            if self.incremental and not self.cancel_event.is_set():
+                incremental = self.exporter.export_incremental(
+                    self.data, self.site_name, compression=self.compression
+                )
+            self.finished.emit({
+                "results": results,
+                "incremental": incremental,
+                "cancelled": self.cancel_event.is_set(),
+            })
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.error.emit(f"导出失败: {e}")
+        finally:
+            # 导出结束后释放抓取结果
+            self.data = None
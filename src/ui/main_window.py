@@ -31,13 +31,16 @@ from PyQt6.QtWidgets import (
     QLineEdit
 )
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal, QUrl
+from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal, QUrl, QTimer
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtGui import QCloseEvent
 from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings, QWebEnginePage
 from ..database.models import Database, SiteConfig, PageConfig, CrawlStrategy, FormConfig, CrawlTask
 from ..crawler.crawler_engine import CrawlerEngine
 from ..crawler.data_exporter import DataExporter
+from .export_worker import ExportWorker
+from .strategy_dialog import StrategyOptionsDialog
+from ..crawler.progress import ProgressChannel
 
 # 创建全局自定义配置文件实例
 _persistent_profile = None
@@ -97,18 +100,32 @@ def get_persistent_profile():
 class CrawlWorker(QObject):
     """爬虫工作器，用于在主线程中执行爬虫操作"""
     progress = pyqtSignal(dict)
-    finished = pyqtSignal(list)
+    finished = pyqtSignal(object)  # RecordStore
     error = pyqtSignal(str)
     
-    def __init__(self, engine: CrawlerEngine, start_url: str, page_config: dict, strategy: dict, form_data: dict = None):
+    # UI进度刷新间隔（毫秒）
+    PROGRESS_REFRESH_MS = 250
+
+    def __init__(self, engine: CrawlerEngine, start_url: str, page_config: dict, strategy: dict, form_data: dict = None, task_id: str = None):
         super().__init__()
         self.engine = engine
         self.start_url = start_url
         self.page_config = page_config
         self.strategy = strategy
         self.form_data = form_data  # 表单数据，用于表单查询
+        self.task_id = task_id  # 抓取任务ID，结果逐页保存到数据库
         self.page_config_id = page_config.get('id') if page_config else None
         self.is_running = True
+
+        # 进度事件合并：完整事件写入引擎指标存储，UI按固定频率刷新
+        self.progress_channel = ProgressChannel(
+            self.progress.emit,
+            refresh_interval=self.PROGRESS_REFRESH_MS / 1000,
+            metrics=engine.metrics if engine else None,
+        )
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(self.PROGRESS_REFRESH_MS)
+        self.progress_timer.timeout.connect(self.progress_channel.flush_pending)
     
     def stop(self):
         """停止爬虫"""
@@ -122,16 +139,23 @@ class CrawlWorker(QObject):
             def progress_callback(**kwargs):
                 if not self.is_running:
                     raise Exception("爬虫已停止")
-                self.progress.emit(kwargs)
+                self.progress_channel.publish(**kwargs)
             
-            # 根据是否有表单数据选择不同的抓取方法
-            data = self.engine.start_crawl(
-                self.start_url,
-                self.page_config,
-                self.strategy,
-                page_config_id = self.page_config_id,
-                progress_callback = progress_callback,
-            )
+            self.progress_channel.start()
+            self.progress_timer.start()
+            try:
+                # 根据是否有表单数据选择不同的抓取方法
+                data = self.engine.start_crawl(
+                    self.start_url,
+                    self.page_config,
+                    self.strategy,
+                    page_config_id = self.page_config_id,
+                    progress_callback = progress_callback,
+                    task_id = self.task_id,
+                )
+            finally:
+                self.progress_timer.stop()
+                self.progress_channel.flush()
             
             if self.is_running:
                 self.finished.emit(data)
@@ -450,6 +474,8 @@ class MainWindow(QMainWindow):
         self.current_site_id = None
         self.current_page_config = None
         self.crawl_thread = None
+        # 后台导出任务 [(QThread, ExportWorker)]，可同时有多个
+        self.export_jobs = []
         self.browser_view = None
         self.crawler_engine = None  # 存储爬虫引擎实例
         
@@ -471,6 +497,11 @@ class MainWindow(QMainWindow):
         new_config_action.triggered.connect(self.create_new_site_config)
         config_menu.addAction(new_config_action)
 
+        # 编辑当前配置的抓取策略选项
+        strategy_action = QAction("抓取策略", self)
+        strategy_action.triggered.connect(self.edit_strategy)
+        config_menu.addAction(strategy_action)
+
     def init_ui(self):
         """初始化UI"""
         self.setWindowTitle("网页数据抓取工具 v0.1.0")
@@ -856,7 +887,15 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择一个网站配置")
             return
         
-        QMessageBox.information(self, "提示", "编辑策略功能正在开发中...\n\n当前策略信息将在此显示并允许编辑。")
+        strategy = self.strategy_model.get_by_page(self.current_page_config['id'])
+        if not strategy:
+            QMessageBox.warning(self, "警告", "未找到抓取策略")
+            return
+
+        dialog = StrategyOptionsDialog(self, strategy)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.strategy_model.update_options(strategy['id'], dialog.options())
+            self.log("✅ 抓取策略已保存")
 
     def open_form_config(self):
         """打开表单配置对话框"""
@@ -899,11 +938,22 @@ class MainWindow(QMainWindow):
         
         # 使用已创建的爬虫引擎（已关联到browser_view）
         if not self.crawler_engine:
-            self.crawler_engine = CrawlerEngine(self.browser_view)
+            self.crawler_engine = CrawlerEngine(self.browser_view, exporter=self.exporter)
+
+        # 流式写入的文件和抓取结束后导出的其余格式使用同一个按站点命名的文件名
+        strategy["stream_name"] = self.exporter.generate_filename(site['name'])
+
+        # 策略启用 store_results 时记录抓取任务，抓取结果逐页保存到任务结果表
+        self.crawler_engine.task_model = self.task_model
+        task_id = None
+        if strategy.get("store_results"):
+            task_id = self.task_model.create(
+                str(uuid.uuid4()), site['name'], self.current_page_config['id'], [], ""
+            )
         
         # 创建爬虫工作器（在主线程中执行）
         self.crawl_worker = CrawlWorker(
-            self.crawler_engine, site['start_url'], self.current_page_config, strategy, form_data
+            self.crawler_engine, site['start_url'], self.current_page_config, strategy, form_data, task_id
         )
         # 传递页面配置ID给爬虫引擎
         if hasattr(self.crawler_engine, 'set_page_config_id'):
@@ -937,43 +987,121 @@ class MainWindow(QMainWindow):
         self.log("⏹️ 停止抓取")
 
     def on_crawl_progress(self, progress: dict):
-        """抓取进度更新"""
+        """抓取进度更新（接收合并后的进度快照）"""
         current = progress.get("current_page", 0)
         total = progress.get("total_pages", 100)
         message = progress.get("message", "")
         
         percentage = int((current / total) * 100) if total > 0 else 0
         self.progress_bar.setValue(percentage)
-        self.log_text.append(f"📊 {message}")
 
-    def on_crawl_finished(self, data: list):
-        """抓取完成"""
+        summary = (
+            f"共 {progress.get('records_count', 0)} 条, "
+            f"{progress.get('records_per_sec', 0.0):.1f} 条/秒"
+        )
+        eta_seconds = progress.get("eta_seconds")
+        if eta_seconds is not None:
+            summary += f", 预计剩余 {int(eta_seconds)} 秒"
+        self.log_text.append(f"📊 {message} ({summary})")
+
+    def on_crawl_finished(self, data):
+        """抓取完成，导出在后台线程中进行，期间可以开始下一次抓取"""
         self.log_text.append(f"✅ 抓取完成! 共获取 {len(data)} 条数据")
         
+        self.start_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.stop_btn.setEnabled(False)
+        self.progress_bar.setValue(100)
+
         # 导出数据
         if data and self.current_site_id:
             site = self.site_config_model.get(self.current_site_id)
             if site:
-                filename = self.exporter.generate_filename(site['name'])
-                results = self.exporter.export_multi_format(
-                    data, filename, ["csv", "json", "excel"]
+                # 策略启用增量导出时，合并到站点主数据集并只输出本次变化的记录
+                strategy = self.crawl_worker.strategy if hasattr(self, 'crawl_worker') else {}
+                filename = strategy.get("stream_name") or self.exporter.generate_filename(site['name'])
+                formats = ["csv", "json", "excel"]
+                # 抓取过程中已流式写入的格式不再重复导出
+                streamed = self.crawler_engine.stream_paths if self.crawler_engine else {}
+                for fmt, path in streamed.items():
+                    if fmt in formats:
+                        formats.remove(fmt)
+                    self.log(f"💾 已导出{fmt}格式: {path}")
+                self.start_export(
+                    data, filename, formats, site['name'], bool(strategy.get("incremental_export")),
+                    strategy.get("export_compression"),
                 )
-                
-                for fmt, path in results.items():
-                    # 确保路径可以被log方法正确识别为文件路径
-                    # 如果路径不包含扩展名，添加扩展名
-                    if not any(ext in path.lower() for ext in ['.csv', '.json', '.xlsx', '.txt']):
-                        self.log(f"💾 已导出{fmt}格式: {path}")
-                    else:
-                        # 直接将完整路径传递给log方法，让它处理路径转换
-                        self.log(f"💾 已导出{fmt}格式: {path}")
-        
-        self.start_btn.setEnabled(True)
-        self.pause_btn.setEnabled(False)
-        self.stop_btn.setEnabled(False)
-        self.progress_bar.setValue(100)
         
-        QMessageBox.information(self, "完成", f"抓取完成! 共 {len(data)} 条数据")
+        self.statusBar().showMessage(f"抓取完成! 共 {len(data)} 条数据", 5000)
+
+    def start_export(
+        self, data, filename: str, formats: list, site_name: str, incremental: bool = False,
+        compression: Optional[str] = None,
+    ):
+        """在后台线程中导出抓取结果（compression 为策略中的 export_compression）"""
+        if not formats and not incremental:
+            return
+        thread = QThread(self)
+        worker = ExportWorker(self.exporter, data, filename, formats, site_name, incremental, compression)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self.on_export_progress)
+        worker.finished.connect(self.on_export_finished)
+        worker.error.connect(self.on_export_error)
+        worker.finished.connect(thread.quit)
+        worker.error.connect(thread.quit)
+        thread.finished.connect(lambda: self._remove_export_job(thread))
+        self.export_jobs.append((thread, worker))
+        thread.start()
+        self.log(f"📤 后台导出 {filename}: {', '.join(formats) or '增量'}")
+
+    def on_export_progress(self, progress: dict):
+        """导出进度更新"""
+        total = progress.get("total") or 0
+        percentage = int(progress["written"] * 100 / total) if total else 100
+        self.statusBar().showMessage(
+            f"导出{progress['fmt']}格式: {progress['written']}/{total} ({percentage}%)"
+        )
+
+    def on_export_finished(self, result: dict):
+        """导出完成（非模态提示）"""
+        for fmt, path in result["results"].items():
+            self.log(f"💾 已导出{fmt}格式: {path}")
+        incremental = result["incremental"]
+        if incremental:
+            stats = incremental["stats"]
+            self.log(
+                f"🔁 增量导出: 新增 {stats['inserted']} 条, 更新 {stats['updated']} 条, "
+                f"未变化 {stats['unchanged']} 条"
+            )
+            if incremental["delta"]:
+                self.log(f"💾 已导出差异文件: {incremental['delta']}")
+        if result["cancelled"]:
+            self.log("⏹️ 导出已取消")
+            self.statusBar().showMessage("导出已取消", 5000)
+        else:
+            self.statusBar().showMessage(f"导出完成: {len(result['results'])} 个文件", 5000)
+
+    def on_export_error(self, error: str):
+        """导出错误（非模态提示）"""
+        self.log(f"❌ {error}")
+        self.statusBar().showMessage(error, 5000)
+
+    def _remove_export_job(self, thread: QThread):
+        """导出线程结束后释放任务"""
+        for job in self.export_jobs:
+            if job[0] is thread:
+                self.export_jobs.remove(job)
+                job[1].deleteLater()
+                thread.deleteLater()
+                break
+
+    def cancel_exports(self, wait: bool = True):
+        """取消所有后台导出，wait 为 True 时等待导出线程结束"""
+        for thread, worker in list(self.export_jobs):
+            worker.cancel()
+            if wait:
+                thread.wait()
 
     def on_crawl_error(self, error: str):
         """抓取错误"""
@@ -1163,9 +1291,21 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 self.stop_crawl()
                 self.crawl_thread.wait()
+                self.cancel_exports()
                 a0.accept()
             else:
                 a0.ignore()
         else:
+            if self.export_jobs:
+                reply = QMessageBox.question(
+                    self,
+                    "确认退出",
+                    "数据正在后台导出,确定要退出吗?未完成的导出文件将被删除",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                )
+                if reply != QMessageBox.StandardButton.Yes:
+                    a0.ignore()
+                    return
+                self.cancel_exports()
             self.db.close()
             a0.accept()
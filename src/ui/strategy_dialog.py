@@ -0,0 +1,117 @@
+"""
+抓取策略选项对话框 - 编辑保存在 crawl_strategies.options 中的策略选项
+"""
+
+from typing import Dict, Optional
+
+from PyQt6.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QDialog,
+    QDialogButtonBox,
+    QFormLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QSpinBox,
+    QVBoxLayout,
+)
+
+# 可在抓取过程中流式写入的格式 -> 显示名称
+STREAM_FORMATS = {"csv": "CSV", "jsonl": "JSON Lines", "json": "JSON", "excel": "Excel", "parquet": "Parquet"}
+
+# 导出压缩方式 -> 显示名称
+COMPRESSIONS = {None: "不压缩", "gzip": "gzip (.gz)", "zstd": "zstd (.zst)"}
+
+
+class StrategyOptionsDialog(QDialog):
+    """抓取策略选项对话框"""
+
+    def __init__(self, parent=None, strategy: Optional[Dict] = None):
+        """
+        Args:
+            parent: 父窗口
+            strategy: CrawlStrategy.get_by_page 返回的策略（已合并默认选项）
+        """
+        super().__init__(parent)
+        self.strategy = strategy or {}
+        self.init_ui()
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle("抓取策略")
+        main_layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        # 内存预算，0 表示不限
+        self.memory_budget_spin = QSpinBox()
+        self.memory_budget_spin.setRange(0, 1024 * 1024)
+        self.memory_budget_spin.setSuffix(" MB")
+        self.memory_budget_spin.setSpecialValueText("不限")
+        self.memory_budget_spin.setValue(int(self.strategy.get("memory_budget_mb") or 0))
+        form.addRow("内存预算:", self.memory_budget_spin)
+
+        self.spill_dir_edit = QLineEdit(self.strategy.get("spill_dir") or "")
+        self.spill_dir_edit.setPlaceholderText("系统临时目录")
+        form.addRow("溢写目录:", self.spill_dir_edit)
+
+        # 抓取过程中逐页写入的格式，抓取结束后不再重复导出
+        stream_formats = self.strategy.get("stream_formats") or []
+        self.stream_format_checks: Dict[str, QCheckBox] = {}
+        stream_layout = QHBoxLayout()
+        for fmt, label in STREAM_FORMATS.items():
+            check = QCheckBox(label)
+            check.setChecked(fmt in stream_formats)
+            self.stream_format_checks[fmt] = check
+            stream_layout.addWidget(check)
+        form.addRow("边抓取边写入:", stream_layout)
+
+        self.archive_dir_edit = QLineEdit(self.strategy.get("archive_dir") or "")
+        self.archive_dir_edit.setPlaceholderText("不归档")
+        form.addRow("结果页归档目录:", self.archive_dir_edit)
+
+        self.record_dir_edit = QLineEdit(self.strategy.get("record_dir") or "")
+        self.record_dir_edit.setPlaceholderText("不录制")
+        form.addRow("浏览器交互录制目录:", self.record_dir_edit)
+
+        self.streaming_extraction_check = QCheckBox("只取结果列表HTML并流式解析（超大结果页）")
+        self.streaming_extraction_check.setChecked(bool(self.strategy.get("streaming_extraction")))
+        form.addRow("流式提取:", self.streaming_extraction_check)
+
+        self.incremental_export_check = QCheckBox("合并到站点主数据集，只输出本次变化的记录")
+        self.incremental_export_check.setChecked(bool(self.strategy.get("incremental_export")))
+        form.addRow("增量导出:", self.incremental_export_check)
+
+        self.compression_combo = QComboBox()
+        for compression, label in COMPRESSIONS.items():
+            self.compression_combo.addItem(label, compression)
+        self.compression_combo.setCurrentIndex(
+            max(self.compression_combo.findData(self.strategy.get("export_compression")), 0)
+        )
+        form.addRow("导出压缩:", self.compression_combo)
+
+        self.store_results_check = QCheckBox("记录抓取任务，逐页保存结果到数据库")
+        self.store_results_check.setChecked(bool(self.strategy.get("store_results")))
+        form.addRow("保存结果:", self.store_results_check)
+
+        main_layout.addLayout(form)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Save | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        main_layout.addWidget(buttons)
+
+    def options(self) -> Dict:
+        """对话框中编辑后的策略选项"""
+        return {
+            "memory_budget_mb": self.memory_budget_spin.value() or None,
+            "spill_dir": self.spill_dir_edit.text().strip() or None,
+            "stream_formats": [fmt for fmt, check in self.stream_format_checks.items() if check.isChecked()],
+            "archive_dir": self.archive_dir_edit.text().strip() or None,
+            "streaming_extraction": self.streaming_extraction_check.isChecked(),
+            "incremental_export": self.incremental_export_check.isChecked(),
+            "export_compression": self.compression_combo.currentData(),
+            "store_results": self.store_results_check.isChecked(),
+            "record_dir": self.record_dir_edit.text().strip() or None,
+        }
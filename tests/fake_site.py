@@ -0,0 +1,87 @@
+"""
+测试用的内存浏览器后端
+"""
+
+import re
+
+from benchmarks.cpquery_emulator import generate_records, render_table_info
+
+
+class FakeSite:
+    """按脚本内容模拟结果页的内存浏览器后端"""
+
+    def __init__(self, total_results=25, page_size=10, overlap=0, short_pages=None):
+        """
+        Args:
+            overlap: 每页开头重复上一页末尾的记录数（模拟翻页期间结果偏移）
+            short_pages: 页码 -> 第一次获取该页时返回的记录数（模拟加载不完整）
+        """
+        self.records = generate_records(total_results)
+        self.page_size = page_size
+        self.overlap = overlap
+        self.short_pages = dict(short_pages or {})
+        self.page_fetches = {}
+        self.total_pages = (total_results + page_size - 1) // page_size
+        self.page = 1
+        self.loading_polls = 0
+        self.streamed_fetches = 0
+
+    def goto_sync(self, url):
+        return True
+
+    def get_content_sync(self):
+        return "<html></html>"
+
+    def get_current_url_sync(self):
+        return "http://fake/index"
+
+    def click_sync(self, selector):
+        return False
+
+    def wait_for_navigation_sync(self, timeout=30000):
+        return True
+
+    def wait_sync(self, ms):
+        pass
+
+    def close(self):
+        return True
+
+    def evaluate_sync(self, script, mutates=False):
+        if "loadingElements" in script:
+            # 每页第一次检查时仍在加载
+            self.loading_polls += 1
+            return self.loading_polls % 2 == 0
+        if "tableInfoElements" in script:
+            start = max((self.page - 1) * self.page_size - self.overlap, 0)
+            size = self.page_size
+            self.page_fetches[self.page] = self.page_fetches.get(self.page, 0) + 1
+            if self.page_fetches[self.page] == 1 and self.page in self.short_pages:
+                size = self.short_pages[self.page]
+            blocks = [render_table_info(r) for r in self.records[start:start + size]]
+            # 流式提取时页面脚本只返回结果列表HTML，不逐元素序列化
+            streaming = "const streaming = true" in script
+            self.streamed_fetches += streaming
+            return {
+                "resultInfo": {"totalResults": str(len(self.records)), "tableContent": "".join(blocks)},
+                "tableInfoData": [] if streaming else [{"html": b, "text": ""} for b in blocks],
+                "url": "http://fake/index",
+                "pageTitle": "fake",
+            }
+        if "nextPageButton" in script:
+            return {
+                "totalResults": str(len(self.records)),
+                "currentPage": self.page,
+                "totalPages": self.total_pages,
+                "hasNextPage": self.page < self.total_pages,
+            }
+        if "targetPage" in script:
+            target = int(re.search(r"\}\)\((\d+)\)\s*$", script).group(1))
+            if target == self.page:
+                return {"success": True, "clicked": None, "reached": True}
+            self.page = target
+            return {"success": True, "clicked": target, "reached": True}
+        if "nextButton.click()" in script:
+            self.page += 1
+            return {"success": True, "message": "下一页按钮已点击"}
+        return None
@@ -0,0 +1,50 @@
+"""
+清洗规则测试
+"""
+
+import pytest
+
+from src.crawler.cleaning_rules import (
+    CLEANING_RULES,
+    BatchCleaner,
+    get_cleaner,
+    register_cleaning_rule,
+)
+
+SAMPLES = [
+    "  价格 12.50 元 ", "无数字", "", "　ＡＢＣ１２３　", "－1,234.5万", "+7", "1,2,3",
+    "2023-01-05", "2023/1/5", " 2023.1.15 ", "2023年1月5日", "申请日：20230105", "2023年13",
+    "Mixed Case  Text\t\n", "ｃｎ２０２３１０１２３４５６．７", "　全角空格　",
+]
+
+
+@pytest.mark.parametrize("rule", sorted(CLEANING_RULES) + ["unknown_rule"])
+def test_batch_matches_per_cell(rule):
+    records = [{"v": value} for value in SAMPLES * 20] + [{"other": "x"}, {"v": None}]
+    expected = [get_cleaner(rule)(value) for value in SAMPLES * 20]
+
+    BatchCleaner({"v": rule}).clean(records)
+
+    assert [record["v"] for record in records[:-2]] == expected
+    assert records[-2] == {"other": "x"} and records[-1] == {"v": None}
+
+
+def test_new_rules():
+    assert get_cleaner("trim_fullwidth")("　ＡＢＣ１２３　") == "ABC123"
+    assert get_cleaner("parse_number")("－1,234.5万") == "-1234.5"
+    assert get_cleaner("parse_number")("无数字") == ""
+    assert get_cleaner("parse_date")("2023年1月5日") == "2023-01-05"
+    assert get_cleaner("parse_date")("申请日：20230105") == "2023-01-05"
+    assert get_cleaner("parse_date")("2023年13") == "2023年13"
+
+
+def test_custom_rule_is_applied_once_per_distinct_value():
+    calls = []
+    register_cleaning_rule("reverse", lambda text: calls.append(text) or text[::-1])
+    try:
+        records = [{"v": " abc "} for _ in range(300)]
+        BatchCleaner({"v": "reverse"}).clean(records)
+        assert {record["v"] for record in records} == {"cba"}
+        assert calls == ["abc"]
+    finally:
+        CLEANING_RULES.pop("reverse")
@@ -0,0 +1,43 @@
+"""
+完整性校验测试
+"""
+
+from src.crawler.completeness import parse_total_results, verify_completeness
+from tests.fake_site import FakeSite
+
+
+def test_verify_completeness_finds_short_and_missing_pages():
+    report = verify_completeness(45, {1: 10, 2: 6, 3: 10, 5: 5}, 31)
+    assert report["page_size"] == 10
+    assert report["expected_pages"] == 5
+    assert report["short_pages"] == [2]
+    assert report["missing_pages"] == [4]
+    assert report["missing_records"] == 14
+    assert not report["complete"]
+
+    assert verify_completeness(45, {1: 10, 2: 10, 3: 10, 4: 10, 5: 5}, 45)["complete"]
+    # 受抓取页数上限限制的页不计为缺失
+    assert verify_completeness(45, {1: 10, 2: 10}, 20, max_pages=2)["complete"]
+    assert verify_completeness(0, {}, 0)["complete"]
+
+
+def test_parse_total_results():
+    assert parse_total_results("1,234") == 1234
+    assert parse_total_results("共 56 条") == 56
+    assert parse_total_results(None) == 0
+
+
+def test_engine_refetches_only_short_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    site = FakeSite(total_results=45, page_size=10, short_pages={2: 4, 4: 0})
+    engine = CrawlerEngine(browser=site)
+    data = engine.start_crawl(
+        "http://fake/index", page_config={}, strategy={"max_pages": 10},
+        form_data={"loading_selector": ".q-loading"},
+    )
+
+    assert len(data) == 45
+    assert engine.completeness["complete"]
+    assert site.page_fetches == {1: 1, 2: 2, 3: 1, 4: 2, 5: 1}
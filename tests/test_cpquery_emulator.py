@@ -0,0 +1,52 @@
+"""
+cpquery 模拟服务器测试
+"""
+
+import json
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+
+import pytest
+
+from benchmarks.cpquery_emulator import CpqueryEmulator, EmulatorConfig, LatencyModel
+
+
+def _opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+
+def test_login_and_paginated_results():
+    config = EmulatorConfig(total_results=25, page_size=10)
+    with CpqueryEmulator(config) as emulator:
+        opener = _opener()
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            opener.open(emulator.base_url + "/api/results?page=1")
+        assert excinfo.value.code == 401
+
+        index = opener.open(emulator.login_url).read().decode("utf-8")
+        assert "q-pagination" in index and "keyboard_arrow_right" in index
+
+        last_page = json.loads(opener.open(emulator.base_url + "/api/results?page=3").read())
+        assert last_page["pages"] == 3
+        assert last_page["total"] == 25
+        assert len(last_page["records"]) == 5
+        assert all('class="table_info"' in record for record in last_page["records"])
+
+
+def test_failure_injection():
+    config = EmulatorConfig(total_results=10, failure_rate=1.0, require_login=False)
+    with CpqueryEmulator(config) as emulator:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(emulator.base_url + "/api/results?page=1")
+        assert excinfo.value.code == 500
+        assert emulator.stats["failures_injected"] == 1
+
+
+def test_latency_model_specs():
+    assert LatencyModel("fixed:120").sample_ms() == 120
+    assert 100 <= LatencyModel("uniform:100,200").sample_ms() <= 200
+    assert LatencyModel("lognormal:300,0.5").sample_ms() > 0
+    with pytest.raises(ValueError):
+        LatencyModel("poisson:3")
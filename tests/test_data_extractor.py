@@ -0,0 +1,150 @@
+"""
+数据提取器测试
+"""
+
+import json
+
+from src.crawler.data_extractor import DataExtractor
+
+PAGE = """
+<html><body>
+<div class="total">共 <strong>2</strong> 条</div>
+<table class="result">
+  <tr><th>专利号</th><th>名称</th></tr>
+  <tr><td><a href="/d/1">CN001</a></td><td> 一种装置 </td></tr>
+  <tr><td><a href="/d/2">CN002</a></td><td>一种方法</td></tr>
+</table>
+<a class="next" href="?page=2">下一页</a>
+</body></html>
+"""
+
+
+def test_extract_table_data():
+    rows = DataExtractor().extract_table_data(PAGE, "table.result", {"0": "专利号", "1": "名称"})
+    assert rows[1] == {"专利号_url": "/d/1", "专利号": "CN001", "名称": "一种装置"}
+    assert len(rows) == 3
+
+
+def test_page_is_parsed_once_for_all_queries():
+    extractor = DataExtractor(use_lxml=False)
+    assert extractor.check_element_exists(PAGE, "a.next")
+    assert extractor.get_table_total_count(PAGE, ".total strong") == 2
+    assert extractor.extract_links(PAGE, "a.next") == ["?page=2"]
+    extractor.extract_table_data(PAGE, "table.result", {0: "专利号"})
+    assert extractor.cache_stats == {"hits": 3, "misses": 1, "evictions": 0}
+
+
+def test_cache_lru_eviction_and_memory_cap():
+    extractor = DataExtractor(cache_max_entries=2, use_lxml=False)
+    pages = [PAGE.replace("CN001", f"CN{i:03d}") for i in range(3)]
+    for page in pages:
+        extractor.check_element_exists(page, "a.next")
+    assert extractor.cache_stats["evictions"] == 1
+    extractor.check_element_exists(pages[0], "a.next")
+    assert extractor.cache_stats["misses"] == 4
+
+    capped = DataExtractor(cache_max_bytes=len(PAGE))
+    capped.check_element_exists(PAGE, "a.next")
+    capped.check_element_exists(PAGE, "a.next")
+    assert capped.cache_stats["hits"] == 0
+
+
+MESSY = """
+<table id="t"><tr><th>号</th><th>说明</th><th>链接</th></tr>
+<tr><td> A&amp;1 <!-- 注释 --><b>x</b></td><td>文本<script>var a=1;</script>尾 <style>.c{}</style>
+<span> 多 </span>  行 </td><td><a>无链接</a><a href="/x">第二个</a></td></tr>
+<tr><td><table><tr><td>嵌套</td></tr></table></td><td>&nbsp;</td>
+<tr><td>未闭合<p>段落<td>第二格
+</table>
+<a class="l" href="/1">1</a><a class="l">无</a><a class="l" href="/2">2</a>
+"""
+
+
+def test_lxml_path_matches_beautifulsoup():
+    fast, slow = DataExtractor(), DataExtractor(use_lxml=False)
+    mappings = {0: "号", 1: "说明", 2: "链接"}
+    rules = {"说明": "remove_spaces"}
+    for args in [(MESSY, "#t", mappings, None), (MESSY, "#t", mappings, rules), (PAGE, "table.result", mappings, None)]:
+        assert fast.extract_table_data(*args) == slow.extract_table_data(*args)
+    assert fast.extract_links(MESSY, "a.l") == slow.extract_links(MESSY, "a.l") == ["/1", "/2"]
+    assert fast.engine_stats == {"lxml": 4, "fallback": 0}
+
+
+def test_lxml_path_falls_back_for_unsupported_input():
+    extractor = DataExtractor()
+    assert extractor.extract_table_data("", "table", {0: "a"}) == []
+    assert extractor.extract_links(PAGE, "a:-soup-contains('下一页')") == ["?page=2"]
+    assert extractor.engine_stats["fallback"] == 2
+
+
+def test_extraction_plan_is_compiled_once(capsys):
+    extractor = DataExtractor()
+    mappings = {"0": "专利号", "x": "坏列", 1: "名称"}
+    first = extractor.extract_table_data(PAGE, "table.result", mappings, {"名称": "uppercase"})
+    second = extractor.extract_table_data(PAGE, "table.result", mappings, {"名称": "uppercase"})
+    assert first == second
+    assert first[2] == {"专利号_url": "/d/2", "专利号": "CN002", "名称": "一种方法"}
+    # 无效列索引只在编译时警告一次
+    assert capsys.readouterr().out.count("不是有效的整数") == 1
+    assert len(extractor._plans) == 1
+
+
+def test_page_config_decode_tracks_edits(tmp_path, monkeypatch):
+    from src.database import models
+    from src.database.models import Database, PageConfig
+
+    pages = PageConfig(Database(str(tmp_path / "sites.db")))
+    pages.create("p1", "s1", "结果页", "table", {"0": "号"}, data_cleaning_rules={"号": "lowercase"})
+    first = pages.get("p1")
+    assert first["field_mappings"] == {"0": "号"}
+    first["field_mappings"]["9"] = "改"
+
+    # 配置未修改时不再解析JSON，且调用方的修改不影响缓存
+    loads = []
+    original = json.loads
+    monkeypatch.setattr(models.json, "loads", lambda text: loads.append(text) or original(text))
+    assert pages.get("p1")["field_mappings"] == {"0": "号"}
+    assert pages.get_by_site("s1")[0]["data_cleaning_rules"] == {"号": "lowercase"}
+    assert loads == []
+
+    pages.db.execute("UPDATE page_configs SET field_mappings = ? WHERE id = ?", ('{"2": "号"}', "p1"))
+    assert pages.get("p1")["field_mappings"] == {"2": "号"}
+    assert pages.get("missing") is None
+
+
+def test_engine_compiles_plan_once_per_crawl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler import crawler_engine
+    from src.crawler.crawler_engine import CrawlerEngine
+    from tests.fake_site import FakeSite
+
+    compiled = []
+    original = crawler_engine.ExtractionPlan.from_page_config
+    monkeypatch.setattr(
+        crawler_engine.ExtractionPlan, "from_page_config",
+        lambda page_config: compiled.append(page_config) or original(page_config),
+    )
+    page_config = {"field_mappings": "{}", "data_cleaning_rules": '{"公布号": "lowercase"}'}
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    data = engine.start_crawl("http://fake/index", page_config, {}, {})
+
+    assert compiled == [page_config]
+    assert len(data) == 25
+    # 页面配置的清洗规则作用于每页提取的记录
+    assert all(record["公布号"].startswith("cn") for record in data)
+
+
+def test_streaming_matches_full_parse():
+    extractor = DataExtractor()
+    mappings = {0: "号", 1: "说明", 2: "链接"}
+    rules = {"说明": "remove_spaces"}
+    for page, selector in [(MESSY, "#t"), (PAGE, "table.result"), (PAGE, "table"), (MESSY, "table#t")]:
+        expected = extractor.extract_table_data(page, selector, mappings, rules)
+        assert list(extractor.iter_table_data(page, selector, mappings, rules, chunk_size=7)) == expected
+
+    # 按字节分块（会切开多字节字符），以及不支持流式的选择器
+    for selector in ["table.result", "body > table"]:
+        chunks = (PAGE.encode("utf-8")[i:i + 5] for i in range(0, len(PAGE.encode("utf-8")), 5))
+        streamed = list(extractor.iter_table_data(chunks, selector, {0: "专利号", 1: "名称"}))
+        assert streamed == extractor.extract_table_data(PAGE, "table.result", {0: "专利号", 1: "名称"})
+    assert list(extractor.iter_table_data("", "table", {0: "a"})) == []
@@ -0,0 +1,49 @@
+"""
+去重引擎测试
+"""
+
+import pytest
+
+from src.crawler.dedup import DedupEngine, normalize_key
+from tests.fake_site import FakeSite
+
+
+def test_key_strategy_resolves_alias_and_normalizes():
+    dedup = DedupEngine("key", "申请号")
+    assert dedup.key_field == "专利号"
+    page1 = [{"专利号": "CN202010001234.5"}, {"专利号": "2020100012346"}]
+    page2 = [{"专利号": " 2020100012345 "}, {"专利号": "ZL2020100012347"}]
+    assert dedup.filter_page(page1, 1) == page1
+    assert dedup.filter_page(page2, 2) == [{"专利号": "ZL2020100012347"}]
+    assert dedup.page_stats == {1: {"records": 2, "duplicates": 0}, 2: {"records": 2, "duplicates": 1}}
+    assert normalize_key("cn 2020.1") == "20201"
+
+
+def test_missing_key_falls_back_to_content_hash():
+    dedup = DedupEngine("key")
+    records = [{"名称": "甲", "_page_number": 1}, {"名称": "甲", "_page_number": 2}, {"名称": "乙"}]
+    assert dedup.filter_page(records) == [records[0], records[2]]
+    assert dedup.stats == {"records": 3, "unique": 2, "duplicates": 1, "missing_key": 3}
+
+
+def test_content_and_none_strategies():
+    same = [{"专利号": "1", "名称": "甲"}, {"名称": "甲", "专利号": "1"}, {"专利号": "1", "名称": "乙"}]
+    assert len(DedupEngine("content").filter_page(same)) == 2
+    assert len(DedupEngine("none").filter_page(same)) == 3
+    with pytest.raises(ValueError):
+        DedupEngine("fuzzy")
+
+
+def test_engine_drops_overlapping_page_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10, overlap=3))
+    data = engine.start_crawl(
+        "http://fake/index", page_config={}, strategy={"max_pages": 10, "dedup_strategy": None},
+        form_data={"loading_selector": ".q-loading", "result_id_field": "申请号"},
+    )
+    # 第2页开头重复第1页末尾3条，第3页补齐剩余记录
+    assert len(data) == 25
+    assert len({r["专利号"] for r in data}) == 25
+    assert engine.dedup.page_stats[2]["duplicates"] == 3
@@ -0,0 +1,280 @@
+"""
+流式导出测试
+"""
+
+import csv
+import os
+
+import openpyxl
+import pytest
+
+from src.crawler.export_sinks import CsvSink, ExcelSink
+from src.crawler.normalizer import EXPORT_COLUMNS
+from tests.fake_site import FakeSite
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_sink_writes_part_file_and_finalizes(tmp_path, monkeypatch):
+    from src.crawler import export_sinks
+
+    synced = []
+    fsync = export_sinks.os.fsync
+    monkeypatch.setattr(export_sinks.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    sink = CsvSink(str(tmp_path / "out.csv"), flush_rows=1).open()
+    sink.write_records([{"专利号": "CN1", "申请人": "甲"}])
+    # 未定稿前 .part 文件已包含表头和已写入的行
+    rows = read_csv(sink.part_path)
+    assert rows[0]["专利权人"] == "甲" and rows[0]["序号"] == "1"
+    sink.write_records([{"申请号": "CN2"}])
+    # 按行数刷新只写入文件，不 fsync
+    assert synced == []
+
+    path = sink.close()
+    assert len(synced) == 1
+    assert not sink.part_path.exists()
+    rows = read_csv(path)
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert [(row["序号"], row["专利号"]) for row in rows] == [("1", "CN1"), ("2", "CN2")]
+
+
+def test_csv_sink_keeps_part_file_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with CsvSink(str(tmp_path / "out.csv")) as sink:
+            sink.write_records([{"专利号": "CN1"}])
+            raise RuntimeError("crash")
+    assert not (tmp_path / "out.csv").exists()
+    assert read_csv(sink.part_path)[0]["专利号"] == "CN1"
+
+
+def test_engine_streams_csv_during_crawl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10, overlap=3))
+    data = engine.start_crawl(
+        "http://fake/index", page_config={},
+        strategy={"max_pages": 10, "stream_csv": True, "stream_formats": ["xlsx"], "stream_name": "crawl"},
+        form_data={"loading_selector": ".q-loading"},
+    )
+    assert set(engine.stream_paths) == {"csv", "excel"}
+    rows = read_csv(engine.stream_paths["csv"])
+    assert len(rows) == len(data) == 25
+    assert sorted(row["专利号"] for row in rows) == sorted(r["专利号"] for r in data)
+    sheet = openpyxl.load_workbook(engine.stream_paths["excel"], read_only=True)["Sheet1"]
+    assert [row[4] for row in sheet.iter_rows(min_row=2, values_only=True)] == [row["专利号"] for row in rows]
+
+
+def test_engine_streams_through_injected_exporter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from src.crawler.data_exporter import DataExporter
+
+    exporter = DataExporter(str(tmp_path / "exports"))
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10), exporter=exporter)
+    name = exporter.generate_filename("站点")
+    engine.start_crawl("http://fake/index", page_config={}, strategy={"stream_csv": True, "stream_name": name})
+    assert engine.exporter is exporter
+    assert engine.stream_paths["csv"] == str(tmp_path / "exports" / f"{name}.csv")
+
+
+def test_engine_cleans_up_when_outputs_fail_to_open(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from src.crawler.page_archive import PageArchive
+    from src.database.models import CrawlTask, Database
+
+    closed = []
+    monkeypatch.setattr(PageArchive, "close", lambda archive: closed.append(archive))
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    tasks.create("task", "任务", "p1", ["csv"], "exports")
+    site = FakeSite(total_results=25, page_size=10)
+    engine = CrawlerEngine(browser=site)
+    engine.task_model = tasks
+    with pytest.raises(Exception, match="不支持流式导出的格式"):
+        engine.start_crawl(
+            "http://fake/index", page_config={},
+            strategy={
+                "stream_formats": ["csv", "txt"], "stream_name": "crawl",
+                "archive_dir": str(tmp_path / "archive"),
+            },
+            task_id="task",
+        )
+    # 已打开的CSV写入器已删除，归档已关闭，任务标记为失败
+    assert not list((tmp_path / "data" / "exports").glob("crawl*"))
+    assert closed == [engine.archive]
+    assert not engine.is_running
+    assert tasks.get("task")["status"] == "failed"
+
+
+def test_engine_streams_csv_when_excel_dependency_missing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler import export_sinks
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    def missing(*args, **kwargs):
+        raise ImportError("xlsxwriter")
+
+    monkeypatch.setattr(export_sinks.ExcelSink, "open", missing)
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.start_crawl(
+        "http://fake/index", page_config={}, strategy={"stream_formats": ["xlsx"], "stream_name": "crawl"}
+    )
+    assert engine.stream_paths["excel"] == engine.stream_paths["csv"]
+    assert len(read_csv(engine.stream_paths["csv"])) == 25
+
+
+def test_excel_sink_rolls_over_to_new_sheet(tmp_path):
+    with ExcelSink(str(tmp_path / "out.xlsx"), max_rows=3) as sink:
+        sink.write_records([{"专利号": f"CN{i}"} for i in range(5)])
+        # 未定稿的文件保留 .xlsx 后缀
+        assert sink.part_path.name == "out.part.xlsx"
+    assert not sink.part_path.exists()
+
+    workbook = openpyxl.load_workbook(sink.filepath, read_only=True)
+    assert workbook.sheetnames == ["Sheet1", "Sheet2", "Sheet3"]
+    sheets = [list(workbook[name].iter_rows(values_only=True)) for name in workbook.sheetnames]
+    assert all(list(rows[0]) == EXPORT_COLUMNS for rows in sheets)
+    assert [row[4] for rows in sheets for row in rows[1:]] == [f"CN{i}" for i in range(5)]
+    assert [row[0] for rows in sheets for row in rows[1:]] == [1, 2, 3, 4, 5]
+
+
+def test_export_to_excel_normalizes_in_chunks(tmp_path, monkeypatch):
+    from src.crawler import data_exporter
+
+    monkeypatch.setattr(data_exporter, "EXPORT_CHUNK_ROWS", 4)
+    exporter = data_exporter.DataExporter(str(tmp_path))
+    sizes = []
+    normalize = exporter.normalizer.normalize
+    monkeypatch.setattr(
+        exporter.normalizer, "normalize", lambda data, start=1: sizes.append(len(data)) or normalize(data, start)
+    )
+
+    path = exporter.export_to_excel([{"专利号": f"CN{i}"} for i in range(10)], "out")
+    # 不预先规范化全部记录，每块最多 EXPORT_CHUNK_ROWS 行
+    assert sizes == [4, 4, 2]
+    sheet = openpyxl.load_workbook(path, read_only=True)["Sheet1"]
+    assert [row[:1] + row[4:5] for row in sheet.iter_rows(min_row=2, values_only=True)] == [
+        (i + 1, f"CN{i}") for i in range(10)
+    ]
+
+
+def test_parquet_sink_writes_typed_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.crawler.export_sinks import ParquetSink
+
+    records = [
+        {"专利号": f"CN{i}", "申请日": f"2020.01.0{i + 1}", "专利类型": "发明专利" if i % 2 else "实用新型"}
+        for i in range(5)
+    ]
+    records.append({"专利号": "CN5", "申请日": "未知"})
+    with ParquetSink(str(tmp_path / "out.parquet"), row_group_size=2) as sink:
+        sink.write_records(records[:3])
+        sink.write_records(records[3:])
+
+    parquet = pq.ParquetFile(sink.filepath)
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == EXPORT_COLUMNS
+    assert str(table.schema.field("申请日").type) == "date32[day]"
+    assert str(table.schema.field("专利类型").type) == "dictionary<values=string, indices=int32, ordered=0>"
+    df = table.to_pandas()
+    assert df["序号"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert str(df["申请日"][0]) == "2020-01-01" and df["申请日"][5] is None
+    assert df["专利类型"].tolist()[:2] == ["实用新型", "发明专利"]
+
+
+def test_export_to_parquet_normalizes_in_chunks(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.crawler import data_exporter
+
+    monkeypatch.setattr(data_exporter, "EXPORT_CHUNK_ROWS", 4)
+    exporter = data_exporter.DataExporter(str(tmp_path))
+    sizes = []
+    normalize = exporter.normalizer.normalize
+    monkeypatch.setattr(
+        exporter.normalizer, "normalize", lambda data, start=1: sizes.append(len(data)) or normalize(data, start)
+    )
+
+    path = exporter.export_to_parquet([{"专利号": f"CN{i}", "专利类型": "发明专利"} for i in range(10)], "out")
+    assert sizes == [4, 4, 2]
+    df = pq.read_table(path).to_pandas()
+    assert df["序号"].tolist() == list(range(1, 11))
+    assert df["专利号"].tolist() == [f"CN{i}" for i in range(10)]
+
+
+def test_jsonl_sink_appends_raw_records_per_page(tmp_path, monkeypatch):
+    import json
+
+    from src.crawler import export_sinks
+
+    records = [{"专利号": "CN1", "_page_number": 1, "备注": None}, {"申请号": "CN2", "_page_number": 2}]
+    for orjson in (export_sinks.orjson, None):
+        monkeypatch.setattr(export_sinks, "orjson", orjson)
+        with export_sinks.JsonlSink(str(tmp_path / "out.jsonl")) as sink:
+            sink.write_records(records[:1])
+            # 每页写入后即可逐行读取
+            with open(sink.part_path, encoding="utf-8") as f:
+                assert [json.loads(line) for line in f] == records[:1]
+            sink.write_records(records[1:])
+        with open(sink.filepath, encoding="utf-8") as f:
+            text = f.read()
+        assert "CN1" in text and "\\u" not in text and ": " not in text
+        assert [json.loads(line) for line in text.splitlines()] == records
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_exports_round_trip(tmp_path, compression):
+    import io
+    import json
+    import zlib
+
+    from src.crawler.data_exporter import DataExporter
+
+    def read_text(path, encoding="utf-8"):
+        with open(path, "rb") as f:
+            data = f.read()
+        if compression == "gzip":
+            # 未定稿的文件没有gzip尾部，按流解压
+            data = zlib.decompressobj(wbits=31).decompress(data)
+        else:
+            zstandard = pytest.importorskip("zstandard")
+            data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+        return data.decode(encoding)
+
+    records = [{"专利号": f"CN{i}", "申请人": "甲"} for i in range(3)]
+    exporter = DataExporter(str(tmp_path), compression=compression)
+    suffix = ".gz" if compression == "gzip" else ".zst"
+    results = exporter.export_multi_format(records, "out", ["csv", "json", "jsonl", "excel"])
+    assert results["csv"].endswith(".csv" + suffix) and results["excel"].endswith(".xlsx")
+
+    rows = list(csv.DictReader(io.StringIO(read_text(results["csv"], "utf-8-sig"))))
+    assert [row["专利号"] for row in rows] == ["CN0", "CN1", "CN2"]
+    assert json.loads(read_text(results["json"])) == records
+    assert [json.loads(line) for line in read_text(results["jsonl"]).splitlines()] == records
+
+    # 流式写入器刷新后，已写入的行即可解压读取
+    sink = exporter.open_sink("csv", "stream", compression=compression)
+    sink.write_records(records[:1])
+    sink.flush()
+    assert "CN0" in read_text(sink.part_path, "utf-8-sig")
+    assert sink.close().endswith(".csv" + suffix)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_csv_sink_syncs_after_closing_compressor(tmp_path, monkeypatch, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    from src.crawler import export_sinks
+
+    sizes = []
+    fsync = export_sinks.os.fsync
+    monkeypatch.setattr(export_sinks.os, "fsync", lambda fd: sizes.append(os.fstat(fd).st_size) or fsync(fd))
+    sink = CsvSink(str(tmp_path / "out.csv"), compression=compression).open()
+    sink.write_records([{"专利号": f"CN{i}"} for i in range(100)])
+    path = sink.close()
+    # fsync 时压缩尾部已写出，落盘的是完整文件
+    assert sizes == [os.path.getsize(path)]
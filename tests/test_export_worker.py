@@ -0,0 +1,107 @@
+"""
+后台导出测试
+"""
+
+from pathlib import Path
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+# 没有安装 PyQt6 时跳过整个模块，之后才能导入依赖 Qt 的模块
+from src.crawler.data_exporter import DataExporter  # noqa: E402
+from src.ui.export_worker import ExportWorker  # noqa: E402
+
+RECORDS = [{"专利号": f"CN{i}", "专利名称": f"装置{i}"} for i in range(20)]
+
+
+def _run(worker):
+    # 测试中在当前线程直接调用 run，没有事件循环，信号直接连接
+    direct = QtCore.Qt.ConnectionType.DirectConnection
+    events = {"progress": [], "finished": [], "error": []}
+    worker.progress.connect(events["progress"].append, direct)
+    worker.finished.connect(events["finished"].append, direct)
+    worker.error.connect(events["error"].append, direct)
+    worker.run()
+    return events
+
+
+def test_worker_exports_and_reports_progress(tmp_path):
+    exporter = DataExporter(str(tmp_path))
+    events = _run(ExportWorker(exporter, RECORDS, "run", ["csv", "jsonl"], "站点", incremental=True))
+
+    assert not events["error"]
+    (result,) = events["finished"]
+    assert set(result["results"]) == {"csv", "jsonl"}
+    assert all(Path(path).exists() for path in result["results"].values())
+    assert result["incremental"]["stats"]["inserted"] == 20
+    assert not result["cancelled"]
+    assert {event["fmt"] for event in events["progress"]} == {"csv", "jsonl"}
+    assert events["progress"][-1]["written"] == events["progress"][-1]["total"] == 20
+
+
+def test_cancelled_worker_skips_incremental(tmp_path):
+    exporter = DataExporter(str(tmp_path))
+    worker = ExportWorker(exporter, RECORDS, "run", ["csv"], "站点", incremental=True)
+    worker.cancel()
+    (result,) = _run(worker)["finished"]
+
+    assert result == {"results": {}, "incremental": None, "cancelled": True}
+    assert not list(tmp_path.glob("*.csv*"))
+
+
+def test_worker_applies_strategy_compression(tmp_path):
+    exporter = DataExporter(str(tmp_path))
+    worker = ExportWorker(exporter, RECORDS, "run", ["csv", "json"], "站点", incremental=True, compression="gzip")
+    (result,) = _run(worker)["finished"]
+
+    assert all(path.endswith(".gz") for path in result["results"].values())
+    assert result["incremental"]["delta"].endswith(".jsonl.gz")
+    # 导出器本身的设置不变
+    assert exporter.compression is None
+
+
+def test_worker_reports_errors(tmp_path):
+    worker = ExportWorker(DataExporter(str(tmp_path)), ["不是记录"], "run", ["csv"], "站点")
+    events = _run(worker)
+
+    assert events["error"] and not events["finished"]
+    assert worker.data is None
+
+
+def test_jobs_sharing_an_exporter_do_not_collide(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    from src.crawler import incremental
+
+    exporter = DataExporter(str(tmp_path))
+    names = {exporter.generate_filename("站点") for _ in range(3)}
+    assert len(names) == 3
+
+    # 同一站点的增量合并串行执行
+    active, overlaps = [], []
+    apply = incremental.MasterDataset.apply
+
+    def slow_apply(self, records, run_at=None):
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        try:
+            return apply(self, records, run_at)
+        finally:
+            active.pop()
+
+    monkeypatch.setattr(incremental.MasterDataset, "apply", slow_apply)
+    workers = [
+        ExportWorker(exporter, RECORDS[i::3], exporter.generate_filename("站点"), [], "站点", incremental=True)
+        for i in range(3)
+    ]
+    threads = [threading.Thread(target=_run, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1, 1, 1]
+    assert len({Path(p).name for p in tmp_path.glob("*_delta_*")}) == 3
@@ -0,0 +1,112 @@
+"""
+增量导出测试
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.crawler.data_exporter import DataExporter
+from src.crawler.incremental import MasterDataset
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_runs_append_upsert_and_emit_deltas(tmp_path):
+    master = MasterDataset(str(tmp_path), "专利 站点", key_field="申请号")
+    first = [
+        {"专利号": "CN 2020.1", "案件状态": "审查中", "_page_number": 1},
+        {"专利号": "CN2020.2", "案件状态": "授权", "_page_number": 1},
+    ]
+    stats = master.apply(first, run_at=datetime(2024, 1, 1))
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (2, 0, 0)
+    assert [r["_change"] for r in read_jsonl(stats["delta_path"])] == ["insert", "insert"]
+
+    second = [
+        # 只有元数据变化的记录不算更新；键按规范化后比较
+        {"专利号": "CN20201", "案件状态": "授权", "_page_number": 3},
+        {"专利号": "CN2020.2", "案件状态": "授权", "_page_number": 2},
+        {"专利号": "CN2020.3", "案件状态": "驳回"},
+    ]
+    stats = master.apply(second, run_at=datetime(2024, 1, 2))
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (1, 1, 1)
+    delta = read_jsonl(stats["delta_path"])
+    assert [(r["专利号"], r["_change"]) for r in delta] == [("CN20201", "update"), ("CN2020.3", "insert")]
+
+    assert len(master) == 3
+    assert {r["案件状态"] for r in master.iter_records()} == {"授权", "驳回"}
+    # 没有变化的运行不生成差异文件
+    assert master.apply(second[1:])["delta_path"] == ""
+    assert [run["inserted"] for run in master.runs()] == [2, 1, 0]
+    master.close()
+
+
+def test_runs_in_same_second_keep_separate_deltas(tmp_path):
+    master = MasterDataset(str(tmp_path), "site")
+    run_at = datetime(2024, 1, 1, 8, 0, 0)
+    first = master.apply([{"专利号": "CN1"}], run_at=run_at)
+    second = master.apply([{"专利号": "CN2"}], run_at=run_at)
+    master.close()
+
+    assert first["delta_path"] != second["delta_path"]
+    assert first["delta_path"].endswith(f"site_delta_20240101_080000_{first['run_id']}.jsonl")
+    assert [r["专利号"] for r in read_jsonl(first["delta_path"])] == ["CN1"]
+    assert [r["专利号"] for r in read_jsonl(second["delta_path"])] == ["CN2"]
+
+
+def test_exporter_incremental_uses_master_per_site(tmp_path):
+    exporter = DataExporter(str(tmp_path), compression="gzip")
+    result = exporter.export_incremental([{"专利号": "CN1"}], "site")
+    assert result["master"].endswith("site_master.db")
+    assert result["delta"].endswith(".jsonl.gz")
+    assert exporter.export_incremental([{"专利号": "CN1"}], "site")["stats"]["unchanged"] == 1
+
+
+def test_key_repeated_across_batches_counts_once(tmp_path, monkeypatch):
+    from src.crawler import incremental
+
+    monkeypatch.setattr(incremental, "BATCH_SIZE", 2)
+    master = MasterDataset(str(tmp_path), "site")
+    records = [
+        {"专利号": "CN1", "案件状态": "审查中"},
+        {"专利号": "CN2"},
+        {"专利号": "CN3"},
+        {"专利号": "CN1", "案件状态": "授权"},
+    ]
+    stats = master.apply(records)
+    # 重复的键以最后一条为准，保留第一次出现的位置
+    assert (stats["records"], stats["inserted"], stats["updated"]) == (4, 3, 0)
+    delta = read_jsonl(stats["delta_path"])
+    assert [(r["专利号"], r.get("案件状态")) for r in delta] == [("CN1", "授权"), ("CN2", None), ("CN3", None)]
+    assert len(master) == 3
+    master.close()
+
+
+def test_delta_promoted_only_after_commit(tmp_path):
+    master = MasterDataset(str(tmp_path), "site")
+
+    class FailingCommit:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def commit(self):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    conn = master.conn
+    master.conn = FailingCommit(conn)
+    with pytest.raises(sqlite3.OperationalError):
+        master.apply([{"专利号": "CN1"}])
+    # 提交失败：主数据集回滚，差异文件只保留为 .part
+    master.conn = conn
+    assert len(master) == 0
+    assert not list(tmp_path.glob("site_delta_*.jsonl"))
+    assert len(list(tmp_path.glob("site_delta_*.part*"))) == 1
+    master.close()
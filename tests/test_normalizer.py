@@ -0,0 +1,103 @@
+"""
+导出规范化测试
+"""
+
+import csv
+
+from src.crawler.data_exporter import DataExporter
+from src.crawler.normalizer import EXPORT_COLUMNS, RecordNormalizer
+from src.crawler.record_store import RecordStore
+
+RECORDS = [
+    {"专利号": "CN1", "申请人": "甲", "专利类型": "发明专利"},
+    {"申请号": "CN2", "专利权人": "乙", "申请人": "丙", "备注": None},
+    {"专利号": None, "名称": "装置"},
+]
+
+
+def test_normalize_resolves_synonyms_in_order():
+    rows = RecordNormalizer().normalize(RECORDS)
+    assert rows.columns == EXPORT_COLUMNS
+    first, second, third = rows.as_dicts()
+    assert (first["序号"], first["专利权人"], first["专利类型"], first["申请日"]) == (1, "甲", "发明专利", "")
+    assert (second["专利号"], second["专利权人"]) == ("CN2", "乙")
+    # 字段存在但值为None时保留None
+    assert third["专利号"] is None and third["专利名称"] == "装置"
+
+
+def test_store_and_dict_records_normalize_identically():
+    normalizer = RecordNormalizer()
+    assert normalizer.normalize(RecordStore(RECORDS), start=5).rows == normalizer.normalize(RECORDS, start=5).rows
+
+
+def test_multi_format_normalizes_once(tmp_path, monkeypatch):
+    exporter = DataExporter(str(tmp_path))
+    calls = []
+    normalize = exporter.normalizer.normalize
+    monkeypatch.setattr(exporter.normalizer, "normalize", lambda data, start=1: calls.append(1) or normalize(data, start))
+
+    results = exporter.export_multi_format(RECORDS, "out", ["csv", "excel", "json"])
+    assert len(calls) == 1
+    with open(results["csv"], encoding="utf-8-sig") as f:
+        assert [row["专利权人"] for row in csv.DictReader(f)] == ["甲", "乙", ""]
+
+    import pandas as pd
+
+    df = pd.read_excel(results["excel"])
+    assert list(df.columns) == EXPORT_COLUMNS and len(df) == 3
+
+
+def test_multi_format_reports_progress_per_format(tmp_path):
+    exporter = DataExporter(str(tmp_path))
+    events = []
+    results = exporter.export_multi_format(
+        RECORDS, "out", ["csv", "json", "jsonl", "text"], progress_callback=lambda **kw: events.append(kw)
+    )
+    assert list(results) == ["csv", "json", "jsonl", "text"]
+    assert {(e["fmt"], e["written"], e["total"]) for e in events} == {
+        (fmt, 3, 3) for fmt in results
+    }
+
+
+def test_multi_format_cancel_removes_partial_files(tmp_path):
+    import threading
+
+    exporter = DataExporter(str(tmp_path))
+    cancel = threading.Event()
+    cancel.set()
+    assert exporter.export_multi_format(RECORDS, "out", ["csv", "json", "excel"], cancel_event=cancel) == {}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_multi_format_writes_formats_in_parallel(tmp_path, monkeypatch):
+    import threading
+
+    from src.crawler import data_exporter
+
+    monkeypatch.setattr(data_exporter, "EXPORT_CHUNK_ROWS", 2)
+    records = [dict(RECORDS[i % 3], 专利号=f"CN{i}") for i in range(7)]
+    threads = set()
+    write_rows = data_exporter.CsvSink.write_rows
+    monkeypatch.setattr(
+        data_exporter.CsvSink, "write_rows",
+        lambda sink, rows: threads.add(threading.current_thread().name) or write_rows(sink, rows),
+    )
+    exporter = DataExporter(str(tmp_path))
+    events = []
+    results = exporter.export_multi_format(
+        records, "out", ["csv", "jsonl", "excel"], progress_callback=lambda **kw: events.append(kw), max_workers=3
+    )
+
+    # 写入器在导出线程池中写入，每块写完后按格式回调进度
+    assert threads and all(name.startswith("export") for name in threads)
+    assert [e["written"] for e in events if e["fmt"] == "csv"] == [2, 4, 6, 7]
+    with open(results["csv"], encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["序号"], row["专利号"]) for row in rows] == [(str(i + 1), f"CN{i}") for i in range(7)]
+    with open(results["jsonl"], encoding="utf-8") as f:
+        assert len(f.readlines()) == 7
+
+    cancel = threading.Event()
+    cancel.set()
+    assert exporter.export_multi_format(records, "out2", ["csv", "excel"], cancel_event=cancel, max_workers=2) == {}
+    assert not list(tmp_path.glob("out2*"))
@@ -0,0 +1,91 @@
+"""
+页面归档与重新提取测试
+"""
+
+from benchmarks.cpquery_emulator import generate_records, render_table_info
+from src.crawler.page_archive import PageArchive, reextract_archive
+from src.crawler.patent_parser import extract_table_info
+
+
+def _result_page(records, page):
+    return {
+        "url": f"http://example.com/index?page={page}",
+        "pageTitle": "结果",
+        "tableInfoData": [{"html": render_table_info(r), "text": r["专利号"]} for r in records],
+        "resultInfo": {"totalResults": "30", "tableContent": ""},
+        "fullPageHTML": "<html>" + "x" * 10000 + "</html>",
+    }
+
+
+def test_archive_dedups_and_survives_reopen(tmp_path):
+    records = generate_records(30)
+    pages = [_result_page(records[i:i + 10], i // 10 + 1) for i in range(0, 30, 10)]
+
+    archive = PageArchive(str(tmp_path))
+    for page in pages:
+        assert archive.add(page) is not None
+    assert archive.add(pages[0]) is None
+    assert archive.stats == {"added": 3, "duplicates": 1}
+
+    reopened = PageArchive(str(tmp_path))
+    assert len(reopened) == 3
+    assert "fullPageHTML" not in reopened.read(list(reopened)[0])
+    assert reopened.add(pages[1]) is None
+
+    reopened.close()
+
+    # 崩溃时写了一半的索引行会被忽略
+    with open(reopened.index_path, "a", encoding="utf-8") as f:
+        f.write('{"hash": "abc", "offset": 99999')
+    torn = PageArchive(str(tmp_path))
+    assert len(torn) == 3
+    # 之后追加的条目另起一行，重新打开后不会丢失
+    assert torn.add(_result_page(records[:5], 9)) is not None
+    torn.close()
+    assert len(PageArchive(str(tmp_path))) == 4
+
+
+def test_archive_syncs_periodically_and_on_close(tmp_path, monkeypatch):
+    from src.crawler import page_archive
+
+    synced = []
+    fsync = page_archive.os.fsync
+    monkeypatch.setattr(page_archive.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    records = generate_records(30)
+    archive = PageArchive(str(tmp_path), sync_every=2)
+    for page in range(3):
+        archive.add(_result_page(records[page * 10:page * 10 + 10], page + 1))
+    # 第2页时 fsync 包文件和索引各一次，其余页面只刷新
+    assert len(synced) == 2
+    archive.close()
+    assert len(synced) == 4
+    assert len(PageArchive(str(tmp_path))) == 3
+
+
+def test_parallel_reextract_matches_direct_extraction(tmp_path):
+    records = generate_records(40)
+    pages = [_result_page(records[i:i + 10], i // 10 + 1) for i in range(0, 40, 10)]
+    archive = PageArchive(str(tmp_path))
+    for page in pages:
+        archive.add(page)
+
+    expected = [record for page in pages for record in extract_table_info(page)]
+    assert reextract_archive(str(tmp_path), processes=2, batch_size=1) == expected
+    assert reextract_archive(str(tmp_path), processes=1) == expected
+
+
+def test_engine_archive_is_reset_per_crawl(tmp_path, monkeypatch):
+    from src.crawler.crawler_engine import CrawlerEngine
+    from tests.fake_site import FakeSite
+
+    monkeypatch.chdir(tmp_path)
+    archive_dir = tmp_path / "archive"
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.start_crawl("http://fake/index", {}, {"archive_dir": str(archive_dir)}, {})
+    assert len(PageArchive(str(archive_dir))) == 3
+
+    # 未配置归档目录的下一次抓取不写入上一次的归档
+    engine.browser = FakeSite(total_results=35, page_size=10)
+    engine.start_crawl("http://fake/index", {}, {}, {})
+    assert engine.archive is None
+    assert len(PageArchive(str(archive_dir))) == 3
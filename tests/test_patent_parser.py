@@ -0,0 +1,74 @@
+"""
+专利信息解析测试
+"""
+
+from benchmarks.cpquery_emulator import generate_records, render_table_info
+from src.crawler.patent_parser import extract_table_info, parse_patent_info, parse_patent_info_text
+
+
+def test_parse_patent_info_html_round_trip():
+    record = generate_records(1)[0]
+    assert parse_patent_info(render_table_info(record)) == record
+
+
+def test_parse_patent_info_text():
+    text = "申请号/专利号： 2020100012345 发明名称：一种数据处理方法 申请人：测试公司 专利类型：发明专利 申请日：2020-01-01"
+    assert parse_patent_info_text(text) == {
+        "专利号": "2020100012345",
+        "专利名称": "一种数据处理方法",
+        "申请人": "测试公司",
+        "专利类型": "发明专利",
+        "申请日期": "2020-01-01",
+    }
+
+
+def test_extract_table_info_from_table_content():
+    records = generate_records(3)
+    result_data = {
+        "resultInfo": {"tableContent": "".join(render_table_info(r) for r in records)},
+        "url": "http://example.com/index",
+        "pageTitle": "结果",
+    }
+    extracted = extract_table_info(result_data)
+    assert [r["专利号"] for r in extracted] == [r["专利号"] for r in records]
+    assert extracted[0]["_source_url"] == "http://example.com/index"
+    assert extracted[0]["raw_text"].startswith("申请号/专利号：")
+
+
+def test_iter_table_info_streams_same_records():
+    from lxml import html as lxml_html
+
+    from src.crawler.streaming_extractor import iter_table_info
+
+    records = generate_records(50)
+    page = "<html><body><div id='list'>" + "".join(render_table_info(r) for r in records) + "</div></body></html>"
+    # 浏览器侧获取的 tableInfoData（outerHTML + textContent）
+    infos = [
+        {"html": lxml_html.tostring(el, encoding="unicode", with_tail=False), "text": el.text_content().strip()}
+        for el in lxml_html.fromstring(page).find_class("table_info")
+    ]
+    expected = extract_table_info({"tableInfoData": infos, "url": "u", "pageTitle": "t"})
+
+    assert list(iter_table_info(page, page_url="u", page_title="t", chunk_size=100)) == expected
+    assert [r["专利号"] for r in expected] == [r["专利号"] for r in records]
+
+
+def test_start_crawl_streaming_extraction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from tests.fake_site import FakeSite
+
+    def crawl(strategy):
+        site = FakeSite(total_results=25, page_size=10)
+        data = CrawlerEngine(browser=site).start_crawl("http://fake/index", {}, strategy, {})
+        return site, [dict(record) for record in data]
+
+    full_site, full = crawl({})
+    site, streamed = crawl({"streaming_extraction": True})
+    # 每页都走流式提取，记录与逐元素提取一致（FakeSite 的 tableInfoData 不带 textContent）
+    assert site.streamed_fetches == site.total_pages and full_site.streamed_fetches == 0
+    assert [{k: v for k, v in r.items() if k != "raw_text"} for r in streamed] == [
+        {k: v for k, v in r.items() if k != "raw_text"} for r in full
+    ]
+    assert len(streamed) == 25
+    assert streamed[0]["raw_text"].startswith("申请号/专利号：")
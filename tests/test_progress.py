@@ -0,0 +1,55 @@
+"""
+进度通道测试
+"""
+
+from src.crawler.progress import CrawlMetrics, ProgressChannel
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_events_are_coalesced_to_refresh_rate():
+    clock = FakeClock()
+    emitted = []
+    metrics = CrawlMetrics()
+    channel = ProgressChannel(emitted.append, refresh_interval=1.0, metrics=metrics, clock=clock)
+
+    for page in range(1, 11):
+        clock.now += 0.1
+        channel.publish(current_page=page, total_pages=20, records_count=page * 10, message=f"第 {page} 页")
+
+    # 第一条事件立即发送，其余事件在刷新间隔内被合并
+    assert len(emitted) == 1
+    assert len(metrics) == 10
+
+    channel.flush_pending()
+    assert len(emitted) == 2
+    snapshot = emitted[-1]
+    assert snapshot["current_page"] == 10
+    assert snapshot["records_count"] == 100
+    assert snapshot["coalesced_events"] == 9
+    assert round(snapshot["records_per_sec"]) == 100
+    assert round(snapshot["eta_seconds"], 6) == 1.0
+
+    # 没有新事件时定时器不会重复发送
+    channel.flush_pending()
+    assert len(emitted) == 2
+
+
+def test_start_resets_counters():
+    clock = FakeClock()
+    emitted = []
+    channel = ProgressChannel(emitted.append, clock=clock)
+    clock.now = 5.0
+    channel.publish(current_page=3, total_pages=3, records_count=30, message="")
+
+    channel.start()
+    assert len(channel.metrics) == 0
+    assert channel.snapshot()["pages_done"] == 0
@@ -0,0 +1,235 @@
+"""
+列式记录存储测试
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.crawler.data_exporter import DataExporter
+from src.crawler.record_store import RecordStore
+
+RECORDS = [
+    {"专利号": "CN1", "申请人": "甲", "_source_url": "u1", "_page_title": "t"},
+    {"专利号": "CN2", "备注": None, "_source_url": "u1", "_page_title": "t"},
+    {"专利号": "CN3", "申请人": "乙", "_source_url": "u2", "_page_title": "t"},
+]
+
+
+def test_round_trip_preserves_missing_and_none():
+    store = RecordStore(RECORDS)
+    assert len(store) == 3
+    assert store.to_dicts() == RECORDS
+    assert store == RECORDS
+    assert store.fields == ["专利号", "申请人", "_source_url", "_page_title", "备注"]
+    assert "申请人" not in store[1] and "备注" in store[1]
+    assert store[-1]["申请人"] == "乙"
+    assert store.column("申请人", "") == ["甲", "", "乙"]
+
+
+def test_dictionary_fields_share_values():
+    store = RecordStore(RECORDS)
+    assert store._columns["_source_url"].tolist() == [2, 2, 5]
+    # 缺失占位 + 甲 + u1 + t + 乙 + u2
+    assert len(store._dictionary) == 6
+    assert store.column("_source_url") == [r["_source_url"] for r in RECORDS]
+
+
+def test_view_mutation_writes_through():
+    store = RecordStore(RECORDS)
+    for view in store:
+        view["_page_number"] = 2
+    store[0]["_source_url"] = "u3"
+    del store[2]["申请人"]
+    assert store.column("_page_number") == [2, 2, 2]
+    assert store[0]["_source_url"] == "u3"
+    assert dict(store[2]) == {"专利号": "CN3", "_source_url": "u2", "_page_title": "t", "_page_number": 2}
+
+
+def test_exporter_and_database_accept_store(tmp_path, monkeypatch):
+    store = RecordStore(RECORDS)
+    exporter = DataExporter(str(tmp_path))
+    with open(exporter.export_to_json(store, "out"), encoding="utf-8") as f:
+        assert json.load(f) == RECORDS
+    with open(exporter.export_to_csv(store, "out"), encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["专利权人"] for row in rows] == ["甲", "", "乙"]
+
+    from src.database.models import CrawlTask, Database
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    tasks.add_results("task", store)
+    results = tasks.get_results("task")
+    assert sorted(r["data"]["专利号"] for r in results) == ["CN1", "CN2", "CN3"]
+    assert {r["source_url"] for r in results} == {"u1", "u2"}
+
+
+def test_database_stores_categorical_fields_as_lookup_ids(tmp_path):
+    from src.database.models import CrawlTask, Database
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    records = [dict(RECORDS[0], 专利类型="发明专利"), dict(RECORDS[2], 专利类型="发明专利")]
+    tasks.add_results("task", records)
+
+    raw = tasks.db.fetchall("SELECT data FROM crawl_results")
+    assert all('"\\u53d1' not in row["data"] for row in raw)
+    assert len(tasks.db.fetchall("SELECT * FROM field_values")) == 3
+    assert sorted((r["data"] for r in tasks.get_results("task")), key=lambda d: d["专利号"]) == records
+
+
+def test_failed_batch_drops_cached_lookup_ids(tmp_path):
+    from src.database.models import CrawlTask, Database
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    # 新取值先写入查找表，随后的记录无法序列化，整批回滚
+    with pytest.raises(TypeError):
+        tasks.add_results("task", [dict(RECORDS[0], 专利类型="发明专利"), dict(RECORDS[1], 附件=object())])
+    assert tasks.db.fetchall("SELECT * FROM crawl_results") == []
+
+    # 回滚后的ID会被新取值复用，缓存不能再返回旧ID
+    records = [dict(RECORDS[0], 专利类型="实用新型"), dict(RECORDS[2], 专利类型="发明专利")]
+    tasks.add_results("task", records)
+    assert sorted((r["data"] for r in tasks.get_results("task")), key=lambda d: d["专利号"]) == records
+
+
+def test_engine_stores_results_per_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from src.database.models import CrawlTask, Database
+    from tests.fake_site import FakeSite
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    tasks.create("task", "fake", "p1", [], "")
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.task_model = tasks
+    data = engine.start_crawl("http://fake/index", {}, {"store_results": True}, {}, task_id="task")
+
+    assert list(tasks.iter_records("task")) == [dict(record) for record in data]
+    task = tasks.get("task")
+    assert (task["status"], task["pages_crawled"], task["records_crawled"]) == ("completed", 3, 25)
+    assert len(tasks.db.fetchall("SELECT * FROM field_values")) < 25
+
+
+def test_engine_stores_results_only_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from src.database.models import CrawlTask, Database
+    from tests.fake_site import FakeSite
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    tasks.create("task", "fake", "p1", [], "")
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.task_model = tasks
+    engine.start_crawl("http://fake/index", {}, {}, {}, task_id="task")
+
+    assert tasks.count_results("task") == 0
+    assert tasks.get("task")["status"] == "completed"
+
+
+def test_spills_over_budget_and_reads_back(tmp_path):
+    records = [dict(RECORDS[i % 3], 专利号=f"CN{i}", raw_text="x" * 200) for i in range(50)]
+    store = RecordStore(memory_budget=4096, spill_dir=str(tmp_path / "spill"))
+    store.extend(records)
+
+    assert store.segments and len(store) == 50
+    assert sum(segment["count"] for segment in store.segments) + store._length == 50
+    assert store._length < 50
+    assert store == records
+    assert store[3]["专利号"] == "CN3" and "申请人" not in store[1]
+    assert store.column("申请人", "") == [r.get("申请人", "") for r in records]
+    assert store.column("_source_url") == [r["_source_url"] for r in records]
+
+    exporter = DataExporter(str(tmp_path))
+    with open(exporter.export_to_json(store, "out"), encoding="utf-8") as f:
+        assert json.load(f) == records
+
+    with pytest.raises(ValueError):
+        store[0]["备注"] = "x"
+    # 遍历得到的已溢写记录同样只读，写入不会被静默丢弃
+    first = next(iter(store))
+    with pytest.raises(ValueError):
+        first["_page_number"] = 1
+    with pytest.raises(ValueError):
+        del first["专利号"]
+
+
+def test_spill_files_removed_with_store(tmp_path):
+    import gc
+
+    spill_dir = tmp_path / "spill"
+    store = RecordStore(memory_budget=1, spill_dir=str(spill_dir))
+    store.extend(RECORDS)
+    (spill_dir / "other.txt").write_text("x")
+    assert len(list(spill_dir.glob("segment_*"))) == 3
+
+    del store
+    gc.collect()
+    # 只删除本存储的段文件，用户指定的目录保留
+    assert [path.name for path in spill_dir.iterdir()] == ["other.txt"]
+
+
+def test_spill_rejects_non_json_values(tmp_path):
+    store = RecordStore(memory_budget=1, spill_dir=str(tmp_path))
+    with pytest.raises(TypeError):
+        store.append({"专利号": "CN1", "raw": object()})
+
+
+def test_export_reads_spilled_store_in_chunks(tmp_path, monkeypatch):
+    import tracemalloc
+
+    from src.crawler import data_exporter
+
+    monkeypatch.setattr(data_exporter, "EXPORT_CHUNK_ROWS", 100)
+    records = [dict(RECORDS[i % 3], 专利号=f"CN{i}", raw_text="x" * 500) for i in range(10000)]
+    store = RecordStore(memory_budget=32 * 1024, spill_dir=str(tmp_path / "spill"))
+    store.extend(records)
+    in_memory = store._length
+    exporter = DataExporter(str(tmp_path))
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        results = exporter.export_multi_format(store, "out", ["csv", "jsonl", "excel"])
+        export_peak = tracemalloc.get_traced_memory()[1] - base
+        loaded = store.to_dicts()
+        loaded_size = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+
+    # 导出时只有一块记录在内存中（xlsxwriter 另有约 3.5MB 的固定开销），已溢写的记录不会被读回内存
+    assert export_peak < loaded_size / 3
+    assert store._length == in_memory
+    assert loaded == records
+    with open(results["jsonl"], encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == records
+    with open(results["csv"], encoding="utf-8-sig") as f:
+        assert [row["序号"] for row in csv.DictReader(f)] == [str(i) for i in range(1, 10001)]
+
+
+def test_export_task_streams_from_database(tmp_path):
+    from src.database.models import CrawlTask, Database
+
+    tasks = CrawlTask(Database(str(tmp_path / "sites.db")))
+    records = [dict(RECORDS[i % 3], 专利号=f"CN{i}", 专利类型="发明专利") for i in range(25)]
+    tasks.add_results("task", records)
+    tasks.add_results("other", RECORDS)
+
+    assert tasks.count_results("task") == 25
+    assert [r["专利号"] for r in tasks.iter_records("task", batch_size=4)] == [r["专利号"] for r in records]
+
+    exporter = DataExporter(str(tmp_path / "exports"))
+    progress = []
+    results = exporter.export_task(
+        tasks, "task", "out", ["csv", "json", "jsonl"], batch_size=10,
+        progress_callback=lambda **kw: progress.append((kw["fmt"], kw["written"])),
+    )
+    with open(results["json"], encoding="utf-8") as f:
+        assert json.load(f) == records
+    with open(results["csv"], encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["序号"] for row in rows] == [str(i) for i in range(1, 26)]
+    assert [w for fmt, w in progress if fmt == "csv"] == [10, 20, 25]
+
+    with pytest.raises(ValueError):
+        exporter.export_task(tasks, "task", "out", ["text"])
@@ -0,0 +1,75 @@
+"""
+录制/回放浏览器后端测试
+"""
+
+import pytest
+
+from src.browser.backend import BrowserBackend
+from src.browser.replay_controller import RecordingController, ReplayController
+from tests.fake_site import FakeSite
+
+
+@pytest.fixture
+def engine_factory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    return lambda browser: CrawlerEngine(browser=browser)
+
+
+def _crawl(engine):
+    return engine.start_crawl(
+        "http://fake/index",
+        page_config={},
+        strategy={"max_pages": 10},
+        form_data={"loading_selector": ".q-loading"},
+    )
+
+
+def test_replay_reproduces_recorded_crawl(tmp_path, engine_factory):
+    recording = tmp_path / "crawl.jsonl"
+    site = FakeSite()
+    assert isinstance(site, BrowserBackend)
+
+    recorded = _crawl(engine_factory(RecordingController(site, str(recording))))
+    assert len(recorded) == 25
+
+    replay = ReplayController(str(recording))
+    replayed = _crawl(engine_factory(replay))
+    assert replayed == recorded
+    assert replay.stats["misses"] == 0
+    assert replay.remaining_events() == 0
+    # 全速回放不会真正等待，但会累计引擎要求的等待时间
+    assert replay.stats["waited_ms"] > 0
+
+
+def test_replay_tolerates_fewer_polls(tmp_path):
+    recording = tmp_path / "polls.jsonl"
+    site = FakeSite()
+    recorder = RecordingController(site, str(recording))
+    script = "(function() { const loadingElements = []; })()"
+    assert [recorder.evaluate_sync(script) for _ in range(3)] == [False, True, False]
+    recorder.evaluate_sync("nextButton.click()", mutates=True)
+    assert recorder.evaluate_sync(script) is True
+    recorder.close()
+
+    replay = ReplayController(str(recording))
+    assert replay.evaluate_sync(script) is False
+    replay.evaluate_sync("nextButton.click()", mutates=True)
+    # 上一纪元未消费的轮询结果被丢弃
+    assert replay.evaluate_sync(script) is True
+    assert replay.evaluate_sync(script) is True
+
+
+def test_engine_records_when_strategy_sets_record_dir(tmp_path, engine_factory):
+    site = FakeSite()
+    engine = engine_factory(site)
+    recorded = engine.start_crawl(
+        "http://fake/index", page_config={}, strategy={"max_pages": 10, "record_dir": str(tmp_path / "recordings")}
+    )
+    # 抓取结束后恢复原后端，录制文件可直接回放
+    assert engine.browser is site
+    assert engine.recording_path.startswith(str(tmp_path / "recordings"))
+
+    replay = ReplayController(engine.recording_path)
+    assert _crawl(engine_factory(replay)) == recorded
+    assert replay.stats["misses"] == 0
@@ -0,0 +1,135 @@
+"""
+抓取策略选项测试
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from src.database.models import CrawlStrategy, Database
+
+
+def test_options_column_migrated_on_old_database(tmp_path):
+    db_path = tmp_path / "sites.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE crawl_strategies (id TEXT PRIMARY KEY, page_config_id TEXT NOT NULL, "
+        "pagination_type TEXT, pagination_params TEXT, max_pages INTEGER DEFAULT 100, "
+        "enable_link_tracking INTEGER DEFAULT 0, link_extraction_rule TEXT, link_filter_rule TEXT, "
+        "tracking_depth INTEGER DEFAULT 1, dedup_strategy TEXT, created_at TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO crawl_strategies (id, page_config_id, pagination_params) VALUES ('s1', 'p1', '{}')"
+    )
+    conn.commit()
+    conn.close()
+
+    strategies = CrawlStrategy(Database(str(db_path)))
+    strategy = strategies.get_by_page("p1")
+    # 旧策略没有保存选项，使用默认值
+    for key, default in CrawlStrategy.DEFAULT_OPTIONS.items():
+        assert strategy[key] == default
+    assert "options" not in strategy
+
+
+def test_options_round_trip(tmp_path):
+    strategies = CrawlStrategy(Database(str(tmp_path / "sites.db")))
+    strategies.create("s1", "p1", options={"spill_dir": "spill"})
+    strategies.update_options("s1", {"memory_budget_mb": None})
+
+    strategy = strategies.get_by_page("p1")
+    assert strategy["spill_dir"] == "spill"
+    assert strategy["memory_budget_mb"] is None
+    # 默认值是副本，修改返回的策略不影响默认值
+    strategy["stream_formats"].append("json")
+    assert CrawlStrategy.DEFAULT_OPTIONS["stream_formats"] == ["csv"]
+
+    strategies.update_options("s1", {"stream_formats": ["jsonl", "parquet"], "incremental_export": True})
+    strategy = strategies.get_by_page("p1")
+    assert strategy["stream_formats"] == ["jsonl", "parquet"]
+    assert strategy["incremental_export"] is True
+
+
+def test_engine_uses_stored_memory_budget(tmp_path):
+    from src.crawler.crawler_engine import CrawlerEngine
+
+    strategies = CrawlStrategy(Database(str(tmp_path / "sites.db")))
+    strategies.create("s1", "p1", options={"spill_dir": str(tmp_path / "spill")})
+    store = CrawlerEngine._new_record_store(strategies.get_by_page("p1"))
+    assert store.memory_budget == CrawlStrategy.DEFAULT_OPTIONS["memory_budget_mb"] * 1024 * 1024
+
+
+def test_options_dialog_round_trip():
+    pytest.importorskip("PyQt6.QtWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    from src.ui.strategy_dialog import StrategyOptionsDialog
+
+    _app = QApplication.instance() or QApplication([])
+    options = dict(CrawlStrategy.DEFAULT_OPTIONS, spill_dir="spill")
+    dialog = StrategyOptionsDialog(strategy=options)
+    assert dialog.options() == options
+
+    dialog.memory_budget_spin.setValue(0)
+    dialog.stream_format_checks["csv"].setChecked(False)
+    dialog.stream_format_checks["parquet"].setChecked(True)
+    dialog.archive_dir_edit.setText(" archive ")
+    dialog.streaming_extraction_check.setChecked(True)
+    dialog.incremental_export_check.setChecked(True)
+    dialog.compression_combo.setCurrentIndex(dialog.compression_combo.findData("zstd"))
+    dialog.store_results_check.setChecked(True)
+    dialog.record_dir_edit.setText("recordings")
+    assert dialog.options()["memory_budget_mb"] is None
+    assert dialog.options()["stream_formats"] == ["parquet"]
+    assert dialog.options()["archive_dir"] == "archive"
+    assert dialog.options()["streaming_extraction"] is True
+    assert dialog.options()["incremental_export"] is True
+    assert dialog.options()["export_compression"] == "zstd"
+    assert dialog.options()["store_results"] is True
+    assert dialog.options()["record_dir"] == "recordings"
+
+
+def test_stored_strategy_streams_during_crawl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from tests.fake_site import FakeSite
+
+    strategies = CrawlStrategy(Database(str(tmp_path / "sites.db")))
+    strategies.create("s1", "p1")
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.start_crawl("http://fake/index", {}, strategies.get_by_page("p1"), {})
+
+    assert list(engine.stream_paths) == ["csv"]
+    with open(engine.stream_paths["csv"], encoding="utf-8-sig") as f:
+        assert len(f.readlines()) == 26
+
+
+def test_stored_archive_dir_archives_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from src.crawler.page_archive import PageArchive
+    from tests.fake_site import FakeSite
+
+    strategies = CrawlStrategy(Database(str(tmp_path / "sites.db")))
+    strategies.create("s1", "p1", options={"stream_formats": []})
+    strategies.update_options("s1", {"archive_dir": str(tmp_path / "archive")})
+    engine = CrawlerEngine(browser=FakeSite(total_results=25, page_size=10))
+    engine.start_crawl("http://fake/index", {}, strategies.get_by_page("p1"), {})
+
+    assert len(PageArchive(str(tmp_path / "archive"))) == 3
+
+
+def test_stored_streaming_extraction_reaches_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.crawler.crawler_engine import CrawlerEngine
+    from tests.fake_site import FakeSite
+
+    strategies = CrawlStrategy(Database(str(tmp_path / "sites.db")))
+    strategies.create("s1", "p1", options={"stream_formats": [], "streaming_extraction": True})
+    site = FakeSite(total_results=25, page_size=10)
+    data = CrawlerEngine(browser=site).start_crawl("http://fake/index", {}, strategies.get_by_page("p1"), {})
+
+    assert len(data) == 25
+    assert site.streamed_fetches == site.total_pages